@@ -1,4 +1,4 @@
-from langchain.schema import HumanMessage, SystemMessage
+from langchain.schema import AIMessage, HumanMessage, SystemMessage
 from langchain_aws.chat_models import ChatBedrock
 import environ
 import os
@@ -121,7 +121,12 @@ def bedrock_response_sub_platform(input_text):
     response = llm.invoke(messages)
     return response.content  # Claude 모델 응답 반환
 
-def bedrock_chat_bot(input_text):
+def bedrock_chat_bot(input_text, history=None, summary=None):
+    """
+    :param input_text: 사용자 질문
+    :param history: 최근 대화 [(사용자 메시지, 챗봇 응답), ...] (오래된 순)
+    :param summary: 그 이전 대화의 요약
+    """
     # Bedrock 모델 클라이언트 초기화
     llm = ChatBedrock(
         model_id="anthropic.claude-3-5-sonnet-20240620-v1:0",
@@ -166,13 +171,46 @@ def bedrock_chat_bot(input_text):
     momo: "저는 momo 챗봇이에요! 😊 궁금한 것이 있으면 무엇이든 물어보세요."
     """
 
-    # 모델 입력 메시지 (시스템 메시지 + 사용자 메시지 구성)
+    # 이전 대화 요약은 시스템 프롬프트 뒤에 붙임
+    if summary:
+        system_prompt += f"\n    지금까지의 대화 요약:\n    {summary}\n"
+
+    # 모델 입력 메시지 (시스템 메시지 + 최근 대화 + 사용자 메시지 구성)
     print(f"Sending input text: {input_text}")
-    messages = [
-        SystemMessage(content=system_prompt),  # ✅ 챗봇 전용 프롬프트 추가
-        HumanMessage(content=input_text),  # 사용자 메시지
-    ]
+    messages = [SystemMessage(content=system_prompt)]  # ✅ 챗봇 전용 프롬프트 추가
+    for user_message, bot_response in history or []:
+        messages.append(HumanMessage(content=user_message))
+        messages.append(AIMessage(content=bot_response))
+    messages.append(HumanMessage(content=input_text))  # 사용자 메시지
 
     # Bedrock 모델 호출
     response = llm.invoke(messages)
     return response.content  # Claude 모델 응답 반환
+
+
+def bedrock_summarize_chat(previous_summary, turns):
+    """
+    이전 요약과 새로 밀려난 대화를 합쳐 짧은 요약으로 만듭니다.
+
+    :param previous_summary: 기존 요약 (없으면 빈 문자열)
+    :param turns: [(사용자 메시지, 챗봇 응답), ...] (오래된 순)
+    :return: 새 요약
+    """
+    llm = ChatBedrock(
+        model_id="anthropic.claude-3-5-sonnet-20240620-v1:0",
+        region_name=AWS_REGION,  # AWS 리전 설정
+    )
+
+    system_prompt = """
+    당신은 사용자와 'momo' 챗봇의 대화를 요약합니다.
+    기존 요약과 새 대화를 합쳐 이후 대화에 필요한 사실(사용자의 취향, 요청, 이미 추천한 콘텐츠 등)만
+    300자 이내의 한국어로 요약하세요. 요약문만 출력합니다.
+    """
+    conversation = "\n".join(f"사용자: {user_message}\nmomo: {bot_response}" for user_message, bot_response in turns)
+    messages = [
+        SystemMessage(content=system_prompt),
+        HumanMessage(content=f"기존 요약:\n{previous_summary or '(없음)'}\n\n새 대화:\n{conversation}"),
+    ]
+
+    response = llm.invoke(messages)
+    return response.content
@@ -0,0 +1,215 @@
+import re
+import threading
+import time
+import unicodedata
+from bisect import bisect_left
+from collections import OrderedDict, namedtuple
+
+import environ
+
+from .models import Contents
+from .redis import redis_client
+
+# 환경 변수 설정
+env = environ.Env()
+
+# 카탈로그 버전을 확인하지 못해도 (Redis 장애 등) 이 주기마다 인덱스를 다시 만듦 (초)
+CATALOG_INDEX_TTL = env.int('CATALOG_INDEX_TTL', default=300)
+# 카탈로그 버전 키를 확인하는 주기 (초, 요청마다 Redis를 부르지 않도록)
+CATALOG_VERSION_CHECK_INTERVAL = env.float('CATALOG_VERSION_CHECK_INTERVAL', default=5.0)
+# 인덱스에 없는 제목을 Mongo에서 찾은 결과를 보관할 최대 수
+CATALOG_MISS_CACHE_SIZE = env.int('CATALOG_MISS_CACHE_SIZE', default=1024)
+# 콘텐츠 적재(import_contents) 때마다 1씩 증가하는 Redis 키
+CATALOG_VERSION_KEY = "catalog:version"
+
+# 정규화 시 제거할 문자 (공백, 구두점, 따옴표, 괄호 등)
+_NON_WORD_PATTERN = re.compile(r"[\W_]+", re.UNICODE)
+
+# 튜플 기반이라 인스턴스마다 __dict__가 없음 (10만 건도 수십 MB 이내)
+CatalogEntry = namedtuple("CatalogEntry", ["content_id", "title", "poster_url", "platform"])
+
+
+def normalize_title(title):
+    """
+    제목 비교용 정규화 키를 만듭니다. (NFKC, 소문자, 공백/구두점 제거)
+
+    예: '"나의 옆자리 이드님"' → '나의옆자리이드님'
+    """
+    if not title:
+        return ""
+    title = unicodedata.normalize("NFKC", title).lower()
+    return _NON_WORD_PATTERN.sub("", title)
+
+
+def subscribed_platforms(value):
+    """
+    Calendar.subscribe_platform 문자열을 플랫폼 목록으로 나눕니다. (예: 'Netflix, 왓챠' → ['Netflix', '왓챠'])
+    """
+    return [platform.strip() for platform in (value or "").split(",") if platform.strip()]
+
+
+class CatalogIndex:
+    """
+    Contents 카탈로그의 정규화 제목 / 플랫폼 인덱스
+
+    LLM이 추출한 제목의 사소한 변형(따옴표, 띄어쓰기 등)을 같은 content_id로 모으고,
+    같은 제목이 여러 플랫폼에 있으면 사용자가 구독한 플랫폼의 콘텐츠를 고를 수 있게 합니다.
+    """
+
+    def __init__(self, entries, version=None):
+        self.version = version
+        self.by_id = {}
+        self.by_title = {}
+        self.by_platform = {}  # 정규화 플랫폼 → {정규화 제목: CatalogEntry}
+        for entry in entries:
+            key = normalize_title(entry.title)
+            self.by_id.setdefault(entry.content_id, entry)
+            self.by_title.setdefault(key, entry)
+            if entry.platform:
+                self.by_platform.setdefault(normalize_title(entry.platform), {}).setdefault(key, entry)
+        self._sorted_titles = sorted(self.by_title)
+
+    @classmethod
+    def build(cls, version=None):
+        """
+        Contents 컬렉션 전체에서 필요한 필드만 읽어 인덱스를 만듭니다.
+        """
+        docs = Contents.objects.only("content_id", "title", "poster_url", "platform").as_pymongo()
+        return cls(
+            (
+                CatalogEntry(
+                    doc["content_id"],
+                    doc.get("title"),
+                    doc.get("poster_url"),
+                    doc.get("platform"),
+                )
+                for doc in docs
+                if doc.get("content_id") is not None
+            ),
+            version=version,
+        )
+
+    def get(self, content_id):
+        return self.by_id.get(content_id)
+
+    def resolve(self, title, platforms=None):
+        """
+        제목을 카탈로그 항목으로 변환합니다.
+
+        platforms가 있으면 그 플랫폼(앞쪽 우선)에서 정규화 제목이 정확히 일치하는 항목을 먼저 찾습니다.
+        다음으로 전체에서 정확히 일치하는 항목, 없으면 기존 RecommendContentView와 같이
+        해당 제목으로 시작하는 첫 번째 항목을 사용합니다.
+
+        :param title: 원본 제목
+        :param platforms: 우선할 플랫폼 목록 (예: 구독 플랫폼)
+        :return: CatalogEntry (없으면 None)
+        """
+        key = normalize_title(title)
+        if not key:
+            return None
+
+        for platform in platforms or ():
+            entry = self.by_platform.get(normalize_title(platform), {}).get(key)
+            if entry:
+                return entry
+
+        entry = self.by_title.get(key)
+        if entry:
+            return entry
+
+        # 접두사 일치 (정렬된 제목 목록에서 이진 탐색)
+        position = bisect_left(self._sorted_titles, key)
+        if position < len(self._sorted_titles) and self._sorted_titles[position].startswith(key):
+            return self.by_title[self._sorted_titles[position]]
+        return None
+
+
+_catalog_index = None
+_catalog_index_built_at = 0.0
+_version_checked_at = 0.0
+_catalog_lock = threading.Lock()
+_rebuild_lock = threading.Lock()  # 인덱스를 다시 만드는 스레드는 하나만
+_title_misses = OrderedDict()  # 인덱스에 없던 제목 → Mongo 조회 결과 (CatalogEntry 또는 None)
+
+
+def get_catalog_version():
+    """
+    Redis의 카탈로그 버전 (확인할 수 없으면 None)
+    """
+    try:
+        return redis_client.get(CATALOG_VERSION_KEY) or "0"
+    except Exception as e:
+        print(f"카탈로그 버전 확인 중 오류 발생: {str(e)}")
+        return None
+
+
+def get_catalog_index():
+    """
+    프로세스 단위로 캐시된 카탈로그 인덱스를 반환합니다.
+
+    CATALOG_VERSION_CHECK_INTERVAL마다 Redis의 catalog:version을 확인해서 콘텐츠가 다시 적재됐으면 새로 만들고,
+    버전을 확인할 수 없으면 CATALOG_INDEX_TTL마다 새로 만듭니다. (평소 요청은 Mongo를 조회하지 않음)
+    인덱스를 다시 만드는 동안 다른 요청은 기존 인덱스를 그대로 사용합니다. (처음 만드는 경우만 대기)
+    """
+    global _catalog_index, _catalog_index_built_at, _version_checked_at
+
+    index = _catalog_index
+    if index is not None and time.time() - _version_checked_at < CATALOG_VERSION_CHECK_INTERVAL:
+        return index
+
+    # 다른 스레드가 이미 확인/갱신 중이면 기다리지 않고 기존 인덱스 반환
+    if not _rebuild_lock.acquire(blocking=index is None):
+        return index
+    try:
+        index = _catalog_index
+        if index is not None and time.time() - _version_checked_at < CATALOG_VERSION_CHECK_INTERVAL:
+            return index
+
+        version = get_catalog_version()
+        _version_checked_at = time.time()
+        if version is not None:
+            stale = index is None or version != index.version
+        else:
+            # 버전을 확인할 수 없을 때만 TTL로 갱신
+            stale = index is None or time.time() - _catalog_index_built_at > CATALOG_INDEX_TTL
+
+        if stale:
+            index = CatalogIndex.build(version)  # _catalog_lock 밖에서 만든 뒤 교체
+            with _catalog_lock:
+                _catalog_index = index
+                _catalog_index_built_at = time.time()
+                _title_misses.clear()
+        return index
+    finally:
+        _rebuild_lock.release()
+
+
+def find_content_by_title(title, platforms=None):
+    """
+    제목으로 콘텐츠를 찾습니다. (카탈로그 인덱스 → 없으면 기존과 같은 Mongo 접두사 검색)
+
+    platforms가 있으면 같은 제목 중 그 플랫폼의 콘텐츠를 우선합니다. (CatalogIndex.resolve)
+
+    인덱스에 없는 제목은 정규화 방식이 달라 못 찾은 경우일 수 있으므로 Mongo에서 한 번 더 찾고,
+    결과(없음 포함)를 CATALOG_MISS_CACHE_SIZE개까지 LRU로 보관합니다. (카탈로그 버전이 바뀌면 비움)
+
+    :return: CatalogEntry (없으면 None)
+    """
+    entry = get_catalog_index().resolve(title, platforms)
+    if entry is not None or not title:
+        return entry
+
+    with _catalog_lock:
+        if title in _title_misses:
+            _title_misses.move_to_end(title)
+            return _title_misses[title]
+
+    doc = (Contents.objects(title__regex=f"^{re.escape(title)}")
+           .only("content_id", "title", "poster_url", "platform").as_pymongo().first())
+    entry = CatalogEntry(doc["content_id"], doc.get("title"), doc.get("poster_url"), doc.get("platform")) if doc else None
+
+    with _catalog_lock:
+        _title_misses[title] = entry
+        if len(_title_misses) > CATALOG_MISS_CACHE_SIZE:
+            _title_misses.popitem(last=False)
+    return entry
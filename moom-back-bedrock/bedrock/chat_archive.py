@@ -0,0 +1,52 @@
+import json
+from datetime import datetime, timezone
+
+import zstandard
+
+from .models import ChatArchive
+
+# 압축 수준 (대화 텍스트는 3 정도면 충분히 작아짐)
+ZSTD_LEVEL = 3
+
+
+def archive_chat_entries(user_id, entries):
+    """
+    Redis Stream에서 밀려난 대화를 압축해서 Mongo에 한 문서로 저장합니다.
+
+    (user_id, first_id)로 upsert하므로 같은 묶음을 여러 번 보관해도 (재시도, 동시 저장) 문서는 하나입니다.
+
+    :param user_id: 사용자 ID
+    :param entries: [(Stream ID, {"user_message", "bot_response", "timestamp"}), ...]
+    :return: 보관한 대화 수
+    """
+    if not entries:
+        return 0
+
+    messages = [dict(message, id=message_id) for message_id, message in entries]
+    raw = json.dumps(messages, ensure_ascii=False).encode("utf-8")
+
+    ChatArchive.objects(user_id=user_id, first_id=entries[0][0]).update_one(
+        upsert=True,
+        set__last_id=entries[-1][0],
+        set__count=len(entries),
+        set__data=zstandard.ZstdCompressor(level=ZSTD_LEVEL).compress(raw),
+        set_on_insert__created_at=datetime.now(timezone.utc),
+    )
+    return len(entries)
+
+
+def load_archived_chats(user_id, limit=10):
+    """
+    보관된 대화를 최근 묶음부터 풀어서 반환합니다.
+
+    :param user_id: 사용자 ID
+    :param limit: 최대 묶음 수
+    :return: 대화 리스트 (오래된 순)
+    """
+    archives = ChatArchive.objects(user_id=user_id).order_by("-last_id").limit(limit)
+    decompressor = zstandard.ZstdDecompressor()
+
+    messages = []
+    for archive in reversed(list(archives)):
+        messages.extend(json.loads(decompressor.decompress(archive.data)))
+    return messages
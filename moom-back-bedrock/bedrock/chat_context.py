@@ -0,0 +1,143 @@
+import threading
+import uuid
+
+import environ
+
+from .redis import CHAT_HISTORY_IDLE_TTL, chat_history_key, redis_client
+
+# 환경 변수 설정
+env = environ.Env()
+
+# 그대로 보내는 최근 대화 수
+CHAT_CONTEXT_TURNS = env.int('CHAT_CONTEXT_TURNS', default=6)
+# 요약 + 최근 대화에 쓸 최대 토큰 수 (추정치)
+CHAT_CONTEXT_TOKEN_BUDGET = env.int('CHAT_CONTEXT_TOKEN_BUDGET', default=1500)
+# 최근 대화 창 밖으로 이만큼 밀려나면 요약을 다시 만듦
+CHAT_SUMMARY_BATCH = env.int('CHAT_SUMMARY_BATCH', default=6)
+# 요약 중복 실행 방지 락 시간 (초)
+CHAT_SUMMARY_LOCK_TTL = 120
+
+# 내가 잡은 락일 때만 삭제 (요약이 TTL보다 오래 걸려 다른 요청이 새로 잡은 락은 유지)
+RELEASE_LOCK_SCRIPT = """
+if redis.call("GET", KEYS[1]) == ARGV[1] then
+    return redis.call("DEL", KEYS[1])
+end
+return 0
+"""
+
+
+def chat_summary_key(user_id):
+    """
+    사용자별 대화 요약 해시 키 (summary, upto_id: 요약에 포함된 마지막 Stream ID)
+    """
+    return f"chat_summary:{user_id}"
+
+
+def estimate_tokens(text):
+    """
+    대략적인 토큰 수 (한글은 글자당 약 1토큰, 영문은 약 3~4글자당 1토큰)
+    """
+    return len((text or "").encode("utf-8")) // 3 + 1
+
+
+def build_chat_context(user_id):
+    """
+    최근 대화 몇 개와 그 이전 대화의 요약을 토큰 예산 안에서 가져옵니다.
+
+    Redis 조회는 최근 대화 + 창 바로 앞의 CHAT_SUMMARY_BATCH개와 요약을 한 번의 파이프라인으로 가져오고,
+    창 밖으로 밀려난 대화가 CHAT_SUMMARY_BATCH개 쌓였을 때만 백그라운드에서 요약을 다시 만듭니다.
+    (대화가 길어져도 요청마다 보내는 양과 지연 시간이 일정)
+
+    :param user_id: 사용자 ID
+    :return: (최근 대화 [(사용자 메시지, 챗봇 응답), ...], 요약 또는 None)
+    """
+    pipe = redis_client.pipeline(transaction=False)
+    pipe.xrevrange(chat_history_key(user_id), count=CHAT_CONTEXT_TURNS + CHAT_SUMMARY_BATCH)
+    pipe.hgetall(chat_summary_key(user_id))
+    entries, summary_data = pipe.execute()
+
+    recent = list(reversed(entries[:CHAT_CONTEXT_TURNS]))
+    summary = summary_data.get("summary") or None
+    if recent:
+        _maybe_refresh_summary(user_id, recent[0][0], entries[CHAT_CONTEXT_TURNS:], summary_data.get("upto_id"))
+
+    turns = [(message.get("user_message", ""), message.get("bot_response", "")) for _, message in recent]
+    return _fit_budget(turns, summary)
+
+
+def _fit_budget(turns, summary):
+    """
+    토큰 예산을 넘으면 오래된 대화부터 빼고, 그래도 넘으면 요약을 자릅니다.
+    """
+    budget = CHAT_CONTEXT_TOKEN_BUDGET
+    if summary:
+        summary_tokens = estimate_tokens(summary)
+        if summary_tokens > budget // 2:
+            # 요약은 예산의 절반까지만 사용
+            summary = summary[:len(summary) * (budget // 2) // summary_tokens]
+            summary_tokens = estimate_tokens(summary)
+        budget -= summary_tokens
+
+    kept = []
+    for user_message, bot_response in reversed(turns):
+        cost = estimate_tokens(user_message) + estimate_tokens(bot_response)
+        if cost > budget:
+            break
+        kept.append((user_message, bot_response))
+        budget -= cost
+
+    return list(reversed(kept)), summary
+
+
+def _stream_id(message_id):
+    return tuple(int(part) for part in message_id.split("-"))
+
+
+def _maybe_refresh_summary(user_id, window_start_id, before_window, upto_id):
+    """
+    요약 이후 ~ 최근 대화 창 사이에 CHAT_SUMMARY_BATCH개 이상 쌓였으면 백그라운드에서 요약을 갱신합니다.
+
+    :param before_window: 창 바로 앞의 대화 (최신순, 최대 CHAT_SUMMARY_BATCH개)
+    """
+    # 창 바로 앞 CHAT_SUMMARY_BATCH개가 모두 요약 이후 대화이면 요약할 대화가 충분히 쌓인 것
+    if len(before_window) < CHAT_SUMMARY_BATCH:
+        return
+    if upto_id and _stream_id(before_window[-1][0]) <= _stream_id(upto_id):
+        return
+
+    lock_key = f"{chat_summary_key(user_id)}:lock"
+    token = uuid.uuid4().hex
+    if not redis_client.set(lock_key, token, nx=True, ex=CHAT_SUMMARY_LOCK_TTL):
+        return  # 이미 다른 요청이 요약 중
+
+    threading.Thread(target=_refresh_summary, args=(user_id, window_start_id, lock_key, token), daemon=True).start()
+
+
+def _refresh_summary(user_id, window_start_id, lock_key, token):
+    from .bedrock import bedrock_summarize_chat
+
+    try:
+        summary_key = chat_summary_key(user_id)
+        previous = redis_client.hgetall(summary_key)
+        # 요약 이후 가장 오래된 대화부터 CHAT_SUMMARY_BATCH개 (요청 경로 밖에서 조회)
+        upto_id = previous.get("upto_id")
+        pending = redis_client.xrange(chat_history_key(user_id), min=f"({upto_id}" if upto_id else "-",
+                                      max=f"({window_start_id}", count=CHAT_SUMMARY_BATCH)
+        if not pending:
+            return
+
+        turns = [(message.get("user_message", ""), message.get("bot_response", "")) for _, message in pending]
+        summary = bedrock_summarize_chat(previous.get("summary") or "", turns)
+
+        pipe = redis_client.pipeline(transaction=True)
+        pipe.hset(summary_key, mapping={"summary": summary, "upto_id": pending[-1][0]})
+        if CHAT_HISTORY_IDLE_TTL > 0:
+            pipe.expire(summary_key, CHAT_HISTORY_IDLE_TTL)
+        pipe.execute()
+    except Exception as e:
+        print(f"대화 요약 갱신 중 오류 발생: {str(e)}")
+    finally:
+        try:
+            redis_client.register_script(RELEASE_LOCK_SCRIPT)(keys=[lock_key], args=[token])
+        except Exception as e:
+            print(f"대화 요약 락 해제 중 오류 발생: {str(e)}")
@@ -0,0 +1,89 @@
+from collections import defaultdict
+
+from django.core.management.base import BaseCommand
+
+from bedrock.redis import CHAT_HISTORY_IDLE_TTL, redis_client
+
+# 대화 수 기준 사용자 구간
+LENGTH_COHORTS = [(1, 10), (11, 50), (51, 100), (101, 200), (201, None)]
+# 마지막 대화 이후 지난 일수 기준 사용자 구간
+IDLE_COHORTS = [(0, 1), (1, 7), (7, 30), (30, None)]
+
+
+def cohort_label(value, cohorts, unit):
+    for low, high in cohorts:
+        if value >= low and (high is None or value <= high):
+            return f"{low}{unit}+" if high is None else f"{low}-{high}{unit}"
+    return "기타"
+
+
+class Command(BaseCommand):
+    help = (
+        "chat_history:* Stream의 메모리 사용량(MEMORY USAGE)을 사용자 구간별로 집계합니다. "
+        "(대화 수 / 마지막 대화 이후 경과일 기준, Redis 용량 산정용)"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--sample", type=int, default=0,
+                            help="확인할 최대 사용자 수 (0이면 전체)")
+        parser.add_argument("--scan-count", type=int, default=1000,
+                            help="SCAN 한 번에 확인할 키 수")
+
+    def handle(self, *args, **options):
+        by_length = defaultdict(lambda: [0, 0])  # 구간 → [사용자 수, 바이트]
+        by_idle = defaultdict(lambda: [0, 0])
+        users = 0
+        total_bytes = 0
+        batch = []
+
+        for key in redis_client.scan_iter(match="chat_history:*", count=options["scan_count"], _type="stream"):
+            batch.append(key)
+            if len(batch) >= 500:
+                total_bytes += self.measure(batch, by_length, by_idle)
+                users += len(batch)
+                batch = []
+            if options["sample"] and users + len(batch) >= options["sample"]:
+                break
+
+        if batch:
+            total_bytes += self.measure(batch, by_length, by_idle)
+            users += len(batch)
+
+        self.stdout.write(f"사용자 {users}명, 전체 {total_bytes / 1024 / 1024:.2f}MB"
+                          + (f", 평균 {total_bytes / users / 1024:.1f}KB" if users else ""))
+        self.report("대화 수", by_length)
+        self.report("마지막 대화 이후", by_idle)
+
+    def measure(self, keys, by_length, by_idle):
+        pipe = redis_client.pipeline(transaction=False)
+        for key in keys:
+            pipe.memory_usage(key, samples=0)
+            pipe.xlen(key)
+            pipe.ttl(key)
+        results = pipe.execute()
+
+        total = 0
+        for index in range(len(keys)):
+            size, length, ttl = results[index * 3:index * 3 + 3]
+            size = size or 0
+            total += size
+
+            length_label = cohort_label(length, LENGTH_COHORTS, "개")
+            by_length[length_label][0] += 1
+            by_length[length_label][1] += size
+
+            # 만료 시간은 대화마다 CHAT_HISTORY_IDLE_TTL로 갱신되므로 남은 TTL로 경과일을 계산
+            if CHAT_HISTORY_IDLE_TTL > 0 and ttl and ttl > 0:
+                idle_days = (CHAT_HISTORY_IDLE_TTL - ttl) / 86400
+                idle_label = cohort_label(idle_days, IDLE_COHORTS, "일")
+            else:
+                idle_label = "만료 없음"
+            by_idle[idle_label][0] += 1
+            by_idle[idle_label][1] += size
+        return total
+
+    def report(self, title, cohorts):
+        self.stdout.write(f"\n[{title}]")
+        for label, (users, size) in cohorts.items():
+            self.stdout.write(f"  {label}: 사용자 {users}명, {size / 1024 / 1024:.2f}MB, "
+                              f"평균 {size / users / 1024:.1f}KB")
@@ -0,0 +1,40 @@
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+
+from bedrock.stats_buffer import STATS_FLUSH_INTERVAL, flush_emotion_stats, unique_title_indexes
+
+
+class Command(BaseCommand):
+    help = "Redis에 쌓인 감정 통계 증가분을 주기적으로 ContentEmotionStats에 반영합니다."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--interval", type=float, default=STATS_FLUSH_INTERVAL,
+                            help="flush 주기 (초)")
+        parser.add_argument("--once", action="store_true",
+                            help="한 번만 flush하고 종료")
+
+    def handle(self, *args, **options):
+        interval = options["interval"]
+
+        # 배포 순서 강제: title unique 인덱스가 남아 있으면 content_id 기준 upsert가 실패함
+        legacy_indexes = unique_title_indexes()
+        if legacy_indexes:
+            raise CommandError(
+                f"ContentEmotionStats에 title unique 인덱스가 남아 있습니다 ({', '.join(legacy_indexes)}). "
+                "먼저 migrate_emotion_stats를 실행하세요."
+            )
+
+        while True:
+            try:
+                flushed = flush_emotion_stats()
+                if options["once"]:
+                    self.stdout.write(f"flush 완료: 업데이트 {flushed}건")
+                    return
+            except Exception as e:
+                # 처리 중이던 묶음은 Redis에 남아 있으므로 다음 주기에 다시 시도
+                self.stderr.write(f"감정 통계 flush 중 오류 발생: {str(e)}")
+                if options["once"]:
+                    raise
+
+            time.sleep(interval)
@@ -0,0 +1,130 @@
+from collections import defaultdict
+from datetime import datetime
+
+import redis
+from django.core.management.base import BaseCommand
+
+from bedrock.redis import CHAT_HISTORY_IDLE_TTL, CHAT_HISTORY_MAX_LEN, chat_history_key, redis_client
+
+LEGACY_PATTERN = "chat:*"
+
+
+def legacy_stream_ids(timestamps):
+    """
+    초 단위 타임스탬프 목록을 Stream ID로 바꿉니다. (같은 초는 순번으로 구분)
+
+    :param timestamps: 'YYYY-MM-DD HH:MM:SS' 문자열 목록 (정렬된 상태)
+    :return: ["밀리초-순번", ...]
+    """
+    ids = []
+    last_ms, seq = None, 0
+    for timestamp in timestamps:
+        ms = int(datetime.strptime(timestamp, '%Y-%m-%d %H:%M:%S').timestamp() * 1000)
+        if last_ms is not None and ms <= last_ms:
+            ms, seq = last_ms, seq + 1
+        else:
+            seq = 0
+        ids.append(f"{ms}-{seq}")
+        last_ms = ms
+    return ids
+
+
+class Command(BaseCommand):
+    help = (
+        "메시지마다 하나씩 만들어진 chat:{user_id}:{timestamp} 해시를 사용자별 Stream(chat_history:{user_id})으로 옮깁니다. "
+        "KEYS 대신 SCAN을 사용하고, 이미 Stream에 있는 대화와 ID 순으로 합칩니다. (다시 실행해도 중복 없음)"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--delete", action="store_true",
+                            help="옮긴 뒤 기존 chat:* 해시 삭제")
+        parser.add_argument("--dry-run", action="store_true",
+                            help="옮길 대상만 출력하고 저장하지 않음")
+        parser.add_argument("--scan-count", type=int, default=1000,
+                            help="SCAN 한 번에 확인할 키 수")
+
+    def handle(self, *args, **options):
+        # 1. 사용자별 기존 해시 키 수집 (chat:{user_id}:{YYYY-MM-DD HH:MM:SS})
+        legacy_keys = defaultdict(list)
+        for key in redis_client.scan_iter(match=LEGACY_PATTERN, count=options["scan_count"]):
+            try:
+                _, user_id, timestamp = key.split(":", 2)
+                datetime.strptime(timestamp, '%Y-%m-%d %H:%M:%S')
+            except ValueError:
+                self.stdout.write(f"형식이 다른 키 건너뜀: {key}")
+                continue
+            legacy_keys[user_id].append((timestamp, key))
+
+        migrated = 0
+        for user_id, keys in legacy_keys.items():
+            keys.sort()
+            if options["dry_run"]:
+                self.stdout.write(f"{user_id}: {len(keys)}개")
+                migrated += len(keys)
+                continue
+
+            # 2. 해시 내용을 한 번에 읽기
+            pipe = redis_client.pipeline(transaction=False)
+            for _, key in keys:
+                pipe.hgetall(key)
+            messages = pipe.execute()
+
+            migrated += self.merge_into_stream(user_id, keys, messages)
+
+            if options["delete"]:
+                redis_client.delete(*[key for _, key in keys])
+
+        self.stdout.write(
+            f"완료: 사용자 {len(legacy_keys)}명, 대화 {migrated}개" + (" (dry-run)" if options["dry_run"] else "")
+        )
+
+    def merge_into_stream(self, user_id, keys, messages):
+        """
+        기존 대화와 이미 있는 Stream 내용을 ID 순으로 합쳐 임시 Stream에 쓴 다음 교체합니다.
+
+        Stream에 이미 있는 ID는 건너뛰므로 여러 번 실행해도 결과가 같고 (중복 없음),
+        새로 옮길 대화가 없으면 Stream을 건드리지 않습니다.
+        교체하는 동안 새 대화가 들어오면 (WATCH) 처음부터 다시 합칩니다.
+
+        :return: 새로 옮긴 대화 수
+        """
+        stream_key = chat_history_key(user_id)
+        temp_key = f"{stream_key}:migrating"
+        stream_ids = legacy_stream_ids([timestamp for timestamp, _ in keys])
+
+        while True:
+            with redis_client.pipeline(transaction=True) as pipe:
+                try:
+                    pipe.watch(stream_key)
+                    existing = pipe.xrange(stream_key)
+                    existing_ids = {message_id for message_id, _ in existing}
+
+                    # 읽기 전에 지워진 해시와 이미 옮긴 대화 제외
+                    legacy = [
+                        (stream_id, message)
+                        for stream_id, message in zip(stream_ids, messages)
+                        if message and stream_id not in existing_ids
+                    ]
+                    entries = sorted(legacy + existing, key=lambda entry: tuple(map(int, entry[0].split("-"))))
+                    # 보관 정책 적용 (최근 대화 수 제한)
+                    if CHAT_HISTORY_MAX_LEN > 0:
+                        entries = entries[-CHAT_HISTORY_MAX_LEN:]
+
+                    legacy_ids = {stream_id for stream_id, _ in legacy}
+                    added = sum(1 for message_id, _ in entries if message_id in legacy_ids)
+                    if not added:
+                        pipe.unwatch()
+                        return 0
+
+                    redis_client.delete(temp_key)
+                    for message_id, message in entries:
+                        redis_client.xadd(temp_key, message, id=message_id)
+
+                    pipe.multi()
+                    pipe.rename(temp_key, stream_key)
+                    if CHAT_HISTORY_IDLE_TTL > 0:
+                        pipe.expire(stream_key, CHAT_HISTORY_IDLE_TTL)
+                    pipe.execute()
+                    return added
+                except redis.WatchError:
+                    continue
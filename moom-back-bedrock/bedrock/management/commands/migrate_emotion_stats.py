@@ -0,0 +1,109 @@
+from collections import defaultdict
+
+from django.core.management.base import BaseCommand
+from pymongo import DeleteMany, ReplaceOne
+
+from bedrock.catalog import CatalogIndex
+from bedrock.models import ContentEmotionStats
+from bedrock.stats_buffer import unique_title_indexes
+
+
+def merge_mbti_emotions(target, source):
+    """
+    {MBTI: {감정: 횟수}} 형태의 통계를 target에 더합니다.
+    """
+    for mbti, emotions in (source or {}).items():
+        merged = target.setdefault(mbti, {})
+        for emotion, count in emotions.items():
+            merged[emotion] = merged.get(emotion, 0) + count
+    return target
+
+
+class Command(BaseCommand):
+    help = (
+        "ContentEmotionStats를 title 기준에서 content_id 기준으로 옮깁니다. "
+        "카탈로그 인덱스로 제목 변형을 하나의 문서로 합치고 title/poster_url을 함께 저장합니다. "
+        "실행 중에는 flush_emotion_stats를 멈춰 두세요. (증가분은 Redis 버퍼에 계속 쌓입니다) "
+        "flush_emotion_stats는 title unique 인덱스가 남아 있으면 시작하지 않으므로 이 명령을 먼저 실행합니다. "
+        "여러 번 실행해도 결과가 같습니다."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--dry-run", action="store_true",
+                            help="변경 내용만 출력하고 저장하지 않음")
+        parser.add_argument("--batch-size", type=int, default=500,
+                            help="bulk_write 한 번에 보낼 작업 수")
+
+    def handle(self, *args, **options):
+        dry_run = options["dry_run"]
+        collection = ContentEmotionStats._get_collection()
+
+        # 1. 기존 title unique 인덱스 제거 (같은 제목의 다른 콘텐츠가 있을 수 있음)
+        for name in unique_title_indexes():
+            self.stdout.write(f"title unique 인덱스 제거: {name}")
+            if not dry_run:
+                collection.drop_index(name)
+
+        # 2. 카탈로그 기준으로 문서 그룹화
+        catalog = CatalogIndex.build()
+        groups = defaultdict(list)
+        unresolved = 0
+
+        for doc in collection.find({}, {"content_id": 1, "title": 1, "poster_url": 1, "mbti_emotions": 1}):
+            if doc.get("content_id") is not None:
+                content = catalog.get(doc["content_id"])
+            else:
+                content = catalog.resolve(doc.get("title"))
+
+            if content:
+                groups[("content_id", content.content_id)].append((doc, content))
+            else:
+                groups[("_id", doc["_id"])].append((doc, None))
+                unresolved += 1
+
+        # 3. 그룹별로 하나의 문서로 합치기
+        operations = []
+        merged_documents = 0
+        removed_documents = 0
+
+        for docs in groups.values():
+            if docs[0][1] is None:
+                continue
+            # 이미 content_id가 있는 문서(이전 실행이나 flusher가 만든 문서)를 남김
+            docs.sort(key=lambda item: item[0].get("content_id") is None)
+            keep, content = docs[0]
+
+            mbti_emotions = {}
+            for doc, _ in docs:
+                merge_mbti_emotions(mbti_emotions, doc.get("mbti_emotions"))
+
+            # 중복 문서를 먼저 지워야 남길 문서에 content_id를 넣을 때 unique 인덱스와 충돌하지 않음
+            duplicate_ids = [doc["_id"] for doc, _ in docs[1:]]
+            if duplicate_ids:
+                titles = ", ".join(doc.get("title") or "" for doc, _ in docs)
+                self.stdout.write(f"병합: {content.content_id} ← {titles}")
+                operations.append(DeleteMany({"_id": {"$in": duplicate_ids}}))
+                removed_documents += len(duplicate_ids)
+
+            operations.append(ReplaceOne({"_id": keep["_id"]}, {
+                "content_id": content.content_id,
+                "title": content.title,
+                "poster_url": content.poster_url,
+                "mbti_emotions": mbti_emotions,
+            }))
+            merged_documents += 1
+
+            if not dry_run and len(operations) >= options["batch_size"]:
+                collection.bulk_write(operations, ordered=True)
+                operations = []
+
+        if not dry_run:
+            if operations:
+                collection.bulk_write(operations, ordered=True)
+            # 4. content_id 기준 인덱스 생성
+            ContentEmotionStats.ensure_indexes()
+
+        self.stdout.write(
+            f"완료: content_id 문서 {merged_documents}개, 병합으로 삭제 {removed_documents}개, "
+            f"카탈로그에 없는 제목 {unresolved}개" + (" (dry-run)" if dry_run else "")
+        )
@@ -0,0 +1,62 @@
+from django.core.management.base import BaseCommand
+
+from bedrock.models import ContentEmotionCounter, ContentEmotionStats
+
+
+class Command(BaseCommand):
+    help = (
+        "ContentEmotionStats.mbti_emotions에서 평탄화된 ContentEmotionCounter를 다시 만듭니다. "
+        "임시 컬렉션에 만든 뒤 이름을 바꿔 교체하므로 실행 중에도 기존 카운터는 그대로 조회됩니다. "
+        "migrate_emotion_stats 이후 한 번 실행하고, 실행 중에는 flush_emotion_stats를 멈춰 두세요."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--batch-size", type=int, default=1000,
+                            help="insert_many 한 번에 보낼 행 수")
+
+    def handle(self, *args, **options):
+        batch_size = options["batch_size"]
+        counters = ContentEmotionCounter._get_collection()
+        stats = ContentEmotionStats._get_collection()
+
+        # 이전 실행이 중간에 멈췄으면 남은 임시 컬렉션부터 정리
+        temp = counters.database[f"{counters.name}_rebuild"]
+        temp.drop()
+
+        # 교체 직후부터 인덱스를 쓸 수 있도록 임시 컬렉션에 같은 인덱스를 먼저 생성
+        for spec in ContentEmotionCounter._meta["index_specs"]:
+            temp.create_index(spec["fields"], **{key: value for key, value in spec.items() if key != "fields"})
+
+        rows = []
+        inserted = 0
+        projection = {"content_id": 1, "title": 1, "poster_url": 1, "mbti_emotions": 1, "flush_batch": 1}
+
+        for doc in stats.find({}, projection, batch_size=batch_size):
+            for mbti, emotions in (doc.get("mbti_emotions") or {}).items():
+                for emotion, count in emotions.items():
+                    row = {
+                        "title": doc["title"],
+                        "poster_url": doc.get("poster_url"),
+                        "mbti": mbti,
+                        "emotion": emotion,
+                        "count": count,
+                    }
+                    if doc.get("content_id") is not None:
+                        row["content_id"] = doc["content_id"]
+                    # 통계에 이미 반영된 묶음을 다시 처리해도 카운터에 두 번 더해지지 않도록 함께 기록
+                    if doc.get("flush_batch"):
+                        row["flush_batch"] = doc["flush_batch"]
+                    rows.append(row)
+
+            if len(rows) >= batch_size:
+                temp.insert_many(rows, ordered=False)
+                inserted += len(rows)
+                rows = []
+
+        if rows:
+            temp.insert_many(rows, ordered=False)
+            inserted += len(rows)
+
+        # 기존 카운터를 한 번에 교체 (비어 있는 구간 없음)
+        temp.rename(counters.name, dropTarget=True)
+        self.stdout.write(f"완료: 카운터 행 {inserted}개 생성")
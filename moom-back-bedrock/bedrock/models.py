@@ -76,10 +76,15 @@ class MBTIData(EmbeddedDocument):
 class ContentEmotionStats(Document):
     """
     콘텐츠별 MBTI 감정 통계를 저장하는 모델
-    
+
+    카탈로그(Contents)의 content_id를 기준으로 저장하고, 제목과 포스터는 조회용으로 함께 저장합니다.
+    카탈로그에서 찾지 못한 제목은 content_id 없이 원본 제목으로 저장됩니다.
+
     구조:
     {
+        "content_id": 123,
         "title": "영화제목",
+        "poster_url": "https://...",
         "mbti_emotions": {
             "ENFP": {
                 "기쁨": 3,
@@ -93,14 +98,20 @@ class ContentEmotionStats(Document):
         }
     }
     """
-    title = StringField(required=True, unique=True)
+    content_id = IntField()  # Contents.content_id (카탈로그에 없는 제목이면 비어 있음)
+    title = StringField(required=True)
+    poster_url = StringField()
     mbti_emotions = DictField(default={})  # MBTI별 감정 카운트를 저장
+    flush_batch = StringField()  # 마지막으로 반영된 flush 묶음 ID (재처리 시 중복 $inc 방지)
 
     meta = {
         'collection': 'content_emotion_stats',
         'indexes': [
+            {'fields': ['content_id'], 'unique': True, 'sparse': True},
             'title'
-        ]
+        ],
+        # 기존 title unique 인덱스 정리가 필요하므로 인덱스는 migrate_emotion_stats 명령에서 생성
+        'auto_create_index': False
     }
 
     def add_emotions(self, mbti: str, emotions: list):
@@ -142,4 +153,60 @@ class ContentEmotionStats(Document):
         :param emotion: 감정
         :return: 감정 카운트 (없으면 0 반환)
         """
-        return self.mbti_emotions.get(mbti, {}).get(emotion, 0)
\ No newline at end of file
+        return self.mbti_emotions.get(mbti, {}).get(emotion, 0)
+
+class ContentEmotionCounter(Document):
+    """
+    콘텐츠 × MBTI × 감정별 카운트를 한 행씩 저장하는 모델
+
+    ContentEmotionStats.mbti_emotions(중첩 DictField)는 특정 감정의 카운트로 인덱싱/정렬할 수 없으므로,
+    같은 데이터를 평탄화해서 함께 유지합니다. (감정별/MBTI별 상위 콘텐츠를 인덱스 순서대로 조회)
+
+    구조:
+    {
+        "content_id": 123,
+        "title": "영화제목",
+        "poster_url": "https://...",
+        "mbti": "ENFP",
+        "emotion": "기쁨",
+        "count": 3
+    }
+    """
+    content_id = IntField()  # Contents.content_id (카탈로그에 없는 제목이면 비어 있음)
+    title = StringField(required=True)
+    poster_url = StringField()
+    mbti = StringField(required=True)
+    emotion = StringField(required=True)
+    count = IntField(default=0)
+    flush_batch = StringField()  # 마지막으로 반영된 flush 묶음 ID (재처리 시 중복 $inc 방지)
+
+    meta = {
+        'collection': 'content_emotion_counters',
+        'indexes': [
+            {'fields': ['content_id', 'title', 'mbti', 'emotion'], 'unique': True},
+            {'fields': ['emotion', '-count']},  # 감정별 상위 콘텐츠
+            {'fields': ['mbti', 'emotion', '-count']}  # MBTI + 감정별 상위 콘텐츠
+        ]
+    }
+
+
+class ChatArchive(Document):
+    """
+    Redis 대화 기록에서 보관 한도를 넘어 밀려난 대화 묶음
+
+    data는 [{"id", "timestamp", "user_message", "bot_response"}, ...] JSON을 zstd로 압축한 값입니다.
+    """
+    user_id = StringField(required=True)
+    first_id = StringField(required=True)  # 묶음의 첫 Stream ID
+    last_id = StringField(required=True)  # 묶음의 마지막 Stream ID
+    count = IntField(default=0)
+    created_at = fields.DateTimeField()
+    data = fields.BinaryField()
+
+    meta = {
+        'collection': 'chat_archive',
+        'indexes': [
+            {'fields': ['user_id', 'first_id'], 'unique': True},
+            {'fields': ['user_id', 'last_id']},
+        ]
+    }
@@ -1,5 +1,11 @@
-import redis
+import os
+import threading
+import time
+import weakref
 from datetime import datetime
+
+import redis
+import redis.asyncio
 import environ
 
 # 환경 변수 설정
@@ -10,56 +16,282 @@ redis_host = env('REDIS_HOST', default='localhost')
 redis_port = env.int('REDIS_PORT', default=6379)
 redis_db = env.int('REDIS_DB', default=0)
 
-redis_client = redis.StrictRedis(
-    host=redis_host,
-    port=redis_port,
-    db=redis_db,
-    decode_responses=True
-)
+# 연결 풀 설정
+REDIS_MAX_CONNECTIONS = env.int('REDIS_MAX_CONNECTIONS', default=50)  # 프로세스당 최대 연결 수
+REDIS_POOL_TIMEOUT = env.float('REDIS_POOL_TIMEOUT', default=2.0)  # 풀에 빈 연결이 없을 때 기다리는 시간 (초)
+REDIS_SOCKET_TIMEOUT = env.float('REDIS_SOCKET_TIMEOUT', default=3.0)  # 명령 응답 대기 시간 (초)
+REDIS_SOCKET_CONNECT_TIMEOUT = env.float('REDIS_SOCKET_CONNECT_TIMEOUT', default=1.0)  # 연결 대기 시간 (초)
+REDIS_HEALTH_CHECK_INTERVAL = env.int('REDIS_HEALTH_CHECK_INTERVAL', default=30)  # 유휴 연결 확인 주기 (초)
+
+
+def _connection_kwargs():
+    return {
+        "host": redis_host,
+        "port": redis_port,
+        "db": redis_db,
+        "decode_responses": True,
+        "max_connections": REDIS_MAX_CONNECTIONS,
+        "timeout": REDIS_POOL_TIMEOUT,
+        "socket_timeout": REDIS_SOCKET_TIMEOUT,
+        "socket_connect_timeout": REDIS_SOCKET_CONNECT_TIMEOUT,
+        "socket_keepalive": True,
+        "health_check_interval": REDIS_HEALTH_CHECK_INTERVAL,
+    }
+
+
+class InstrumentedConnectionPool(redis.BlockingConnectionPool):
+    """
+    연결을 빌려줄 때 대기 시간과 실패 횟수를 기록하는 연결 풀
+
+    BlockingConnectionPool은 연결이 max_connections개를 넘으면 새로 만들지 않고
+    REDIS_POOL_TIMEOUT까지만 기다린 뒤 ConnectionError를 냅니다. (요청 스레드가 무한정 멈추지 않음)
+
+    bedrock / insight / calendar는 Dockerfile별로 따로 빌드되어 공통 패키지를 둘 수 없으므로
+    각 서비스의 redis.py에 같은 코드를 둡니다. 수정할 때는 세 파일을 함께 바꿔 주세요.
+    """
+
+    def __init__(self, **kwargs):
+        super().__init__(**kwargs)
+        self.checkouts = 0
+        self.checkout_errors = 0
+        self.checkout_wait_seconds = 0.0
+        self.max_checkout_wait_seconds = 0.0
+
+    def get_connection(self, *args, **kwargs):
+        started_at = time.monotonic()
+        try:
+            return super().get_connection(*args, **kwargs)
+        except redis.ConnectionError:
+            self.checkout_errors += 1
+            raise
+        finally:
+            waited = time.monotonic() - started_at
+            self.checkouts += 1
+            self.checkout_wait_seconds += waited
+            self.max_checkout_wait_seconds = max(self.max_checkout_wait_seconds, waited)
+
+    def stats(self):
+        created = len(self._connections)
+        idle = sum(1 for connection in list(self.pool.queue) if connection is not None)
+        return {
+            "max_connections": self.max_connections,
+            "created": created,
+            "in_use": created - idle,
+            "idle": idle,
+            "checkouts": self.checkouts,
+            "checkout_errors": self.checkout_errors,
+            "avg_checkout_wait_ms": round(self.checkout_wait_seconds / self.checkouts * 1000, 3) if self.checkouts else 0.0,
+            "max_checkout_wait_ms": round(self.max_checkout_wait_seconds * 1000, 3),
+        }
+
+
+_client = None
+_client_pid = None
+_async_clients = weakref.WeakKeyDictionary()  # 이벤트 루프 → (PID, 클라이언트), 루프가 사라지면 함께 제거
+_client_lock = threading.Lock()
+
+
+def get_redis_client():
+    """
+    현재 프로세스의 Redis 클라이언트를 반환합니다.
+
+    처음 사용할 때 만들고, fork된 워커(PID가 바뀐 경우)에서는 부모의 소켓을 쓰지 않도록 새로 만듭니다.
+    """
+    global _client, _client_pid
+    if _client is None or _client_pid != os.getpid():
+        with _client_lock:
+            if _client is None or _client_pid != os.getpid():
+                pool = InstrumentedConnectionPool(**_connection_kwargs())
+                _client = redis.Redis(connection_pool=pool)
+                _client_pid = os.getpid()
+    return _client
+
+
+def get_async_redis_client():
+    """
+    현재 프로세스 + 이벤트 루프의 asyncio Redis 클라이언트를 반환합니다. (async 뷰용)
+
+    asyncio 연결은 만든 이벤트 루프에 묶이므로 루프마다 따로 만들고, 루프 객체를 약한 참조 키로 두어
+    async_to_sync처럼 요청마다 루프가 바뀌어도 끝난 루프의 클라이언트가 쌓이거나 재사용되지 않습니다.
+    """
+    import asyncio
+
+    loop = asyncio.get_running_loop()
+    with _client_lock:
+        pid, client = _async_clients.get(loop, (None, None))
+        if client is None or pid != os.getpid():
+            pool = redis.asyncio.BlockingConnectionPool(**_connection_kwargs())
+            client = redis.asyncio.Redis(connection_pool=pool)
+            _async_clients[loop] = (os.getpid(), client)
+    return client
+
+
+def get_redis_pool_stats():
+    """
+    현재 프로세스의 Redis 연결 풀 사용 현황
+    """
+    stats = get_redis_client().connection_pool.stats()
+    stats["pid"] = os.getpid()
+    return stats
+
+
+class LazyRedisClient:
+    """
+    get_redis_client()로 위임하는 모듈 수준 클라이언트 (import 시점에는 연결을 만들지 않음)
+    """
+
+    def __getattr__(self, name):
+        return getattr(get_redis_client(), name)
+
+
+redis_client = LazyRedisClient()
+
+# 한 번에 조회할 수 있는 최대 대화 수
+CHAT_HISTORY_PAGE_SIZE = env.int('CHAT_HISTORY_PAGE_SIZE', default=100)
+# 사용자별로 Redis에 남겨둘 최근 대화 수 (0이면 제한 없음)
+CHAT_HISTORY_MAX_LEN = env.int('CHAT_HISTORY_MAX_LEN', default=200)
+# 마지막 대화 이후 이 시간 동안 새 대화가 없으면 기록 삭제 (초, 0이면 만료 없음)
+CHAT_HISTORY_IDLE_TTL = env.int('CHAT_HISTORY_IDLE_TTL', default=30 * 24 * 3600)
+# 밀려난 대화를 Mongo(chat_archive)에 압축 보관할지 여부
+CHAT_ARCHIVE_ENABLED = env.bool('CHAT_ARCHIVE_ENABLED', default=False)
+# 보관할 때 한 번에 밀어내는 대화 수 (보관 중에는 최대 MAX_LEN + BATCH - 1개까지 남음)
+CHAT_ARCHIVE_BATCH = env.int('CHAT_ARCHIVE_BATCH', default=20)
+# 보관이 계속 실패해도 (Mongo 장애) Stream에 남겨둘 최대 묶음 수 (넘으면 보관하지 않고 잘라냄)
+CHAT_ARCHIVE_MAX_PENDING = env.int('CHAT_ARCHIVE_MAX_PENDING', default=10)
+
+# 대화 추가 + 개수 제한 + 만료 시간 갱신을 원자적으로 실행
+# ARGV[6] > 0이면 밀려날 대화가 그 수만큼 모였을 때 가장 오래된 묶음을 반환만 하고 (보관용),
+# 보관에 성공한 뒤 XDEL로 지움 (보관이 실패하면 Stream에 남아 다음 저장 때 다시 시도)
+APPEND_CHAT_SCRIPT = """
+local message_id = redis.call("XADD", KEYS[1], "*",
+    "user_message", ARGV[1], "bot_response", ARGV[2], "timestamp", ARGV[3])
+local max_len = tonumber(ARGV[4])
+local idle_ttl = tonumber(ARGV[5])
+local archive_batch = tonumber(ARGV[6])
+local max_pending = tonumber(ARGV[7])
+
+local evicted = {}
+if max_len > 0 then
+    local overflow = redis.call("XLEN", KEYS[1]) - max_len
+    if archive_batch > 0 then
+        if overflow > archive_batch * max_pending then
+            redis.call("XTRIM", KEYS[1], "MAXLEN", max_len + archive_batch * max_pending)
+        end
+        if overflow >= archive_batch then
+            evicted = redis.call("XRANGE", KEYS[1], "-", "+", "COUNT", archive_batch)
+        end
+    elseif overflow > 0 then
+        redis.call("XTRIM", KEYS[1], "MAXLEN", max_len)
+    end
+end
+
+if idle_ttl > 0 then
+    redis.call("EXPIRE", KEYS[1], idle_ttl)
+end
+return {message_id, evicted}
+"""
+
+
+def chat_history_key(user_id):
+    """
+    사용자별 대화 기록 Stream 키
+    """
+    return f"chat_history:{user_id}"
+
 
 def save_chat_to_redis(user_id, user_message, bot_response):
     """
-    Redis에 챗봇 대화 내용을 저장합니다.
+    Redis Stream에 챗봇 대화 내용을 추가합니다. (XADD, 원자적 추가)
+
+    Stream ID는 Redis가 밀리초 시각 + 순번으로 만들기 때문에 같은 초에 저장해도 겹치지 않습니다.
+    보관 한도를 넘은 오래된 대화는 같은 스크립트 안에서 잘라내고,
+    보관을 켜면 Mongo에 압축 보관한 뒤에만 Stream에서 지웁니다.
 
     :param user_id: 사용자 ID
     :param user_message: 사용자가 보낸 메시지
     :param bot_response: 챗봇의 응답
+    :return: 메시지 ID (Stream ID)
     """
     # 현재 시간 가져오기
     timestamp = datetime.now().strftime('%Y-%m-%d %H:%M:%S')
 
-    # Redis에 저장할 키 생성
-    chat_key = f"chat:{user_id}:{timestamp}"
+    # 대화 내용 저장 (최근 CHAT_HISTORY_MAX_LEN개 유지, 만료 시간 갱신)
+    append_chat_script = get_redis_client().register_script(APPEND_CHAT_SCRIPT)  # EVALSHA (해시 계산만, 네트워크 없음)
+    message_id, evicted = append_chat_script(
+        keys=[chat_history_key(user_id)],
+        args=[
+            user_message,
+            bot_response,
+            timestamp,
+            CHAT_HISTORY_MAX_LEN,
+            CHAT_HISTORY_IDLE_TTL,
+            CHAT_ARCHIVE_BATCH if CHAT_ARCHIVE_ENABLED else 0,
+            CHAT_ARCHIVE_MAX_PENDING,
+        ],
+    )
+
+    print(f"Saved chat to Redis: {chat_history_key(user_id)} {message_id}")
+
+    # 밀려난 대화 보관 후 Stream에서 삭제 (실패해도 저장은 유지, 대화는 Stream에 남음)
+    if evicted:
+        try:
+            from .chat_archive import archive_chat_entries
+            archive_chat_entries(user_id, [
+                (entry_id, dict(zip(fields[::2], fields[1::2])))
+                for entry_id, fields in evicted
+            ])
+            redis_client.xdel(chat_history_key(user_id), *[entry_id for entry_id, _ in evicted])
+        except Exception as e:
+            print(f"대화 보관 중 오류 발생: {str(e)}")
 
-    # 대화 내용 저장
-    redis_client.hmset(chat_key, {
-        'user_message': user_message,
-        'bot_response': bot_response,
-        'timestamp': timestamp
-    })
+    return message_id
 
-    print(f"Saved chat to Redis: {chat_key}")
 
+def find_saved_chat(user_id, user_message, bot_response, message_id=None):
+    """
+    같은 대화가 이미 Stream에 저장돼 있으면 그 메시지 ID를 반환합니다. (중복 저장 방지)
+
+    message_id가 있으면 그 항목을, 없으면 가장 최근 항목을 확인하고 내용까지 같을 때만 저장된 것으로 봅니다.
 
-def get_chat_history_from_redis(user_id):
+    :param message_id: QuestionView가 반환한 메시지 ID (클라이언트가 다시 보낸 값)
+    :return: 메시지 ID (저장된 적 없으면 None)
     """
-    Redis에서 특정 사용자의 대화 기록을 가져옵니다.
+    key = chat_history_key(user_id)
+    try:
+        if message_id:
+            entries = redis_client.xrange(key, min=message_id, max=message_id, count=1)
+        else:
+            entries = redis_client.xrevrange(key, max="+", min="-", count=1)
+    except redis.ResponseError:
+        return None  # 잘못된 형식의 메시지 ID
+
+    for entry_id, chat_data in entries:
+        if chat_data.get("user_message") == user_message and chat_data.get("bot_response") == bot_response:
+            return entry_id
+    return None
+
+
+def get_chat_history_from_redis(user_id, after=None, count=CHAT_HISTORY_PAGE_SIZE):
+    """
+    Redis Stream에서 특정 사용자의 대화 기록을 오래된 순으로 가져옵니다. (XRANGE 한 번)
 
     :param user_id: 사용자 ID
+    :param after: 이 메시지 ID 이후부터 조회 (커서, 없으면 처음부터)
+    :param count: 최대 개수
     :return: 대화 기록 리스트
     """
-    # Redis에서 해당 사용자의 모든 대화 키 가져오기
-    chat_keys = redis_client.keys(f"chat:{user_id}:*")
+    start = f"({after}" if after else "-"
+    entries = redis_client.xrange(chat_history_key(user_id), min=start, max="+", count=count)
+    return _format_chat_history(entries)
 
-    # 대화 기록 리스트 생성
-    chat_history = []
 
-    for key in sorted(chat_keys):
-        chat_data = redis_client.hgetall(key)
-        chat_history.append({
+def _format_chat_history(entries):
+    return [
+        {
+            'id': message_id,
             'timestamp': chat_data.get('timestamp'),
             'user_message': chat_data.get('user_message'),
             'bot_response': chat_data.get('bot_response')
-        })
-
-    return chat_history
\ No newline at end of file
+        }
+        for message_id, chat_data in entries
+    ]
@@ -0,0 +1,278 @@
+import json
+import time
+import uuid
+from collections import defaultdict
+
+import environ
+from pymongo import UpdateOne
+
+from .catalog import get_catalog_index
+from .models import ContentEmotionCounter, ContentEmotionStats
+from .redis import redis_client
+
+# 환경 변수 설정
+env = environ.Env()
+
+# flush 주기 (초)
+STATS_FLUSH_INTERVAL = env.float('STATS_FLUSH_INTERVAL', default=5.0)
+
+# Redis 키
+PENDING_KEY = "stats:emotion:pending"  # 요청 경로에서 증가분을 쌓는 해시
+PROCESSING_KEY = "stats:emotion:processing"  # flusher가 처리 중인 해시 (크래시 시 재처리)
+PROCESSING_ID_KEY = "stats:emotion:processing:id"  # 처리 중인 묶음 ID (Mongo 문서의 flush_batch와 비교)
+METRICS_KEY = "stats:emotion:metrics"  # flusher 지연/처리량 지표
+
+# pending → processing으로 옮기면서 묶음 ID 발급 (이미 처리 중인 묶음이 있으면 그 ID 반환)
+CLAIM_BATCH_SCRIPT = """
+if redis.call("EXISTS", KEYS[2]) == 0 then
+    if redis.call("EXISTS", KEYS[1]) == 0 then
+        return false
+    end
+    redis.call("RENAME", KEYS[1], KEYS[2])
+    redis.call("SET", KEYS[3], ARGV[1])
+    local oldest = redis.call("HGET", KEYS[4], "oldest_pending_at")
+    redis.call("HDEL", KEYS[4], "oldest_pending_at")
+    if oldest then
+        redis.call("HSET", KEYS[4], "processing_oldest_at", oldest)
+    end
+end
+redis.call("SET", KEYS[3], ARGV[1], "NX")
+return redis.call("GET", KEYS[3])
+"""
+
+# 묶음 ID가 같을 때만 processing 삭제 (다른 flusher가 이미 끝내고 새 묶음을 가져간 경우 보호)
+FINISH_BATCH_SCRIPT = """
+if redis.call("GET", KEYS[2]) ~= ARGV[1] then
+    return 0
+end
+redis.call("DEL", KEYS[1], KEYS[2])
+redis.call("HDEL", KEYS[3], "processing_oldest_at")
+return 1
+"""
+
+
+def is_valid_field_name(name):
+    """
+    mbti_emotions.{MBTI}.{감정} $inc 경로에 그대로 쓸 수 있는 이름인지 확인합니다.
+
+    '.'이 들어가면 하위 문서가 생기고, '$'로 시작하거나 비어 있으면 업데이트 전체가 실패합니다.
+    """
+    return isinstance(name, str) and bool(name) and "." not in name and not name.startswith("$") and "\0" not in name
+
+
+def buffer_emotion_stats(title, mbti, emotions):
+    """
+    감정 통계 증가분을 Redis 해시에 적재합니다. (write-behind)
+
+    Mongo에는 flush_emotion_stats()가 주기적으로 한 번에 반영합니다.
+    필드 이름으로 쓸 수 없는 MBTI/감정은 적재하지 않습니다. (is_valid_field_name)
+
+    :param title: 추천 콘텐츠 제목
+    :param mbti: MBTI 유형 (예: "ENFP")
+    :param emotions: 감정 리스트 (예: ["기쁨", "슬픔"])
+    """
+    if not is_valid_field_name(mbti):
+        print(f"감정 통계 적재 생략 (잘못된 MBTI): {mbti!r}")
+        return
+    emotions = [emotion for emotion in emotions if is_valid_field_name(emotion)]
+    if not emotions:
+        return
+
+    pipe = redis_client.pipeline(transaction=True)
+    for emotion in emotions:
+        field = json.dumps([title, mbti, emotion], ensure_ascii=False)
+        pipe.hincrby(PENDING_KEY, field, 1)
+    # 아직 반영되지 않은 가장 오래된 증가분의 시각 (lag 계산용)
+    pipe.hsetnx(METRICS_KEY, "oldest_pending_at", time.time())
+    pipe.execute()
+
+
+def _claim_batch():
+    """
+    처리할 증가분 묶음을 가져옵니다.
+
+    이전 flush가 bulk_write 이후 삭제 전에 죽었다면 processing 해시가 남아 있으므로
+    같은 묶음 ID로 그것을 먼저 다시 처리합니다.
+
+    :return: (증가분 해시, 묶음 ID, 가장 오래된 증가분 시각)
+    """
+    claim_batch_script = redis_client.register_script(CLAIM_BATCH_SCRIPT)
+    batch_id = claim_batch_script(
+        keys=[PENDING_KEY, PROCESSING_KEY, PROCESSING_ID_KEY, METRICS_KEY],
+        args=[uuid.uuid4().hex],
+    )
+    if batch_id is None:
+        return {}, None, None
+
+    batch = redis_client.hgetall(PROCESSING_KEY)
+    oldest = redis_client.hget(METRICS_KEY, "processing_oldest_at")
+    return batch, batch_id, float(oldest) if oldest is not None else None
+
+
+def _build_stats_operations(increments, batch_id):
+    """
+    제목별 증가분을 카탈로그 content_id 기준으로 합쳐 upsert 목록을 만듭니다.
+
+    같은 콘텐츠의 제목 변형은 하나의 문서로 합쳐지고, 카탈로그에 없는 제목은
+    content_id 없이 원본 제목 문서에 반영됩니다. ContentEmotionStats(중첩 구조)와
+    ContentEmotionCounter(평탄화 구조)를 같은 증가분으로 함께 갱신합니다.
+
+    두 컬렉션 모두 문서를 먼저 만들어 두고 (upsert), flush_batch가 batch_id가 아닌 문서에만
+    $inc와 함께 flush_batch를 기록하므로 같은 묶음을 다시 처리해도 두 번 더해지지 않습니다.
+
+    :param increments: {제목: {(MBTI, 감정): 증가분}}
+    :param batch_id: 묶음 ID
+    :return: (ContentEmotionStats UpdateOne 리스트, ContentEmotionCounter UpdateOne 리스트)
+    """
+    catalog = get_catalog_index()
+    merged = {}
+
+    for title, inc in increments.items():
+        content = catalog.resolve(title)
+        if content:
+            key = ("content_id", content.content_id)
+            if key not in merged:
+                merged[key] = (
+                    {"content_id": content.content_id},
+                    {"title": content.title, "poster_url": content.poster_url},
+                    defaultdict(int),
+                )
+        else:
+            key = ("title", title)
+            if key not in merged:
+                merged[key] = ({"title": title, "content_id": {"$exists": False}}, None, defaultdict(int))
+
+        for mbti_emotion, value in inc.items():
+            merged[key][2][mbti_emotion] += value
+
+    stats_ensure_operations = []
+    stats_operations = []
+    counter_ensure_operations = []
+    counter_operations = []
+    for query, fields, inc in merged.values():
+        stats_ensure_operations.append(
+            UpdateOne(query, {"$set": fields} if fields else {"$setOnInsert": {"mbti_emotions": {}}}, upsert=True)
+        )
+        stats_operations.append(UpdateOne(dict(query, flush_batch={"$ne": batch_id}), {
+            "$inc": {f"mbti_emotions.{mbti}.{emotion}": value for (mbti, emotion), value in inc.items()},
+            "$set": {"flush_batch": batch_id},
+        }))
+
+        for (mbti, emotion), value in inc.items():
+            counter_query = dict(query, mbti=mbti, emotion=emotion)
+            counter_ensure_operations.append(
+                UpdateOne(counter_query, {"$set": fields} if fields else {"$setOnInsert": {"count": 0}}, upsert=True)
+            )
+            counter_operations.append(UpdateOne(dict(counter_query, flush_batch={"$ne": batch_id}), {
+                "$inc": {"count": value},
+                "$set": {"flush_batch": batch_id},
+            }))
+
+    return stats_ensure_operations + stats_operations, counter_ensure_operations + counter_operations
+
+
+def flush_emotion_stats():
+    """
+    버퍼에 쌓인 감정 통계 증가분을 content_id별로 합쳐서 ContentEmotionStats에 한 번의 bulk_write로 반영합니다.
+
+    같은 콘텐츠에 대한 증가분은 하나의 $inc 업데이트로 합쳐지므로,
+    인기 콘텐츠도 flush 주기당 한 번만 Mongo에 기록됩니다.
+    평탄화된 ContentEmotionCounter도 같은 주기에 한 번의 bulk_write로 함께 갱신합니다.
+
+    묶음마다 ID를 붙여 Mongo 문서에 기록하므로, 반영 후 삭제 전에 죽거나 여러 flusher가
+    같은 묶음을 처리해도 증가분은 한 번만 반영됩니다.
+
+    :return: 반영한 Mongo 업데이트 수
+    """
+    started_at = time.time()
+    batch, batch_id, oldest_pending_at = _claim_batch()
+
+    if not batch:
+        redis_client.hset(METRICS_KEY, "last_flush_at", started_at)
+        return 0
+
+    # 제목별 증가분 병합
+    increments = defaultdict(lambda: defaultdict(int))
+    total_increments = 0
+    for field, value in batch.items():
+        title, mbti, emotion = json.loads(field)
+        if not (is_valid_field_name(mbti) and is_valid_field_name(emotion)):
+            # 검증 이전에 쌓인 증가분이 묶음 전체의 bulk_write를 실패시키지 않도록 제외
+            print(f"감정 통계 증가분 제외 (잘못된 필드 이름): {field}")
+            continue
+        increments[title][(mbti, emotion)] += int(value)
+        total_increments += int(value)
+
+    stats_operations, counter_operations = _build_stats_operations(increments, batch_id)
+    # 문서 생성(upsert) 후 증가분 반영 순서를 지키도록 ordered=True
+    if stats_operations:
+        ContentEmotionStats._get_collection().bulk_write(stats_operations, ordered=True)
+    if counter_operations:
+        ContentEmotionCounter._get_collection().bulk_write(counter_operations, ordered=True)
+    operation_count = len(stats_operations) + len(counter_operations)
+
+    # 반영이 끝난 묶음 삭제 (다른 flusher가 먼저 끝냈으면 지표도 그쪽에서 기록)
+    finish_batch_script = redis_client.register_script(FINISH_BATCH_SCRIPT)
+    if not finish_batch_script(keys=[PROCESSING_KEY, PROCESSING_ID_KEY, METRICS_KEY], args=[batch_id]):
+        return operation_count
+
+    # 지표 기록
+    finished_at = time.time()
+    pipe = redis_client.pipeline(transaction=True)
+    pipe.hset(METRICS_KEY, mapping={
+        "last_flush_at": finished_at,
+        "last_flush_duration_ms": round((finished_at - started_at) * 1000, 2),
+        "last_flush_lag_seconds": round(finished_at - oldest_pending_at, 3) if oldest_pending_at else 0,
+        "last_flush_operations": operation_count,
+        "last_flush_increments": total_increments,
+    })
+    pipe.hincrby(METRICS_KEY, "total_flushes", 1)
+    pipe.hincrby(METRICS_KEY, "total_operations", operation_count)
+    pipe.execute()
+
+    print(f"감정 통계 flush 완료: 업데이트={operation_count}, 증가분={total_increments}")
+    return operation_count
+
+
+def unique_title_indexes():
+    """
+    ContentEmotionStats에 남아 있는 기존 title unique 인덱스 이름 목록
+
+    이 인덱스가 있으면 같은 제목의 content_id 문서와 제목 문서를 함께 둘 수 없으므로,
+    migrate_emotion_stats로 제거하기 전에는 flusher를 실행하지 않습니다.
+    """
+    return [
+        name
+        for name, info in ContentEmotionStats._get_collection().index_information().items()
+        if info.get("unique") and info.get("key") == [("title", 1)]
+    ]
+
+
+def get_flusher_metrics():
+    """
+    write-behind flusher의 지연 및 처리량 지표를 조회합니다.
+
+    :return: 지표 딕셔너리 (current_lag_seconds는 아직 반영되지 않은 가장 오래된 증가분의 대기 시간)
+    """
+    pipe = redis_client.pipeline(transaction=False)
+    pipe.hgetall(METRICS_KEY)
+    pipe.hlen(PENDING_KEY)
+    pipe.hlen(PROCESSING_KEY)
+    metrics, pending_fields, processing_fields = pipe.execute()
+
+    now = time.time()
+    oldest = metrics.get("processing_oldest_at") or metrics.get("oldest_pending_at")
+    last_flush_at = metrics.get("last_flush_at")
+
+    return {
+        "pending_fields": pending_fields,
+        "processing_fields": processing_fields,
+        "current_lag_seconds": round(now - float(oldest), 3) if oldest else 0,
+        "seconds_since_last_flush": round(now - float(last_flush_at), 3) if last_flush_at else None,
+        "last_flush_duration_ms": float(metrics.get("last_flush_duration_ms", 0)),
+        "last_flush_lag_seconds": float(metrics.get("last_flush_lag_seconds", 0)),
+        "last_flush_operations": int(metrics.get("last_flush_operations", 0)),
+        "last_flush_increments": int(metrics.get("last_flush_increments", 0)),
+        "total_flushes": int(metrics.get("total_flushes", 0)),
+        "total_operations": int(metrics.get("total_operations", 0)),
+    }
@@ -1,3 +1,316 @@
-from django.test import TestCase
+import sys
+from collections import namedtuple
+from unittest import SkipTest, mock
 
-# Create your tests here.
+from django.test import SimpleTestCase
+
+from . import redis as chat_redis
+from . import chat_context, stats_buffer, trending
+from .catalog import CatalogEntry, CatalogIndex, subscribed_platforms
+
+
+def fake_redis():
+    """
+    Redis 로직 테스트용 fakeredis 클라이언트 (Lua 스크립트는 lupa 필요, 없으면 건너뜀)
+    """
+    try:
+        import fakeredis
+    except ImportError as e:
+        raise SkipTest(f"fakeredis가 설치되어 있지 않습니다: {e}")
+    return fakeredis.FakeRedis(decode_responses=True)
+
+
+class RedisTestCase(SimpleTestCase):
+    """
+    bedrock.redis의 클라이언트를 fakeredis로 바꿔서 실행하는 테스트
+    """
+
+    def setUp(self):
+        self.redis = fake_redis()
+        for patcher in (
+            mock.patch.object(chat_redis, "redis_client", self.redis),
+            mock.patch.object(chat_redis, "get_redis_client", return_value=self.redis),
+        ):
+            patcher.start()
+            self.addCleanup(patcher.stop)
+
+
+def mongomock_collection():
+    """
+    bulk_write를 지원하는 mongomock 컬렉션 (mongomock 미설치 시 건너뜀)
+    """
+    try:
+        import mongomock
+    except ImportError as e:
+        raise SkipTest(f"mongomock이 설치되어 있지 않습니다: {e}")
+    return MongomockBulkCollection(mongomock.MongoClient().db.collection)
+
+
+class MongomockBulkCollection:
+    """
+    mongomock의 bulk_write는 pymongo 4.9+ UpdateOne의 인자(sort 등)를 받지 못하므로
+    각 연산을 순서대로 update_one으로 적용합니다. (ordered=True와 같음)
+    """
+
+    def __init__(self, collection):
+        self.collection = collection
+
+    def __getattr__(self, name):
+        return getattr(self.collection, name)
+
+    def add_update(self, selector, document, multi=False, upsert=False, **kwargs):
+        self.collection.update_one(selector, document, upsert=upsert)
+
+    def bulk_write(self, operations, ordered=True):
+        for operation in operations:
+            operation._add_to_bulk(self)
+
+
+CatalogContent = namedtuple("CatalogContent", ["content_id", "title", "poster_url"])
+
+
+class EmotionStatsFlushTest(RedisTestCase):
+    """
+    write-behind 감정 통계 flush가 같은 묶음을 두 번 처리해도 한 번만 반영하는지 확인합니다. (fakeredis + mongomock)
+    """
+
+    def setUp(self):
+        super().setUp()
+        self.stats = mongomock_collection()
+        self.counters = mongomock_collection()
+        catalog = mock.Mock()
+        catalog.resolve.side_effect = lambda title: CatalogContent(1, "A", "a.jpg") if title == "A" else None
+        for patcher in (
+            mock.patch.object(stats_buffer, "redis_client", self.redis),
+            mock.patch.object(stats_buffer, "get_catalog_index", return_value=catalog),
+            mock.patch.object(stats_buffer, "ContentEmotionStats", **{"_get_collection.return_value": self.stats}),
+            mock.patch.object(stats_buffer, "ContentEmotionCounter", **{"_get_collection.return_value": self.counters}),
+        ):
+            patcher.start()
+            self.addCleanup(patcher.stop)
+
+    def stats_counts(self):
+        return {(doc.get("content_id"), doc["title"]): doc["mbti_emotions"] for doc in self.stats.find()}
+
+    def counter_counts(self):
+        return sorted((doc["title"], doc.get("content_id"), doc["mbti"], doc["emotion"], doc["count"])
+                      for doc in self.counters.find())
+
+    def test_same_batch_flushed_twice_is_applied_once(self):
+        stats_buffer.buffer_emotion_stats("A", "ENFP", ["기쁨", "슬픔"])
+        stats_buffer.buffer_emotion_stats("미등록 콘텐츠", "INTJ", ["기쁨"])
+
+        # Mongo 반영 후 묶음 삭제 전에 중단된 경우 (processing 해시와 묶음 ID가 남음)
+        with mock.patch.object(stats_buffer, "FINISH_BATCH_SCRIPT", "return 0"):
+            stats_buffer.flush_emotion_stats()
+        self.assertTrue(self.redis.exists(stats_buffer.PROCESSING_KEY))
+
+        # 다음 flush는 같은 묶음 ID로 다시 처리하지만 flush_batch가 같으므로 더하지 않음
+        stats_buffer.flush_emotion_stats()
+        self.assertFalse(self.redis.exists(stats_buffer.PROCESSING_KEY))
+        self.assertFalse(self.redis.exists(stats_buffer.PROCESSING_ID_KEY))
+
+        expected_stats = {(1, "A"): {"ENFP": {"기쁨": 1, "슬픔": 1}}, (None, "미등록 콘텐츠"): {"INTJ": {"기쁨": 1}}}
+        expected_counters = [
+            ("A", 1, "ENFP", "기쁨", 1), ("A", 1, "ENFP", "슬픔", 1), ("미등록 콘텐츠", None, "INTJ", "기쁨", 1),
+        ]
+        self.assertEqual(self.stats_counts(), expected_stats)
+        self.assertEqual(self.counter_counts(), expected_counters)
+
+        # 새 묶음은 새 ID로 다시 더해짐
+        stats_buffer.buffer_emotion_stats("A", "ENFP", ["기쁨"])
+        stats_buffer.flush_emotion_stats()
+        self.assertEqual(self.stats_counts()[(1, "A")], {"ENFP": {"기쁨": 2, "슬픔": 1}})
+        self.assertEqual(self.counter_counts()[0], ("A", 1, "ENFP", "기쁨", 2))
+
+    def test_invalid_field_names_are_not_used_as_paths(self):
+        stats_buffer.buffer_emotion_stats("A", "ENFP", ["기쁨", "a.b", "$x", ""])
+        stats_buffer.buffer_emotion_stats("A", "EN.FP", ["기쁨"])
+        self.assertEqual(self.redis.hlen(stats_buffer.PENDING_KEY), 1)
+
+        # 검증 이전에 쌓인 증가분은 flush에서 제외 (나머지는 정상 반영)
+        self.redis.hincrby(stats_buffer.PENDING_KEY, '["A", "ENFP", "$where"]', 1)
+        stats_buffer.flush_emotion_stats()
+        self.assertEqual(self.stats_counts(), {(1, "A"): {"ENFP": {"기쁨": 1}}})
+        self.assertFalse(self.redis.exists(stats_buffer.PROCESSING_KEY))
+
+
+class TrendingTest(RedisTestCase):
+    """
+    감쇠 가중치 Lua 스크립트가 전체/감정별/MBTI별 점수를 같은 비율로 유지하는지 확인합니다. (fakeredis + lupa)
+    """
+
+    def setUp(self):
+        super().setUp()
+        catalog = mock.Mock()
+        catalog.resolve.return_value = None
+        for patcher in (
+            mock.patch.object(trending, "redis_client", self.redis),
+            mock.patch.object(trending, "get_catalog_index", return_value=catalog),
+        ):
+            patcher.start()
+            self.addCleanup(patcher.stop)
+
+    def scores(self, key):
+        return dict(self.redis.zrange(key, 0, -1, withscores=True))
+
+    def test_records_without_mbti_and_dedupes_emotions(self):
+        trending.record_recommendation("A", None, ["기쁨", "기쁨", "슬픔"], now=0)
+        self.assertEqual(self.scores(trending.TRENDING_ALL_KEY), {"A": 1.0})
+        self.assertEqual(self.scores(trending.trending_emotion_key("기쁨")), {"A": 1.0})
+        self.assertEqual(self.scores(trending.trending_emotion_key("슬픔")), {"A": 1.0})
+        self.assertEqual(self.redis.smembers(trending.TRENDING_KEYS_KEY), {
+            trending.TRENDING_ALL_KEY, trending.trending_emotion_key("기쁨"), trending.trending_emotion_key("슬픔"),
+        })
+
+    def test_weight_doubles_every_half_life(self):
+        half_life = trending.TRENDING_HALF_LIFE
+        trending.record_recommendation("A", "ENFP", ["기쁨"], now=0)
+        trending.record_recommendation("B", "ENFP", ["기쁨"], now=half_life)
+        self.assertEqual(self.scores(trending.trending_mbti_key("ENFP")), {"A": 1.0, "B": 2.0})
+
+    def test_rebase_scales_keys_not_passed_by_caller(self):
+        half_life = trending.TRENDING_HALF_LIFE
+        trending.record_recommendation("A", "ENFP", ["기쁨"], now=0)
+        trending.record_recommendation("B", None, ["슬픔"], now=half_life * 10)
+
+        # 재조정 시점의 호출은 기쁨/ENFP 키를 모르지만, 스크립트가 nil을 반환하면 키 목록을 넣어 다시 실행
+        now = half_life * (trending.TRENDING_REBASE_EXPONENT + 1)
+        trending.record_recommendation("C", None, [], now=now)
+
+        self.assertEqual(float(self.redis.get(trending.TRENDING_EPOCH_KEY)), now)
+        all_scores = self.scores(trending.TRENDING_ALL_KEY)
+        self.assertEqual(all_scores["C"], 1.0)
+        # 재조정 후에도 점수 비율 유지 (A: 2^-33, B: 2^-23)
+        self.assertAlmostEqual(all_scores["A"] * 2 ** 33, 1.0)
+        self.assertAlmostEqual(all_scores["B"] * 2 ** 23, 1.0)
+        self.assertAlmostEqual(self.scores(trending.trending_emotion_key("기쁨"))["A"] * 2 ** 33, 1.0)
+        self.assertAlmostEqual(self.scores(trending.trending_mbti_key("ENFP"))["A"] * 2 ** 33, 1.0)
+
+
+class ChatSaveDedupeTest(RedisTestCase):
+    """
+    QuestionView가 저장한 대화를 ChatSaveView가 다시 받았을 때만 저장을 생략하는지 확인합니다.
+    """
+
+    def test_finds_chat_saved_by_question_view(self):
+        message_id = chat_redis.save_chat_to_redis("user-1", "질문", "답변")
+        self.assertEqual(chat_redis.find_saved_chat("user-1", "질문", "답변", message_id), message_id)
+        # message_id를 보내지 않는 기존 클라이언트는 가장 최근 대화와 비교
+        self.assertEqual(chat_redis.find_saved_chat("user-1", "질문", "답변"), message_id)
+
+    def test_unsaved_chat_is_not_skipped(self):
+        # QuestionView의 저장이 실패한 경우 (Stream에 없음)
+        self.assertIsNone(chat_redis.find_saved_chat("user-1", "질문", "답변"))
+
+        message_id = chat_redis.save_chat_to_redis("user-1", "이전 질문", "이전 답변")
+        self.assertIsNone(chat_redis.find_saved_chat("user-1", "질문", "답변"))
+        self.assertIsNone(chat_redis.find_saved_chat("user-1", "질문", "답변", message_id))
+        self.assertIsNone(chat_redis.find_saved_chat("user-2", "이전 질문", "이전 답변", message_id))
+        self.assertIsNone(chat_redis.find_saved_chat("user-1", "질문", "답변", "잘못된-id"))
+
+
+class CatalogIndexTest(SimpleTestCase):
+    """
+    같은 제목이 여러 플랫폼에 있을 때 구독 플랫폼의 콘텐츠를 고르는지 확인합니다.
+    """
+
+    def setUp(self):
+        self.index = CatalogIndex([
+            CatalogEntry(1, "더 글로리", "1.jpg", "Netflix"),
+            CatalogEntry(2, "더 글로리", "2.jpg", "Watcha"),
+            CatalogEntry(3, "더 글로리 파트2", "3.jpg", "Watcha"),
+        ])
+
+    def test_prefers_subscribed_platform(self):
+        platforms = subscribed_platforms(" watcha , ")
+        self.assertEqual(platforms, ["watcha"])
+        self.assertEqual(self.index.resolve("더 글로리", platforms).content_id, 2)
+        self.assertEqual(self.index.resolve("더 글로리", ["Tving", "Watcha"]).content_id, 2)
+
+    def test_falls_back_to_title_index(self):
+        self.assertEqual(self.index.resolve("더 글로리").content_id, 1)
+        self.assertEqual(self.index.resolve("더 글로리", ["Tving"]).content_id, 1)
+        self.assertEqual(self.index.resolve("더 글로리 파트", ["Tving"]).content_id, 3)
+        self.assertIsNone(self.index.resolve("없는 제목", ["Watcha"]))
+
+
+class InlineThread:
+    """
+    start()에서 바로 실행하는 Thread 대체 (백그라운드 작업을 테스트에서 순서대로 확인)
+    """
+
+    def __init__(self, target, args=(), kwargs=None, **_):
+        self.target, self.args, self.kwargs = target, args, kwargs or {}
+
+    def start(self):
+        self.target(*self.args, **self.kwargs)
+
+
+class ChatSummaryTest(RedisTestCase):
+    """
+    창 밖으로 밀려난 대화가 CHAT_SUMMARY_BATCH개 쌓였을 때만, 락을 잡은 요청 하나가 요약하는지 확인합니다.
+    """
+
+    def setUp(self):
+        super().setUp()
+        self.summarize = mock.Mock(side_effect=lambda previous, turns: f"{previous}+{len(turns)}")
+        for patcher in (
+            mock.patch.object(chat_context, "redis_client", self.redis),
+            mock.patch.object(chat_context.threading, "Thread", InlineThread),
+            mock.patch.dict(sys.modules, {"bedrock.bedrock": mock.Mock(bedrock_summarize_chat=self.summarize)}),
+        ):
+            patcher.start()
+            self.addCleanup(patcher.stop)
+        self.lock_key = f"{chat_context.chat_summary_key('user-1')}:lock"
+
+    def save_chats(self, count, start=0):
+        return [chat_redis.save_chat_to_redis("user-1", f"질문{i}", f"답변{i}") for i in range(start, start + count)]
+
+    def summary(self):
+        return self.redis.hgetall(chat_context.chat_summary_key("user-1"))
+
+    def test_summarizes_only_after_a_full_batch_left_the_window(self):
+        batch = chat_context.CHAT_SUMMARY_BATCH
+        ids = self.save_chats(chat_context.CHAT_CONTEXT_TURNS + batch - 1)
+        chat_context.build_chat_context("user-1")
+        self.summarize.assert_not_called()
+
+        ids += self.save_chats(1, start=len(ids))
+        turns, summary = chat_context.build_chat_context("user-1")
+        self.assertIsNone(summary)  # 요약은 백그라운드에서 만들어져 다음 요청부터 사용
+        self.assertEqual(len(turns), chat_context.CHAT_CONTEXT_TURNS)
+        self.summarize.assert_called_once_with("", [(f"질문{i}", f"답변{i}") for i in range(batch)])
+        self.assertEqual(self.summary(), {"summary": f"+{batch}", "upto_id": ids[batch - 1]})
+        self.assertFalse(self.redis.exists(self.lock_key))
+
+        # 요약 이후로 다시 한 묶음이 쌓이기 전에는 요약하지 않음
+        _, summary = chat_context.build_chat_context("user-1")
+        self.assertEqual(summary, f"+{batch}")
+        self.save_chats(batch - 1, start=len(ids))
+        chat_context.build_chat_context("user-1")
+        self.assertEqual(self.summarize.call_count, 1)
+
+    def test_skips_while_another_request_holds_the_lock(self):
+        self.save_chats(chat_context.CHAT_CONTEXT_TURNS + chat_context.CHAT_SUMMARY_BATCH)
+        self.redis.set(self.lock_key, "other-request")
+        chat_context.build_chat_context("user-1")
+        self.summarize.assert_not_called()
+        self.assertEqual(self.redis.get(self.lock_key), "other-request")
+
+    def test_lock_is_released_only_by_its_owner(self):
+        ids = self.save_chats(chat_context.CHAT_CONTEXT_TURNS + chat_context.CHAT_SUMMARY_BATCH)
+        window_start_id = ids[chat_context.CHAT_SUMMARY_BATCH]
+
+        # 요약이 락 TTL보다 오래 걸려 다른 요청이 락을 다시 잡은 경우
+        self.redis.set(self.lock_key, "other-request")
+        chat_context._refresh_summary("user-1", window_start_id, self.lock_key, "expired-token")
+        self.assertEqual(self.redis.get(self.lock_key), "other-request")
+
+        # 요약 실패 시 요약은 그대로, 락은 해제
+        self.redis.set(self.lock_key, "mine")
+        self.summarize.side_effect = RuntimeError("Bedrock 오류")
+        chat_context._refresh_summary("user-1", window_start_id, self.lock_key, "mine")
+        self.assertFalse(self.redis.exists(self.lock_key))
+        self.assertEqual(self.summary(), {"summary": f"+{chat_context.CHAT_SUMMARY_BATCH}",
+                                          "upto_id": ids[chat_context.CHAT_SUMMARY_BATCH - 1]})
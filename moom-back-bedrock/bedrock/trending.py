@@ -0,0 +1,124 @@
+import time
+
+import environ
+
+from .catalog import get_catalog_index
+from .redis import redis_client
+
+# 환경 변수 설정
+env = environ.Env()
+
+# 점수가 절반으로 줄어드는 시간 (초, insight 서비스와 같은 값을 사용)
+TRENDING_HALF_LIFE = env.float('TRENDING_HALF_LIFE', default=6 * 3600)
+# 키별로 남겨둘 최대 콘텐츠 수
+TRENDING_MAX_MEMBERS = env.int('TRENDING_MAX_MEMBERS', default=1000)
+# 가중치 지수가 이 값을 넘으면 모든 점수를 다시 맞춤 (float 정밀도 유지)
+TRENDING_REBASE_EXPONENT = 32
+
+# Redis 키
+TRENDING_EPOCH_KEY = "trending:epoch"  # 가중치 기준 시각 t0
+TRENDING_KEYS_KEY = "trending:keys"  # 재조정 대상 sorted set 목록
+TRENDING_ALL_KEY = "trending:all"
+
+
+def trending_emotion_key(emotion):
+    return f"trending:emotion:{emotion}"
+
+
+def trending_mbti_key(mbti):
+    return f"trending:mbti:{mbti}"
+
+
+# 감쇠 가중치 증가 (Redis에서 원자적으로 실행)
+#
+# 시각 t의 추천은 2^((t - t0) / half_life)만큼 더하므로, 모든 점수에 같은 비율로 감쇠가 적용된 것과 같습니다.
+# 지수가 커지면 기존 점수에 2^-(지수)를 곱하고 t0를 현재 시각으로 옮깁니다.
+#
+# KEYS: epoch, 키 목록, 증가할 키 ARGV[6]개, 재조정만 할 나머지 키
+# 스크립트가 쓰는 키는 모두 KEYS로 받습니다. (클러스터 슬롯 확인, 스크립트 캐시 규칙)
+# 재조정할 때 키 목록에 KEYS로 받지 않은 키가 있으면 아무것도 바꾸지 않고 nil을 반환 → 호출하는 쪽이 키 목록을 넣어 다시 실행
+RECORD_SCRIPT = """
+local now = tonumber(ARGV[1])
+local half_life = tonumber(ARGV[2])
+local member = ARGV[3]
+local max_members = tonumber(ARGV[4])
+local rebase_exponent = tonumber(ARGV[5])
+local target_count = tonumber(ARGV[6])
+
+local epoch = tonumber(redis.call("GET", KEYS[1]))
+if not epoch then
+    epoch = now
+    redis.call("SET", KEYS[1], epoch)
+end
+
+local exponent = (now - epoch) / half_life
+if exponent > rebase_exponent then
+    local declared = {}
+    for i = 3, #KEYS do
+        declared[KEYS[i]] = true
+    end
+    for _, key in ipairs(redis.call("SMEMBERS", KEYS[2])) do
+        if not declared[key] then
+            return false
+        end
+    end
+
+    local factor = 2 ^ (-exponent)
+    for i = 3, #KEYS do
+        redis.call("ZUNIONSTORE", KEYS[i], 1, KEYS[i], "WEIGHTS", factor)
+    end
+    epoch = now
+    exponent = 0
+    redis.call("SET", KEYS[1], epoch)
+end
+
+local weight = 2 ^ exponent
+for i = 3, 2 + target_count do
+    redis.call("ZINCRBY", KEYS[i], weight, member)
+    redis.call("SADD", KEYS[2], KEYS[i])
+    redis.call("ZREMRANGEBYRANK", KEYS[i], 0, -(max_members + 1))
+end
+return tostring(weight)
+"""
+# 키 목록을 넣어 다시 실행하는 최대 횟수 (그사이 새 키가 추가된 경우)
+RECORD_MAX_ATTEMPTS = 3
+
+
+def record_recommendation(title, mbti, emotions, now=None):
+    """
+    추천 결과를 전체/감정별/MBTI별 트렌딩 sorted set에 반영합니다.
+
+    제목은 카탈로그 기준 제목으로 맞춰서 같은 콘텐츠의 제목 변형이 나뉘지 않게 합니다.
+
+    :param title: 추천 콘텐츠 제목
+    :param mbti: MBTI 유형 (없으면 전체/감정별에만 반영)
+    :param emotions: 감정 리스트 (중복은 한 번만 반영)
+    :param now: 기준 시각 (테스트용, 기본 현재 시각)
+    """
+    content = get_catalog_index().resolve(title)
+    member = content.title if content else title.strip()
+
+    keys = [TRENDING_ALL_KEY]
+    # 같은 감정을 여러 번 선택해도 감정별 점수는 한 번만 더함
+    keys += [trending_emotion_key(emotion) for emotion in dict.fromkeys(emotions) if emotion]
+    if mbti:
+        keys.append(trending_mbti_key(mbti))
+
+    record_script = redis_client.register_script(RECORD_SCRIPT)
+    args = [
+        now if now is not None else time.time(),
+        TRENDING_HALF_LIFE,
+        member,
+        TRENDING_MAX_MEMBERS,
+        TRENDING_REBASE_EXPONENT,
+        len(keys),
+    ]
+    other_keys = []
+    for _ in range(RECORD_MAX_ATTEMPTS):
+        weight = record_script(keys=[TRENDING_EPOCH_KEY, TRENDING_KEYS_KEY, *keys, *other_keys], args=args)
+        if weight is not None:
+            return weight
+        # 재조정이 필요한데 키 목록을 모름 → 현재 목록을 KEYS에 넣어서 다시 실행
+        other_keys = sorted(set(redis_client.smembers(TRENDING_KEYS_KEY)) - set(keys))
+    print(f"트렌딩 점수 재조정 중 키 목록이 계속 바뀌어 반영하지 못함: {member}")
+    return None
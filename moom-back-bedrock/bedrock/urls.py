@@ -9,4 +9,6 @@ urlpatterns = [
     path("recommend_content/<str:date>", RecommendContentView.as_view(), name="calendar_recommend"),
     path("redis/save",ChatSaveView.as_view(), name="chat_redis"),
     path("redis/get", ChatHistoryView.as_view(), name="chat_redis" ),
+    path("stats/metrics", StatsFlusherMetricsView.as_view(), name="stats_flusher_metrics"),
+    path("redis/metrics", RedisPoolMetricsView.as_view(), name="redis_pool_metrics"),
 ]
\ No newline at end of file
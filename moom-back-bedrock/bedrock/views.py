@@ -9,6 +9,11 @@ from rest_framework.views import APIView
 from .bedrock import *
 from .serializers import *
 from .redis import *
+from .stats_buffer import buffer_emotion_stats, get_flusher_metrics
+from .trending import record_recommendation
+from .chat_context import build_chat_context
+from .catalog import find_content_by_title, subscribed_platforms
+from .chat_archive import load_archived_chats
 
 class CallBedrockAllPlatform(APIView):
 
@@ -97,27 +102,24 @@ class CallBedrockAllPlatform(APIView):
             calendar.entries[target_date_str] = entry
             calendar.save()
 
-            # ContentEmotionStats에 감정 통계 저장
-            if recommended_content and recommended_content.strip() and calendar.mbti:
+            # ContentEmotionStats 감정 통계는 write-behind 버퍼에 적재 (flush_emotion_stats가 주기적으로 반영)
+            emotions = emoticons_data.get('emotion', [])
+            if recommended_content and recommended_content.strip() and calendar.mbti and emotions:
                 try:
-                    # 콘텐츠 통계 데이터 가져오기 또는 생성
-                    content_stats = ContentEmotionStats.objects(title=recommended_content).first()
-                    if not content_stats:
-                        content_stats = ContentEmotionStats(title=recommended_content)
-                        content_stats.save()
-                        print(f"새로운 콘텐츠 통계 생성: {recommended_content}")
-
-                    # emoticons 데이터에서 emotion 리스트 가져오기
-                    emotions = emoticons_data.get('emotion', [])
-                    if emotions:
-                        # 감정 데이터 추가
-                        content_stats.add_emotions(calendar.mbti, emotions)
-                        print(f"감정 통계 추가 완료: 콘텐츠={recommended_content}, MBTI={calendar.mbti}, 감정={emotions}")
+                    buffer_emotion_stats(recommended_content, calendar.mbti, emotions)
+                    print(f"감정 통계 버퍼 적재 완료: 콘텐츠={recommended_content}, MBTI={calendar.mbti}, 감정={emotions}")
                 except Exception as e:
-                    print(f"감정 통계 저장 중 오류 발생: {str(e)}")
+                    print(f"감정 통계 버퍼 적재 중 오류 발생: {str(e)}")
             else:
                 print(f"데이터 저장 조건 불충족: recommended_content={recommended_content}, mbti={calendar.mbti}")
 
+            # 실시간 트렌딩 점수 반영 (MBTI가 없어도 전체/감정별 트렌딩에는 반영)
+            if recommended_content and recommended_content.strip():
+                try:
+                    record_recommendation(recommended_content, calendar.mbti, emotions)
+                except Exception as e:
+                    print(f"트렌딩 점수 반영 중 오류 발생: {str(e)}")
+
 
 
             # 응답 데이터 구성
@@ -226,27 +228,24 @@ class CallBedrockSubPlatform(APIView):
             calendar.entries[target_date_str] = entry
             calendar.save()
 
-            # ContentEmotionStats에 감정 통계 저장
-            if recommended_content and recommended_content.strip() and calendar.mbti:
+            # ContentEmotionStats 감정 통계는 write-behind 버퍼에 적재 (flush_emotion_stats가 주기적으로 반영)
+            emotions = emoticons_data.get('emotion', [])
+            if recommended_content and recommended_content.strip() and calendar.mbti and emotions:
                 try:
-                    # 콘텐츠 통계 데이터 가져오기 또는 생성
-                    content_stats = ContentEmotionStats.objects(title=recommended_content).first()
-                    if not content_stats:
-                        content_stats = ContentEmotionStats(title=recommended_content)
-                        content_stats.save()
-                        print(f"새로운 콘텐츠 통계 생성: {recommended_content}")
-
-                    # emoticons 데이터에서 emotion 리스트 가져오기
-                    emotions = emoticons_data.get('emotion', [])
-                    if emotions:
-                        # 감정 데이터 추가
-                        content_stats.add_emotions(calendar.mbti, emotions)
-                        print(f"감정 통계 추가 완료: 콘텐츠={recommended_content}, MBTI={calendar.mbti}, 감정={emotions}")
+                    buffer_emotion_stats(recommended_content, calendar.mbti, emotions)
+                    print(f"감정 통계 버퍼 적재 완료: 콘텐츠={recommended_content}, MBTI={calendar.mbti}, 감정={emotions}")
                 except Exception as e:
-                    print(f"감정 통계 저장 중 오류 발생: {str(e)}")
+                    print(f"감정 통계 버퍼 적재 중 오류 발생: {str(e)}")
             else:
                 print(f"데이터 저장 조건 불충족: recommended_content={recommended_content}, mbti={calendar.mbti}")
 
+            # 실시간 트렌딩 점수 반영 (MBTI가 없어도 전체/감정별 트렌딩에는 반영)
+            if recommended_content and recommended_content.strip():
+                try:
+                    record_recommendation(recommended_content, calendar.mbti, emotions)
+                except Exception as e:
+                    print(f"트렌딩 점수 반영 중 오류 발생: {str(e)}")
+
 
 
             # 응답 데이터 구성
@@ -275,17 +274,34 @@ class QuestionView(APIView):
             # 검증된 데이터를 ChatBot 함수로 전달
             question_text = serializer.validated_data.get("question_text")
 
+            # 로그인된 사용자면 최근 대화 + 이전 대화 요약을 함께 전달 (실패하면 단일 질문으로 호출)
+            user_id = getattr(request.user, "username", None)
+            history, summary = [], None
+            if user_id:
+                try:
+                    history, summary = build_chat_context(user_id)
+                except Exception as e:
+                    print(f"대화 맥락 조회 중 오류 발생: {str(e)}")
+
             # Bedrock 모델 호출
             try:
-                response_content = bedrock_chat_bot(input_text=question_text)
+                response_content = bedrock_chat_bot(input_text=question_text, history=history, summary=summary)
             except Exception as e:
                 return Response(
                     {"error": f"ChatBot invocation failed: {str(e)}"},
                     status=status.HTTP_500_INTERNAL_SERVER_ERROR,
                 )
 
+            # 로그인된 사용자면 대화를 바로 저장 (별도의 redis/save 호출 불필요, 실패해도 응답은 반환)
+            response_data = {"response": response_content}
+            if user_id:
+                try:
+                    response_data["message_id"] = save_chat_to_redis(user_id, question_text, response_content)
+                except Exception as e:
+                    print(f"대화 저장 중 오류 발생: {str(e)}")
+
             # 성공적으로 ChatBot 응답 반환
-            return Response({"response": response_content}, status=status.HTTP_200_OK)
+            return Response(response_data, status=status.HTTP_200_OK)
 
         # 유효하지 않은 데이터가 입력된 경우
         return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
@@ -395,10 +411,8 @@ class RecommendContentView(APIView):
                     status=status.HTTP_404_NOT_FOUND
                 )
 
-            # Contents 컬렉션에서 매칭되는 콘텐츠 찾기
-            # 정규식 패턴 생성 (^는 문자열의 시작을 의미)
-            pattern = f"^{re.escape(recommend_content)}"
-            content = Contents.objects(title__regex=pattern).first()
+            # 프로세스에 캐시된 카탈로그에서 매칭되는 콘텐츠 찾기 (구독 플랫폼의 제목 일치 → 제목 일치 → 접두사 일치 순)
+            content = find_content_by_title(recommend_content, subscribed_platforms(calendar.subscribe_platform))
 
             if not content:
                 return Response(
@@ -406,13 +420,11 @@ class RecommendContentView(APIView):
                     status=status.HTTP_404_NOT_FOUND
                 )
 
-            # ContentsSerializer를 사용하여 데이터 직렬화
-            content_serializer = ContentsSerializer(content)
             response_data = {
                 "recommend_content": recommend_content,
                 "content_info": {
-                    "title": content_serializer.data.get('title'),
-                    "poster_url": content_serializer.data.get('poster_url')
+                    "title": content.title,
+                    "poster_url": content.poster_url
                 }
             }
             return Response(response_data, status=status.HTTP_200_OK)
@@ -427,6 +439,7 @@ class RecommendContentView(APIView):
 class ChatSaveView(APIView):
     """
     View to save chat data to Redis
+    (QuestionView가 이미 저장한 대화를 클라이언트가 다시 보내면 중복 저장하지 않음)
     """
 
     def post(self, request):
@@ -437,10 +450,19 @@ class ChatSaveView(APIView):
             user_message = serializer.validated_data['message']
             bot_response = serializer.validated_data['response']
 
+            # QuestionView가 저장한 대화(반환한 message_id 또는 가장 최근 대화와 내용이 같음)면 저장 생략
+            # QuestionView의 저장이 실패했으면 여기서 저장됨
+            saved_id = find_saved_chat(user_id, user_message, bot_response,
+                                       serializer.validated_data.get('message_id'))
+            if saved_id:
+                return JsonResponse({"message": "Chat already saved.", "message_id": saved_id},
+                                    status=status.HTTP_200_OK)
+
             # Redis에 대화 내용 저장
-            save_chat_to_redis(user_id, user_message, bot_response)
+            message_id = save_chat_to_redis(user_id, user_message, bot_response)
 
-            return JsonResponse({"message": "Chat saved successfully."}, status=status.HTTP_200_OK)
+            return JsonResponse({"message": "Chat saved successfully.", "message_id": message_id},
+                                status=status.HTTP_200_OK)
 
         return JsonResponse(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
 
@@ -448,16 +470,73 @@ class ChatHistoryView(APIView):
     """
     View to retrieve chat history from Redis
     """
+    permission_classes = [IsAuthenticated]
+
+    def get(self, request):
+        """
+        로그인된 사용자의 대화 기록을 ?after=<메시지 ID> 이후부터 ?count=개씩 조회
+
+        ?archived=1이면 Redis에서 밀려나 Mongo에 보관된 예전 대화를 최근 ?limit=묶음만큼 조회
+        """
+        user_id = request.user.username  # 다른 사용자의 기록은 조회할 수 없음
+
+        if request.GET.get("archived") in ("1", "true"):
+            try:
+                limit = max(1, min(int(request.GET.get("limit", 10)), 50))
+            except ValueError:
+                return JsonResponse({"error": "'limit' must be an integer"}, status=status.HTTP_400_BAD_REQUEST)
+
+            try:
+                chat_history = load_archived_chats(user_id, limit=limit)
+            except Exception as e:
+                return JsonResponse({"error": str(e)}, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
+
+            if not chat_history:
+                return JsonResponse({"message": "No archived chat history found."}, status=status.HTTP_404_NOT_FOUND)
+            return JsonResponse({"chat_history": chat_history}, status=status.HTTP_200_OK)
+
+        try:
+            count = max(1, min(int(request.GET.get("count", CHAT_HISTORY_PAGE_SIZE)), CHAT_HISTORY_PAGE_SIZE))
+        except ValueError:
+            return JsonResponse({"error": "'count' must be an integer"}, status=status.HTTP_400_BAD_REQUEST)
 
-    def get(self, request, user_id):
         try:
-            # Redis에서 대화 기록 가져오기
-            chat_history = get_chat_history_from_redis(user_id)
+            # Redis에서 대화 기록 가져오기 (커서 기반 페이지)
+            chat_history = get_chat_history_from_redis(user_id, after=request.GET.get("after"), count=count)
 
             if not chat_history:
                 return JsonResponse({"message": "No chat history found."}, status=status.HTTP_404_NOT_FOUND)
 
-            return JsonResponse({"chat_history": chat_history}, status=status.HTTP_200_OK)
+            # 한 페이지가 가득 찼으면 마지막 ID를 다음 커서로 전달
+            next_cursor = chat_history[-1]["id"] if len(chat_history) == count else None
+            return JsonResponse({"chat_history": chat_history, "next_cursor": next_cursor},
+                                status=status.HTTP_200_OK)
+
+        except Exception as e:
+            return JsonResponse({"error": str(e)}, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
+
+
+class StatsFlusherMetricsView(APIView):
+    """
+    View to return write-behind stats flusher metrics
+    """
+
+    def get(self, request):
+        try:
+            return JsonResponse(get_flusher_metrics(), status=status.HTTP_200_OK)
+
+        except Exception as e:
+            return JsonResponse({"error": str(e)}, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
+
+
+class RedisPoolMetricsView(APIView):
+    """
+    View to return Redis connection pool usage of this worker process
+    """
+
+    def get(self, request):
+        try:
+            return JsonResponse(get_redis_pool_stats(), status=status.HTTP_200_OK)
 
         except Exception as e:
-            return JsonResponse({"error": str(e)}, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
\ No newline at end of file
+            return JsonResponse({"error": str(e)}, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
@@ -139,6 +139,28 @@ print(MONGO_URI)
 connect(host=MONGO_URI)
 
 
+# 캐시 (서비스 간 공유 Redis, 키는 "bedrock:{VERSION}:{키}" 형식)
+# 캐시 형식이 바뀌면 CACHE_VERSION을 올려서 이전 값을 한 번에 무시
+CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.redis.RedisCache',
+        'LOCATION': env(
+            'REDIS_CACHE_URL',
+            default=f"redis://{env('REDIS_HOST', default='localhost')}:{env('REDIS_PORT', default='6379')}/{env('REDIS_DB', default='0')}",
+        ),
+        'KEY_PREFIX': 'bedrock',
+        'VERSION': env.int('CACHE_VERSION', default=1),
+        'TIMEOUT': env.int('CACHE_TIMEOUT', default=300),
+        'OPTIONS': {
+            'serializer': 'momo.cache.CompressedRedisSerializer',  # 큰 값은 zstd 압축
+            'socket_timeout': env.float('REDIS_SOCKET_TIMEOUT', default=3.0),
+            'socket_connect_timeout': env.float('REDIS_SOCKET_CONNECT_TIMEOUT', default=1.0),
+            'health_check_interval': env.int('REDIS_HEALTH_CHECK_INTERVAL', default=30),
+        },
+    }
+}
+
+
 
 # Password validation
 # https://docs.djangoproject.com/en/5.1/ref/settings/#auth-password-validators
@@ -0,0 +1,48 @@
+from datetime import datetime
+
+from .redis import redis_client
+from .rollup import entry_emotions
+
+# 키 보관 기간 (초, moom-back-insight insight/activity.py의 KEY_TTLS와 같은 값 - 그보다 오래된 기간은 조회를 거절)
+DAY_KEY_TTL = 90 * 24 * 3600
+MONTH_KEY_TTL = 400 * 24 * 3600
+
+# 지금까지 기록된 감정 이름 (insight에서 감정별 조회 시 사용)
+ACTIVE_EMOTIONS_KEY = "active:emotions"
+
+
+def active_key(period, value, dimension="all", label=None):
+    """
+    HyperLogLog 키 (예: active:day:2025-02-10:mbti:ENFP, active:month:2025-02:all)
+    """
+    key = f"active:{period}:{value}:{dimension}"
+    return f"{key}:{label}" if label else key
+
+
+def record_active_writer(user_id, mbti=None, entry=None, now=None):
+    """
+    캘린더 작성자를 일/월 단위 HyperLogLog에 추가합니다. (전체, MBTI별, 감정별)
+
+    :param user_id: 작성자 ID
+    :param mbti: 작성자 MBTI (없으면 MBTI별 집계 생략)
+    :param entry: 작성한 Entry (선택한 감정별 집계에 사용)
+    :param now: 작성 시각 (기본 현재 시각)
+    """
+    now = now or datetime.now()
+    emotions = entry_emotions(entry)
+    periods = (("day", now.strftime('%Y-%m-%d'), DAY_KEY_TTL), ("month", now.strftime('%Y-%m'), MONTH_KEY_TTL))
+
+    pipe = redis_client.pipeline(transaction=False)
+    for period, value, ttl in periods:
+        keys = [active_key(period, value)]
+        if mbti:
+            keys.append(active_key(period, value, "mbti", mbti))
+        keys += [active_key(period, value, "emotion", emotion) for emotion in emotions]
+
+        for key in keys:
+            pipe.pfadd(key, user_id)
+            pipe.expire(key, ttl)
+
+    if emotions:
+        pipe.sadd(ACTIVE_EMOTIONS_KEY, *emotions)
+    pipe.execute()
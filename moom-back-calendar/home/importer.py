@@ -0,0 +1,245 @@
+import json
+import time
+from dataclasses import dataclass, field
+
+from pymongo import DeleteMany, UpdateOne
+
+from .models import Contents
+from .redis import redis_client
+from .search import mark_search_docs_deleted, purge_search_tombstones, sync_search_docs
+
+# 한 번의 bulk_write에 담을 문서 수
+IMPORT_BATCH_SIZE = 1000
+# 파일을 읽는 단위 (문자 수)
+READ_CHUNK_SIZE = 1 << 16
+# 카탈로그가 바뀔 때마다 1씩 올리는 Redis 키 (bedrock/insight의 프로세스 카탈로그 캐시가 확인)
+CATALOG_VERSION_KEY = "catalog:version"
+
+# 원본 JSON 키 → Contents 필드
+FIELD_MAP = {
+    "ID": "content_id",
+    "Title": "title",
+    "Genre": "genre",
+    "Platform": "platform",
+    "PosterURL": "poster_url",
+    "Synopsis": "synopsis",
+    "Rating": "rating",
+    "Runtime": "runtime",
+    "Country": "country",
+    "Year": "year",
+    "ReleaseDate": "release_date",
+}
+
+
+def iter_json_items(file, chunk_size=READ_CHUNK_SIZE):
+    """
+    JSON 배열([{...}, {...}]) 또는 JSON Lines 파일에서 항목을 하나씩 읽습니다.
+
+    파일 전체를 json.load로 올리지 않고 chunk_size만큼 읽으면서 raw_decode로 객체 단위로 잘라냅니다.
+    (메모리는 가장 큰 항목 하나 + 읽기 버퍼 정도만 사용)
+
+    :param file: 텍스트 모드로 연 파일 객체
+    :return: dict 제너레이터
+    """
+    decoder = json.JSONDecoder()
+    buffer = ""
+    position = 0
+    eof = False
+    in_array = None  # 첫 문자를 보고 결정 ('[' 이면 배열, 아니면 JSON Lines)
+
+    while True:
+        # 공백과 배열 구분자 건너뛰기
+        while True:
+            while position < len(buffer) and buffer[position] in " \t\r\n":
+                position += 1
+            if position < len(buffer) or eof:
+                break
+            buffer, position = buffer[position:] + file.read(chunk_size), 0
+            eof = position >= len(buffer)
+
+        if position >= len(buffer):
+            return
+
+        char = buffer[position]
+        if in_array is None:
+            in_array = char == "["
+            if in_array:
+                position += 1
+                continue
+        if in_array and char == ",":
+            position += 1
+            continue
+        if in_array and char == "]":
+            return
+
+        try:
+            item, end = decoder.raw_decode(buffer, position)
+        except json.JSONDecodeError:
+            if eof:
+                raise
+            # 항목이 버퍼 경계에서 잘림 → 더 읽어서 다시 시도
+            chunk = file.read(chunk_size)
+            eof = not chunk
+            buffer, position = buffer[position:] + chunk, 0
+            continue
+
+        position = end
+        yield item
+
+
+def map_item(item):
+    """
+    원본 항목을 Contents 필드 dict로 변환하고 검증합니다.
+
+    값이 없거나 빈 문자열인 필드는 dict에 넣지 않습니다. (저장할 때 $unset으로 지움)
+
+    :return: Contents 필드 dict
+    :raises ValueError: ID/Title이 없거나 형식이 잘못된 경우
+    """
+    if not isinstance(item, dict):
+        raise ValueError("항목이 객체가 아닙니다")
+
+    doc = {}
+    for source, target in FIELD_MAP.items():
+        value = item.get(source)
+        if value is None or value == "":
+            continue
+        if target == "content_id":
+            if isinstance(value, bool) or not str(value).strip().isdigit():
+                raise ValueError(f"잘못된 ID: {value!r}")
+            value = int(value)
+        elif not isinstance(value, str):
+            # 연도, 평점 등 숫자로 들어온 값도 StringField에 맞춰 문자열로 저장
+            value = str(value)
+        doc[target] = value
+
+    if "content_id" not in doc:
+        raise ValueError("ID가 없습니다")
+    if not doc.get("title", "").strip():
+        raise ValueError("Title이 없습니다")
+    return doc
+
+
+@dataclass
+class ImportResult:
+    read: int = 0
+    invalid: int = 0
+    inserted: int = 0
+    updated: int = 0
+    unchanged: int = 0
+    deleted: int = 0
+    indexed: int = 0  # 갱신된 검색 문서 수 (contents_search)
+    seconds: float = 0.0
+    errors: list = field(default_factory=list)  # 처음 몇 개의 검증 실패 메시지
+
+    @property
+    def rate(self):
+        return self.read / self.seconds if self.seconds else 0.0
+
+
+def build_update(doc):
+    """
+    content_id 기준 upsert에 쓸 업데이트를 만듭니다.
+
+    파일에 없는 필드는 $unset으로 지워서, 원본에서 빠진 값(예: 포스터 삭제)이 이전 적재 값으로 남지 않게 합니다.
+    """
+    update = {"$set": doc}
+    missing = {target: "" for target in FIELD_MAP.values() if target not in doc}
+    if missing:
+        update["$unset"] = missing
+    return update
+
+
+def import_contents(file, batch_size=IMPORT_BATCH_SIZE, prune=False, progress=None, max_errors=20):
+    """
+    콘텐츠 JSON을 스트리밍으로 읽어 content_id 기준으로 upsert합니다. (여러 번 실행해도 결과가 같음)
+
+    batch_size개씩 모아서 한 번의 bulk_write(UpdateOne upsert, ordered=False)로 저장하고,
+    내용이 같은 문서는 Mongo가 수정하지 않으므로 unchanged로 집계됩니다.
+    파일 항목에 없는 필드는 기존 문서에서 지우고 (항목이 문서 전체를 대신함),
+    배치마다 바뀐 콘텐츠의 검색 문서(contents_search)도 함께 갱신하고,
+    하나라도 바뀌었으면 마지막에 catalog:version을 올립니다.
+
+    :param file: 텍스트 모드로 연 JSON 배열 / JSON Lines 파일
+    :param batch_size: bulk_write 한 번에 보낼 문서 수
+    :param prune: 파일에 없는 content_id 문서를 삭제할지 여부 (전체 카탈로그 교체용)
+    :param progress: 배치마다 호출할 함수 (ImportResult)
+    :param max_errors: errors에 보관할 검증 실패 메시지 수
+    :return: ImportResult
+    """
+    collection = Contents._get_collection()
+    result = ImportResult()
+    started_at = time.monotonic()
+    seen_ids = set() if prune else None
+    batch = {}
+
+    def sync_search(docs, deleted_ids=()):
+        # 검색 문서 갱신 (실패해도 적재는 계속, rebuild_search_index로 다시 맞출 수 있음)
+        try:
+            result.indexed += sync_search_docs(docs) + mark_search_docs_deleted(deleted_ids)
+        except Exception as e:
+            print(f"검색 문서 갱신 중 오류 발생: {str(e)}")
+
+    def flush():
+        if not batch:
+            return
+        # content_id가 같은 항목이 배치 안에 여러 번 있으면 마지막 항목만 사용
+        operations = [UpdateOne({"content_id": content_id}, build_update(doc), upsert=True)
+                      for content_id, doc in batch.items()]
+        written = collection.bulk_write(operations, ordered=False)
+        result.inserted += written.upserted_count
+        result.updated += written.modified_count
+        result.unchanged += written.matched_count - written.modified_count
+        sync_search(list(batch.values()))
+        batch.clear()
+        result.seconds = time.monotonic() - started_at
+        if progress:
+            progress(result)
+
+    for item in iter_json_items(file):
+        result.read += 1
+        try:
+            doc = map_item(item)
+        except ValueError as e:
+            result.invalid += 1
+            if len(result.errors) < max_errors:
+                title = item.get("Title") if isinstance(item, dict) else None
+                result.errors.append(f"{result.read}번째 항목 ({title}): {str(e)}")
+            continue
+
+        batch[doc["content_id"]] = doc
+        if seen_ids is not None:
+            seen_ids.add(doc["content_id"])
+        if len(batch) >= batch_size:
+            flush()
+    flush()
+
+    if prune and seen_ids:
+        # 빈 파일이나 전부 잘못된 파일로 카탈로그를 통째로 지우지 않도록 seen_ids가 있을 때만 삭제
+        stale_ids = collection.distinct("content_id", {"content_id": {"$nin": list(seen_ids)}})
+        if stale_ids:
+            deleted = collection.bulk_write([DeleteMany({"content_id": {"$in": stale_ids}})])
+            result.deleted = deleted.deleted_count
+            sync_search([], stale_ids)
+        try:
+            # 오래전에 deleted로 표시한 검색 문서 정리
+            purge_search_tombstones()
+        except Exception as e:
+            print(f"검색 문서 정리 중 오류 발생: {str(e)}")
+
+    if result.inserted or result.updated or result.deleted:
+        bump_catalog_version()
+
+    result.seconds = time.monotonic() - started_at
+    return result
+
+
+def bump_catalog_version():
+    """
+    다른 서비스의 카탈로그 캐시가 다시 만들어지도록 catalog:version을 올립니다. (실패해도 적재는 유지)
+    """
+    try:
+        return redis_client.incr(CATALOG_VERSION_KEY)
+    except Exception as e:
+        print(f"카탈로그 버전 갱신 중 오류 발생: {str(e)}")
+        return None
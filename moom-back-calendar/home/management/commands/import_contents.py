@@ -0,0 +1,54 @@
+import sys
+
+from django.core.management.base import BaseCommand, CommandError
+
+from home.importer import IMPORT_BATCH_SIZE, import_contents
+
+
+class Command(BaseCommand):
+    help = (
+        "콘텐츠 JSON(배열 또는 JSON Lines)을 스트리밍으로 읽어 content_id 기준으로 contents 컬렉션에 upsert합니다. "
+        "여러 번 실행해도 중복이 생기지 않습니다."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("path", help="JSON 파일 경로 (-이면 표준 입력)")
+        parser.add_argument("--batch-size", type=int, default=IMPORT_BATCH_SIZE,
+                            help="bulk_write 한 번에 보낼 문서 수")
+        parser.add_argument("--prune", action="store_true",
+                            help="파일에 없는 content_id 문서 삭제 (전체 카탈로그 교체)")
+        parser.add_argument("--progress-every", type=int, default=10,
+                            help="진행 상황을 출력할 배치 간격 (0이면 출력 안 함)")
+
+    def handle(self, *args, **options):
+        if options["batch_size"] < 1:
+            raise CommandError("--batch-size는 1 이상이어야 합니다.")
+
+        batches = 0
+
+        def progress(result):
+            nonlocal batches
+            batches += 1
+            if options["progress_every"] and batches % options["progress_every"] == 0:
+                self.stdout.write(f"  {result.read}건 처리 ({result.rate:.0f}건/초)")
+
+        try:
+            if options["path"] == "-":
+                result = import_contents(sys.stdin, options["batch_size"], options["prune"], progress)
+            else:
+                with open(options["path"], "r", encoding="utf-8") as file:
+                    result = import_contents(file, options["batch_size"], options["prune"], progress)
+        except FileNotFoundError:
+            raise CommandError(f"파일을 찾을 수 없습니다: {options['path']}")
+        except ValueError as e:
+            # json.JSONDecodeError 포함
+            raise CommandError(f"잘못된 JSON 형식입니다: {str(e)}")
+
+        for error in result.errors:
+            self.stdout.write(f"  건너뜀: {error}")
+        self.stdout.write(
+            f"완료: {result.read}건 ({result.seconds:.2f}초, {result.rate:.0f}건/초) - "
+            f"추가 {result.inserted}, 수정 {result.updated}, 변경 없음 {result.unchanged}, "
+            f"잘못된 항목 {result.invalid}" + (f", 삭제 {result.deleted}" if options["prune"] else "")
+            + f", 검색 문서 갱신 {result.indexed}"
+        )
@@ -0,0 +1,59 @@
+from datetime import datetime
+
+from django.core.management.base import BaseCommand, CommandError
+from pymongo import DeleteMany, ReplaceOne
+
+from home.models import Calendar, DailyEmotionRollup
+from home.rollup import escape_field
+
+
+class Command(BaseCommand):
+    help = "캘린더 항목에서 기간 내 날짜별 감정 롤업(daily_emotion_rollup)을 다시 계산합니다."
+
+    def add_arguments(self, parser):
+        parser.add_argument("start", help="시작 날짜 (YYYY-MM-DD)")
+        parser.add_argument("end", nargs="?", help="끝 날짜 (YYYY-MM-DD, 생략 시 시작 날짜와 동일)")
+
+    def handle(self, *args, **options):
+        start = options["start"]
+        end = options["end"] or start
+        try:
+            if datetime.strptime(start, "%Y-%m-%d") > datetime.strptime(end, "%Y-%m-%d"):
+                raise CommandError("시작 날짜가 끝 날짜보다 늦습니다.")
+        except ValueError:
+            raise CommandError("Invalid date format. Use YYYY-MM-DD.")
+
+        # 기간 내 항목을 (날짜, MBTI, 감정)별로 서버에서 집계
+        pipeline = [
+            {"$project": {"mbti": 1, "entries": {"$objectToArray": {"$ifNull": ["$entries", {}]}}}},
+            {"$unwind": "$entries"},
+            {"$match": {"entries.k": {"$gte": start, "$lte": end}}},
+            {"$unwind": "$entries.v.emoticons.emotion"},
+            {"$group": {
+                "_id": {
+                    "date": "$entries.k",
+                    "mbti": "$mbti",
+                    "emotion": "$entries.v.emoticons.emotion",
+                },
+                "count": {"$sum": 1},
+            }},
+        ]
+
+        rollups = {}
+        for row in Calendar.objects.aggregate(pipeline, allowDiskUse=True):
+            key = row["_id"]
+            if not key.get("emotion"):
+                continue
+            # 항목 작성 시($inc)와 같은 필드 이름 사용
+            emotion = escape_field(key["emotion"])
+            rollup = rollups.setdefault(key["date"], {"date": key["date"], "emotions": {}, "mbti_emotions": {}})
+            rollup["emotions"][emotion] = rollup["emotions"].get(emotion, 0) + row["count"]
+            if key.get("mbti"):
+                rollup["mbti_emotions"].setdefault(escape_field(key["mbti"]), {})[emotion] = row["count"]
+
+        # 기간 내 데이터가 없는 날짜의 롤업은 삭제하고 나머지는 교체
+        operations = [DeleteMany({"date": {"$gte": start, "$lte": end, "$nin": list(rollups)}})]
+        operations += [ReplaceOne({"date": date}, rollup, upsert=True) for date, rollup in rollups.items()]
+        DailyEmotionRollup._get_collection().bulk_write(operations, ordered=True)
+
+        self.stdout.write(f"완료: {start} ~ {end} 롤업 {len(rollups)}일 재계산")
@@ -0,0 +1,43 @@
+from django.core.management.base import BaseCommand
+
+from home.models import ContentSearchDoc, Contents
+from home.search import mark_search_docs_deleted, purge_search_tombstones, sync_search_docs
+
+SEARCH_FIELDS = ("content_id", "title", "synopsis", "platform", "genre", "poster_url")
+
+
+class Command(BaseCommand):
+    help = (
+        "contents 컬렉션 전체로 검색 문서(contents_search)를 다시 맞춥니다. "
+        "바뀐 콘텐츠만 갱신하고, 없어진 콘텐츠의 검색 문서는 deleted로 표시합니다. "
+        "SEARCH_TOMBSTONE_TTL보다 오래된 deleted 문서는 지웁니다."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--batch-size", type=int, default=1000,
+                            help="한 번에 갱신할 문서 수")
+        parser.add_argument("--force", action="store_true",
+                            help="내용이 같아도 모든 검색 문서를 다시 씀 (n-gram 규칙 변경 시)")
+
+    def handle(self, *args, **options):
+        batch_size = options["batch_size"]
+        seen_ids = set()
+        updated = 0
+        batch = []
+
+        for doc in Contents.objects.only(*SEARCH_FIELDS).as_pymongo().batch_size(batch_size):
+            if doc.get("content_id") is None:
+                continue
+            seen_ids.add(doc["content_id"])
+            batch.append(doc)
+            if len(batch) >= batch_size:
+                updated += sync_search_docs(batch, force=options["force"])
+                batch = []
+        updated += sync_search_docs(batch, force=options["force"])
+
+        indexed_ids = ContentSearchDoc._get_collection().distinct("content_id", {"deleted": {"$ne": True}})
+        deleted = mark_search_docs_deleted([content_id for content_id in indexed_ids if content_id not in seen_ids])
+        purged = purge_search_tombstones()
+
+        self.stdout.write(f"완료: 콘텐츠 {len(seen_ids)}건, 검색 문서 갱신 {updated}건, 삭제 표시 {deleted}건, "
+                          f"오래된 삭제 문서 정리 {purged}건")
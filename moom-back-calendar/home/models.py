@@ -1,4 +1,4 @@
-from mongoengine import Document, EmbeddedDocument, fields, IntField, StringField
+from mongoengine import Document, EmbeddedDocument, fields, IntField, StringField, DictField, BooleanField, DateTimeField
 
 # Emoticons (Embedded Document)
 class Emoticons(EmbeddedDocument):
@@ -51,4 +51,58 @@ class Contents(Document):
             'content_id',  # content_id로 인덱스 생성
             'title'  # title로 인덱스 생성
         ]
-    }
\ No newline at end of file
+    }
+
+
+class DailyEmotionRollup(Document):
+    """
+    날짜별 감정 선택 횟수 롤업
+
+    캘린더 항목 작성/삭제 시 원자적 증가/감소($inc)로 갱신됩니다.
+    (rebuild_daily_emotion_rollup 명령으로 기간별 재계산 가능)
+    감정/MBTI 이름의 '%', '.', '$'는 필드 이름으로 쓸 수 있게 퍼센트 인코딩해서 저장합니다. (예: 'a.b' → 'a%2Eb')
+
+    구조:
+    {
+        "date": "2025-02-10",
+        "emotions": {"기쁨": 3, "슬픔": 1},
+        "mbti_emotions": {
+            "ENFP": {"기쁨": 2},
+            "INTJ": {"기쁨": 1, "슬픔": 1}
+        }
+    }
+    """
+    date = StringField(required=True, unique=True)  # YYYY-MM-DD
+    emotions = DictField(default={})  # 감정별 선택 횟수
+    mbti_emotions = DictField(default={})  # MBTI별 감정 선택 횟수 (MBTI가 없는 회원은 제외)
+
+    meta = {
+        'collection': 'daily_emotion_rollup'
+    }
+
+
+class ContentSearchDoc(Document):
+    """
+    콘텐츠 검색용 n-gram 문서 (home.search가 메모리 인덱스를 만들 때 사용)
+
+    import_contents / rebuild_search_index가 내용이 바뀐 콘텐츠만 갱신하고,
+    각 프로세스는 updated_at 이후 바뀐 문서만 다시 읽어 인덱스에 반영합니다.
+    삭제된 콘텐츠는 바로 지우지 않고 deleted=True로 남깁니다. (다른 프로세스가 삭제를 알 수 있도록)
+    SEARCH_TOMBSTONE_TTL이 지나면 purge_search_tombstones가 지웁니다.
+    """
+    content_id = IntField(required=True, unique=True)
+    title = StringField()
+    platform = StringField()
+    genre = StringField()
+    poster_url = StringField()
+    terms = DictField(default={})  # n-gram: 가중치 (제목 등장 × TITLE_WEIGHT + 줄거리 등장)
+    digest = StringField()  # 검색에 쓰는 필드의 해시 (변경 여부 확인용)
+    deleted = BooleanField(default=False)
+    updated_at = DateTimeField()
+
+    meta = {
+        'collection': 'contents_search',
+        'indexes': [
+            'updated_at',
+        ]
+    }
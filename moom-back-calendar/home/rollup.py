@@ -0,0 +1,48 @@
+from collections import defaultdict
+
+from .models import DailyEmotionRollup
+
+
+def entry_emotions(entry):
+    """
+    캘린더 항목에서 선택된 감정 리스트를 꺼냅니다.
+    """
+    if entry and entry.emoticons and entry.emoticons.emotion:
+        return list(entry.emoticons.emotion)
+    return []
+
+
+def escape_field(name):
+    """
+    감정/MBTI 이름을 Mongo 필드 이름으로 쓸 수 있게 '%', '.', '$'를 퍼센트 인코딩합니다.
+
+    '.'이 들어간 이름은 $inc 경로에서 하위 문서가 되고 '$'로 시작하면 업데이트가 실패하기 때문입니다.
+    (읽는 쪽(insight)은 unescape_field로 복원)
+    """
+    return name.replace("%", "%25").replace(".", "%2E").replace("$", "%24")
+
+
+def apply_entry_to_rollup(date, entry, mbti=None, sign=1):
+    """
+    캘린더 항목의 감정을 날짜별 롤업에 원자적으로 더하거나 뺍니다.
+
+    :param date: 항목 날짜 (YYYY-MM-DD)
+    :param entry: Entry 객체
+    :param mbti: 작성자 MBTI (없으면 MBTI별 집계 생략)
+    :param sign: 1이면 작성, -1이면 삭제
+    """
+    emotions = entry_emotions(entry)
+    if not emotions:
+        return
+
+    inc = defaultdict(int)
+    for emotion in emotions:
+        if not emotion:
+            continue  # 빈 이름은 필드로 쓸 수 없음
+        inc[f"emotions.{escape_field(emotion)}"] += sign
+        if mbti:
+            inc[f"mbti_emotions.{escape_field(mbti)}.{escape_field(emotion)}"] += sign
+    if not inc:
+        return
+
+    DailyEmotionRollup._get_collection().update_one({"date": date}, {"$inc": dict(inc)}, upsert=True)
@@ -0,0 +1,404 @@
+import hashlib
+import heapq
+import math
+import re
+import threading
+import time
+import unicodedata
+from array import array
+from collections import Counter, namedtuple
+from datetime import datetime, timedelta, timezone
+
+import environ
+from pymongo import UpdateOne
+
+from .models import ContentSearchDoc
+
+# 환경 변수 설정
+env = environ.Env()
+
+# 다른 프로세스(importer)가 바꾼 검색 문서를 확인하는 주기 (초)
+SEARCH_POLL_INTERVAL = env.int('SEARCH_POLL_INTERVAL', default=30)
+# 폴링할 때 updated_at을 이만큼 겹쳐서 읽음 (서버 간 시각 차이, 늦게 커밋된 쓰기 대비, 초)
+SEARCH_POLL_OVERLAP = 60
+# 삭제/수정으로 비게 된 슬롯이 이 비율을 넘으면 인덱스를 처음부터 다시 만듦
+SEARCH_REBUILD_DEAD_RATIO = 0.2
+# deleted로 표시한 검색 문서를 지우기 전까지 남겨 두는 시간 (초, 폴링 주기보다 충분히 길게)
+SEARCH_TOMBSTONE_TTL = env.int('SEARCH_TOMBSTONE_TTL', default=7 * 24 * 3600)
+# 검색 결과 최대 수
+SEARCH_MAX_LIMIT = 50
+
+# 제목에 나온 n-gram은 줄거리보다 이만큼 높은 가중치
+TITLE_WEIGHT = 3
+# 가중치 상한 (array('B')에 저장)
+MAX_TERM_WEIGHT = 255
+# 정규화한 검색어가 제목에 그대로 포함되면 더하는 점수 (IDF 합에 곱함)
+TITLE_MATCH_BOOST = 1.0
+# 전체 문서의 이 비율보다 많이 나오는 n-gram은 다른 n-gram이 있으면 점수 계산에서 제외 ('하는', '이다' 등)
+COMMON_TERM_RATIO = 0.2
+
+# 정규화 시 제거할 문자 (공백, 구두점 등 - 띄어쓰기가 달라도 같은 n-gram이 나오도록)
+_NON_WORD_PATTERN = re.compile(r"[\W_]+", re.UNICODE)
+
+# key: 정규화한 제목, platform_key: 소문자 플랫폼 (검색할 때마다 변환하지 않도록 미리 계산)
+SearchEntry = namedtuple("SearchEntry", ["content_id", "title", "platform", "genre", "poster_url", "key", "platform_key"])
+
+
+def normalize_text(text):
+    """
+    NFKC, 소문자, 공백/구두점 제거 (예: '나의 옆자리 이드님!' → '나의옆자리이드님')
+    """
+    if not text:
+        return ""
+    return _NON_WORD_PATTERN.sub("", unicodedata.normalize("NFKC", text).lower())
+
+
+def char_ngrams(text, unigrams=False):
+    """
+    정규화한 문자열의 글자 바이그램 (한국어는 띄어쓰기 없이도 부분 일치하도록 형태소 대신 글자 단위)
+
+    :param unigrams: 한 글자 검색어를 위해 글자 하나씩도 포함할지 여부 (제목에만 사용)
+    """
+    key = normalize_text(text)
+    grams = [key[i:i + 2] for i in range(len(key) - 1)]
+    if unigrams or len(key) == 1:
+        grams.extend(key)
+    return grams
+
+
+def build_terms(title, synopsis):
+    """
+    검색 문서의 n-gram 가중치를 만듭니다. (제목 등장 × TITLE_WEIGHT + 줄거리 등장)
+    """
+    terms = Counter()
+    for gram in char_ngrams(title, unigrams=True):
+        terms[gram] += TITLE_WEIGHT
+    for gram in char_ngrams(synopsis):
+        terms[gram] += 1
+    return {gram: min(weight, MAX_TERM_WEIGHT) for gram, weight in terms.items()}
+
+
+def search_digest(doc):
+    fields = [doc.get(name) or "" for name in ("title", "synopsis", "platform", "genre", "poster_url")]
+    return hashlib.sha1("\x1f".join(fields).encode("utf-8")).hexdigest()
+
+
+def sync_search_docs(docs, now=None, force=False):
+    """
+    콘텐츠 문서 목록의 검색 문서를 갱신합니다. (내용이 바뀐 콘텐츠만 쓰므로 재실행해도 updated_at이 바뀌지 않음)
+
+    :param docs: Contents 필드 dict 목록 (content_id, title, synopsis, platform, genre, poster_url)
+    :param force: 내용이 같아도 다시 씀 (n-gram 규칙을 바꾼 경우)
+    :return: 갱신된 검색 문서 수
+    """
+    if not docs:
+        return 0
+    collection = ContentSearchDoc._get_collection()
+    now = now or datetime.now(timezone.utc)
+
+    digests = {doc["content_id"]: search_digest(doc) for doc in docs}
+    existing = {
+        row["content_id"]: (row.get("digest"), row.get("deleted", False))
+        for row in collection.find({"content_id": {"$in": list(digests)}}, {"content_id": 1, "digest": 1, "deleted": 1})
+    }
+
+    operations = []
+    for doc in docs:
+        content_id = doc["content_id"]
+        if not force and existing.get(content_id) == (digests[content_id], False):
+            continue
+        operations.append(UpdateOne({"content_id": content_id}, {"$set": {
+            "title": doc.get("title"),
+            "platform": doc.get("platform"),
+            "genre": doc.get("genre"),
+            "poster_url": doc.get("poster_url"),
+            "terms": build_terms(doc.get("title"), doc.get("synopsis")),
+            "digest": digests[content_id],
+            "deleted": False,
+            "updated_at": now,
+        }}, upsert=True))
+
+    if operations:
+        collection.bulk_write(operations, ordered=False)
+    return len(operations)
+
+
+def mark_search_docs_deleted(content_ids, now=None):
+    """
+    삭제된 콘텐츠의 검색 문서를 deleted로 표시합니다. (폴링하는 프로세스가 인덱스에서 뺄 수 있도록)
+    """
+    if not content_ids:
+        return 0
+    result = ContentSearchDoc._get_collection().update_many(
+        {"content_id": {"$in": list(content_ids)}, "deleted": {"$ne": True}},
+        {"$set": {"deleted": True, "updated_at": now or datetime.now(timezone.utc)}},
+    )
+    return result.modified_count
+
+
+def purge_search_tombstones(now=None):
+    """
+    SEARCH_TOMBSTONE_TTL보다 오래된 deleted 검색 문서를 지웁니다.
+
+    그동안 폴링하지 않은 프로세스는 get_search_index가 인덱스를 처음부터 다시 만들므로 삭제를 놓치지 않습니다.
+    """
+    cutoff = (now or datetime.now(timezone.utc)) - timedelta(seconds=SEARCH_TOMBSTONE_TTL)
+    result = ContentSearchDoc._get_collection().delete_many({"deleted": True, "updated_at": {"$lt": cutoff}})
+    return result.deleted_count
+
+
+class SearchIndex:
+    """
+    검색 문서로 만든 메모리 역색인 (n-gram → [문서 슬롯 배열, 가중치 배열])
+
+    점수는 검색어 n-gram마다 IDF × 포화된 가중치(w / (w + 1.2))의 합이고,
+    정규화한 검색어가 제목에 그대로 들어 있으면 TITLE_MATCH_BOOST만큼 더합니다.
+    수정/삭제된 문서는 슬롯만 비우고 (self.entries[slot] = None) 새 슬롯에 다시 추가합니다.
+    """
+
+    def __init__(self):
+        self.entries = []  # 슬롯 → SearchEntry (비었으면 None)
+        self.slots = {}  # content_id → (슬롯, digest)
+        self.postings = {}  # n-gram → (array('I') 슬롯, array('B') 가중치)
+        self._orders = {}  # n-gram → (posting 길이, 가중치 내림차순 위치) - 단일 n-gram 검색용
+        self.dead = 0
+        self.polled_at = 0.0
+        self.synced_until = None  # 마지막으로 반영한 updated_at
+
+    @property
+    def size(self):
+        return len(self.slots)
+
+    def apply(self, doc):
+        """
+        검색 문서 하나를 반영합니다. (같은 digest면 무시)
+        """
+        updated_at = doc.get("updated_at")
+        if updated_at and (self.synced_until is None or updated_at > self.synced_until):
+            self.synced_until = updated_at
+
+        content_id = doc["content_id"]
+        current = self.slots.get(content_id)
+        if doc.get("deleted"):
+            if current:
+                self._remove(content_id)
+            return
+        if current and current[1] == doc.get("digest"):
+            return
+        if current:
+            self._remove(content_id)
+
+        slot = len(self.entries)
+        self.entries.append(SearchEntry(
+            content_id,
+            doc.get("title"),
+            doc.get("platform"),
+            doc.get("genre") or "",
+            doc.get("poster_url"),
+            normalize_text(doc.get("title")),
+            (doc.get("platform") or "").lower(),
+        ))
+        self.slots[content_id] = (slot, doc.get("digest"))
+        for gram, weight in (doc.get("terms") or {}).items():
+            posting = self.postings.get(gram)
+            if posting is None:
+                posting = self.postings[gram] = (array("I"), array("B"))
+            posting[0].append(slot)
+            posting[1].append(weight)
+
+    def _remove(self, content_id):
+        slot, _ = self.slots.pop(content_id)
+        self.entries[slot] = None
+        self.dead += 1
+
+    @property
+    def dead_ratio(self):
+        return self.dead / len(self.entries) if self.entries else 0.0
+
+    def search(self, query, platform=None, genre=None, limit=10):
+        """
+        :param query: 검색어 (띄어쓰기 무관)
+        :param platform: 플랫폼 (대소문자 무시, 정확히 일치)
+        :param genre: 장르 (장르 문자열에 포함되면 일치, 예: '로맨스' ⊂ '드라마, 로맨스')
+        :param limit: 최대 결과 수
+        :return: [(점수, SearchEntry), ...] 점수 높은 순
+        """
+        grams = set(char_ngrams(query))
+        if not grams:
+            return []
+
+        # 드문 n-gram부터 (흔한 n-gram은 다른 n-gram이 있으면 건너뜀)
+        total = max(self.size, 1)
+        weighted = []
+        for gram in grams:
+            posting = self.postings.get(gram)
+            if posting:
+                weighted.append((math.log(1 + total / len(posting[0])), gram, posting))
+        weighted.sort(key=lambda item: -item[0])
+        if len(weighted) > 1:
+            rare = [item for item in weighted if len(item[2][0]) <= total * COMMON_TERM_RATIO]
+            weighted = rare or weighted[:1]
+        if not weighted:
+            return []
+
+        key = normalize_text(query)
+        boost = TITLE_MATCH_BOOST * sum(idf for idf, _, _ in weighted)
+        platform = platform.lower() if platform else None
+
+        def accept(entry):
+            if entry is None:
+                return False
+            if platform and entry.platform_key != platform:
+                return False
+            return not genre or genre in entry.genre
+
+        # 가중치(0~255)별 점수표를 미리 만들어 두고 조회만 함
+        curves = [([idf * weight / (weight + 1.2) for weight in range(MAX_TERM_WEIGHT + 1)], gram, posting)
+                  for idf, gram, posting in weighted]
+        if len(curves) == 1:
+            top = self._top_single(*curves[0], accept, key, boost, limit)
+        else:
+            scores = {}
+            for curve, _, (slots, weights) in curves:
+                for slot, weight in zip(slots, weights):
+                    scores[slot] = scores.get(slot, 0.0) + curve[weight]
+
+            def candidates():
+                for slot, score in scores.items():
+                    entry = self.entries[slot]
+                    if accept(entry):
+                        yield score + (boost if key in entry.key else 0.0), -entry.content_id, entry
+
+            top = heapq.nlargest(limit, candidates())
+        return [(score, entry) for score, _, entry in top]
+
+    def _top_single(self, curve, gram, posting, accept, key, boost, limit):
+        """
+        n-gram 하나로 검색할 때 가중치가 큰 문서부터 보고, 남은 문서가 상위 limit개를 넘을 수 없으면 멈춥니다.
+
+        제목 일치 가산점은 제목에 n-gram이 있는 문서(가중치 TITLE_WEIGHT 이상)만 받을 수 있으므로
+        가중치가 낮은 쪽은 가산점 없이 상한을 계산합니다. ('하는'처럼 대부분의 줄거리에 나오는 n-gram도 일부만 확인)
+        """
+        slots, weights = posting
+        top = []  # (점수, -content_id, SearchEntry) 최소 힙
+        for position in self._weight_order(gram, posting):
+            weight = weights[position]
+            if len(top) >= limit and curve[weight] + (boost if weight >= TITLE_WEIGHT else 0.0) < top[0][0]:
+                break
+            entry = self.entries[slots[position]]
+            if not accept(entry):
+                continue
+            item = (curve[weight] + (boost if key in entry.key else 0.0), -entry.content_id, entry)
+            if len(top) < limit:
+                heapq.heappush(top, item)
+            elif item > top[0]:
+                heapq.heapreplace(top, item)
+        return sorted(top, reverse=True)
+
+    def _weight_order(self, gram, posting):
+        """
+        posting 위치를 가중치 내림차순으로 정렬한 배열 (n-gram별로 캐시, posting이 늘어나면 다시 계산)
+        """
+        weights = posting[1]
+        cached = self._orders.get(gram)
+        if cached is None or cached[0] != len(weights):
+            order = array("I", sorted(range(len(weights)), key=weights.__getitem__, reverse=True))
+            cached = self._orders[gram] = (len(weights), order)
+        return cached[1]
+
+
+_FIELDS = {"content_id": 1, "title": 1, "platform": 1, "genre": 1, "poster_url": 1,
+           "terms": 1, "digest": 1, "deleted": 1, "updated_at": 1}
+
+_search_index = None
+_search_lock = threading.Lock()
+
+
+def load_search_index():
+    """
+    contents_search 컬렉션 전체로 인덱스를 새로 만듭니다.
+    """
+    index = SearchIndex()
+    for doc in ContentSearchDoc._get_collection().find({"deleted": {"$ne": True}}, _FIELDS).batch_size(1000):
+        index.apply(doc)
+    index.polled_at = time.monotonic()
+    return index
+
+
+def poll_search_index(index):
+    """
+    마지막으로 반영한 뒤 바뀐 검색 문서만 읽어서 인덱스에 반영합니다.
+    """
+    if index.synced_until is not None:
+        query = {"updated_at": {"$gte": index.synced_until - timedelta(seconds=SEARCH_POLL_OVERLAP)}}
+    else:
+        query = {"deleted": {"$ne": True}}
+    for doc in ContentSearchDoc._get_collection().find(query, _FIELDS).batch_size(1000):
+        index.apply(doc)
+    index.polled_at = time.monotonic()
+
+
+def get_search_index():
+    """
+    프로세스 단위로 캐시된 검색 인덱스를 반환합니다.
+
+    SEARCH_POLL_INTERVAL마다 바뀐 문서만 반영하고, 빈 슬롯이 많아지거나 오래 폴링하지 않았으면
+    (그사이 deleted 문서가 정리됐을 수 있음) 처음부터 다시 만듭니다.
+    갱신하는 동안 다른 요청은 기존 인덱스를 그대로 사용합니다. (처음 만드는 경우만 대기, 서버 시작 시 warm_up_search_index로 미리 만듦)
+    """
+    global _search_index
+
+    index = _search_index
+    if index is not None and time.monotonic() - index.polled_at < SEARCH_POLL_INTERVAL:
+        return index
+
+    # 다른 스레드가 이미 갱신 중이면 기다리지 않고 기존 인덱스 반환
+    if not _search_lock.acquire(blocking=index is None):
+        return index
+    try:
+        index = _search_index
+        if index is None or time.monotonic() - index.polled_at >= SEARCH_TOMBSTONE_TTL / 2:
+            index = load_search_index()
+        elif time.monotonic() - index.polled_at >= SEARCH_POLL_INTERVAL:
+            try:
+                poll_search_index(index)
+                if index.dead_ratio > SEARCH_REBUILD_DEAD_RATIO:
+                    index = load_search_index()
+            except Exception as e:
+                # 폴링에 실패해도 기존 인덱스로 계속 검색
+                index.polled_at = time.monotonic()
+                print(f"검색 인덱스 갱신 중 오류 발생: {str(e)}")
+        _search_index = index
+        return index
+    finally:
+        _search_lock.release()
+
+
+def warm_up_search_index():
+    """
+    검색 인덱스를 미리 만듭니다. (첫 검색 요청이 전체 로드를 기다리지 않도록 서버 시작 시 백그라운드에서 호출)
+    """
+    try:
+        get_search_index()
+    except Exception as e:
+        print(f"검색 인덱스 미리 만들기 중 오류 발생: {str(e)}")
+
+
+def search_contents(query, platform=None, genre=None, limit=10):
+    """
+    콘텐츠 제목/줄거리 검색
+
+    :return: [{"content_id", "title", "platform", "genre", "poster_url", "score"}, ...]
+    """
+    limit = max(1, min(limit, SEARCH_MAX_LIMIT))
+    return [
+        {
+            "content_id": entry.content_id,
+            "title": entry.title,
+            "platform": entry.platform,
+            "genre": entry.genre,
+            "poster_url": entry.poster_url,
+            "score": round(score, 4),
+        }
+        for score, entry in get_search_index().search(query, platform=platform, genre=genre, limit=limit)
+    ]
@@ -0,0 +1,143 @@
+import io
+import json
+from types import SimpleNamespace
+from unittest import mock
+
+from django.test import SimpleTestCase
+
+from .importer import build_update, iter_json_items, map_item
+from .rollup import apply_entry_to_rollup, escape_field
+from .search import SearchIndex, build_terms, search_digest
+
+ITEMS = [
+    {"ID": 1, "Title": "첫 번째", "Genre": "드라마", "Year": 2020},
+    {"ID": "2", "Title": "두 번째 {괄호} \"따옴표\" [배열]", "PosterURL": ""},
+    {"ID": 3, "Title": "세 번째", "Synopsis": "줄바꿈\n포함, 쉼표"},
+]
+
+
+class IterJsonItemsTest(SimpleTestCase):
+    """
+    스트리밍 JSON 파서가 json.load와 같은 항목을 내는지 확인합니다. (MongoDB 불필요)
+    """
+
+    def parse(self, text, chunk_size):
+        return list(iter_json_items(io.StringIO(text), chunk_size=chunk_size))
+
+    def test_array_across_chunk_boundaries(self):
+        text = json.dumps(ITEMS, ensure_ascii=False, indent=2)
+        # 항목이 버퍼 경계에서 잘리는 작은 청크까지 모두 같은 결과
+        for chunk_size in (1, 2, 7, 64, len(text)):
+            self.assertEqual(self.parse(text, chunk_size), ITEMS)
+
+    def test_json_lines(self):
+        text = "\n".join(json.dumps(item, ensure_ascii=False) for item in ITEMS) + "\n"
+        for chunk_size in (1, 5, 1 << 16):
+            self.assertEqual(self.parse(text, chunk_size), ITEMS)
+
+    def test_empty_inputs(self):
+        for text in ("", "   \n", "[]", "[ \n ]"):
+            self.assertEqual(self.parse(text, 4), [])
+
+    def test_truncated_file_raises(self):
+        with self.assertRaises(json.JSONDecodeError):
+            self.parse('[{"ID": 1, "Title": "잘림"', 4)
+
+
+class MapItemTest(SimpleTestCase):
+    def test_maps_and_normalizes_fields(self):
+        self.assertEqual(map_item(ITEMS[0]), {"content_id": 1, "title": "첫 번째", "genre": "드라마", "year": "2020"})
+        self.assertEqual(map_item(ITEMS[1])["content_id"], 2)
+        self.assertNotIn("poster_url", map_item(ITEMS[1]))
+
+    def test_rejects_invalid_items(self):
+        for item in ([], {"Title": "ID 없음"}, {"ID": "abc", "Title": "x"}, {"ID": True, "Title": "x"}, {"ID": 1, "Title": " "}):
+            with self.assertRaises(ValueError):
+                map_item(item)
+
+    def test_upsert_unsets_missing_fields(self):
+        update = build_update(map_item(ITEMS[0]))
+        self.assertEqual(update["$set"]["genre"], "드라마")
+        self.assertIn("poster_url", update["$unset"])
+        self.assertNotIn("genre", update["$unset"])
+        self.assertNotIn("content_id", update["$unset"])
+
+
+def search_doc(content_id, title, synopsis="", platform="Netflix", genre="드라마", deleted=False):
+    doc = {"content_id": content_id, "title": title, "synopsis": synopsis, "platform": platform, "genre": genre}
+    doc.update(terms=build_terms(title, synopsis), digest=search_digest(doc), deleted=deleted)
+    return doc
+
+
+class SearchIndexTest(SimpleTestCase):
+    """
+    메모리 검색 인덱스의 순위, 필터, 수정/삭제 반영을 확인합니다. (MongoDB 불필요)
+    """
+
+    def setUp(self):
+        self.index = SearchIndex()
+        for doc in (
+            search_doc(1, "나의 옆자리 이드님", "회사 옆자리 동료와의 로맨스", genre="드라마, 로맨스"),
+            search_doc(2, "옆집 사람", "이웃과의 이야기", platform="Watcha"),
+            search_doc(3, "바다의 노래", "옆자리에 앉은 소년이 바다로 떠나는 이야기"),
+        ):
+            self.index.apply(doc)
+
+    def ids(self, query, **kwargs):
+        return [entry.content_id for _, entry in self.index.search(query, **kwargs)]
+
+    def test_title_match_ranks_first(self):
+        self.assertEqual(self.ids("옆자리"), [1, 3])
+        # 띄어쓰기와 대소문자가 달라도 같은 결과
+        self.assertEqual(self.ids("옆 자리"), [1, 3])
+        self.assertEqual(self.ids("없는검색어"), [])
+
+    def test_filters(self):
+        self.assertEqual(self.ids("옆", platform="watcha"), [2])
+        self.assertEqual(self.ids("옆자리", genre="로맨스"), [1])
+        self.assertEqual(self.ids("옆자리", limit=1), [1])
+
+    def test_update_and_delete(self):
+        self.index.apply(search_doc(3, "옆자리 바다", "소년의 이야기"))
+        self.assertEqual(self.index.size, 3)
+        self.assertEqual(self.index.dead, 1)
+        self.assertEqual(self.index.entries[self.index.slots[3][0]].title, "옆자리 바다")
+
+        # 같은 digest면 다시 추가하지 않음
+        self.index.apply(search_doc(3, "옆자리 바다", "소년의 이야기"))
+        self.assertEqual(self.index.dead, 1)
+
+        self.index.apply(search_doc(1, "나의 옆자리 이드님", deleted=True))
+        self.assertEqual(self.ids("옆자리"), [3])
+        self.assertNotIn(1, self.index.slots)
+        self.assertEqual(self.index.dead_ratio, 2 / 4)
+
+
+class RollupTest(SimpleTestCase):
+    """
+    감정/MBTI 이름이 그대로 $inc 필드 경로가 되지 않는지 확인합니다. (MongoDB 불필요)
+    """
+
+    def apply(self, emotions, mbti=None, sign=1):
+        entry = SimpleNamespace(emoticons=SimpleNamespace(emotion=emotions))
+        with mock.patch("home.rollup.DailyEmotionRollup") as rollup:
+            apply_entry_to_rollup("2025-02-10", entry, mbti, sign=sign)
+        calls = rollup._get_collection.return_value.update_one.call_args_list
+        return calls[0].args[1]["$inc"] if calls else None
+
+    def test_escapes_field_names(self):
+        self.assertEqual(escape_field("a.b"), "a%2Eb")
+        self.assertEqual(escape_field("$기쁨"), "%24기쁨")
+        self.assertEqual(escape_field("100%.$"), "100%25%2E%24")
+        self.assertEqual(
+            self.apply(["기쁨", "a.b", "$x", "기쁨"], mbti="EN.FP"),
+            {
+                "emotions.기쁨": 2, "mbti_emotions.EN%2EFP.기쁨": 2,
+                "emotions.a%2Eb": 1, "mbti_emotions.EN%2EFP.a%2Eb": 1,
+                "emotions.%24x": 1, "mbti_emotions.EN%2EFP.%24x": 1,
+            },
+        )
+
+    def test_skips_empty_names(self):
+        self.assertEqual(self.apply(["", "슬픔"], sign=-1), {"emotions.슬픔": -1})
+        self.assertIsNone(self.apply([""]))
@@ -8,6 +8,8 @@ urlpatterns = [
     path("calendar/monthread/<str:year_month>", CalendarMonthReadView.as_view(), name="calendar_month_read"),
     path("calendar/detail_read/<str:date>", CalendarDetailReadView.as_view(), name="calendar_detail"),
     path("calendar/personal_info",PersonalInfoView.as_view(),name="personal_info"),
+    path("contents/search", ContentSearchView.as_view(), name="content_search"),
+    path("redis/metrics", RedisPoolMetricsView.as_view(), name="redis_pool_metrics"),
 
 
     # path("bedrock/all/<str:date>", CallBedrockAllPlatform.as_view(), name="bedrock_call_all"),
@@ -4,11 +4,16 @@ from .serializers import *
 from rest_framework.views import APIView
 from rest_framework.response import Response
 from rest_framework import status
-from rest_framework.permissions import IsAuthenticated
+from rest_framework.permissions import AllowAny, IsAuthenticated
 from .models import Calendar
 from .serializers import CalendarSerializer
 from datetime import datetime, timedelta
 from .bedrock import *
+from .rollup import apply_entry_to_rollup
+from .activity import record_active_writer
+from .redis import get_redis_pool_stats
+from .search import search_contents
+from momo.cache import cache_per_user, invalidate_user
 
 
 class CalendarWriteView(APIView):
@@ -57,6 +62,9 @@ class CalendarWriteView(APIView):
 
             calendar.entries[date_key] = new_entry  # 🔥 `Entry` 객체로 저장
             calendar.save()
+            invalidate_user("calendar_month", user_id)
+            self.update_rollup(date_key, new_entry, calendar.mbti)
+            self.record_activity(user_id, new_entry, calendar.mbti)
             return Response(CalendarSerializer(calendar).data, status=status.HTTP_200_OK)
 
         else:
@@ -66,9 +74,26 @@ class CalendarWriteView(APIView):
                 entries={date_key: new_entry}  # 🔥 `Entry` 객체로 저장
             )
             new_calendar.save()
+            invalidate_user("calendar_month", user_id)
+            self.update_rollup(date_key, new_entry, new_calendar.mbti)
+            self.record_activity(user_id, new_entry, new_calendar.mbti)
 
             return Response(CalendarSerializer(new_calendar).data, status=status.HTTP_201_CREATED)
 
+    def update_rollup(self, date_key, entry, mbti):
+        # 날짜별 감정 롤업 갱신 (실패해도 캘린더 저장은 유지)
+        try:
+            apply_entry_to_rollup(date_key, entry, mbti, sign=1)
+        except Exception as e:
+            print(f"감정 롤업 갱신 중 오류 발생: {str(e)}")
+
+    def record_activity(self, user_id, entry, mbti):
+        # 일/월 활성 작성자 HyperLogLog 갱신 (실패해도 캘린더 저장은 유지)
+        try:
+            record_active_writer(user_id, mbti, entry)
+        except Exception as e:
+            print(f"활성 작성자 집계 중 오류 발생: {str(e)}")
+
 class CalendarReadView(APIView):
     permission_classes = [IsAuthenticated]
 
@@ -161,8 +186,16 @@ class CalendarDeleteView(APIView):
                 return Response({"error": "Entry for the specified date not found."}, status=status.HTTP_404_NOT_FOUND)
 
             # 특정 날짜 데이터 삭제
+            deleted_entry = calendar.entries[target_date_str]
             del calendar.entries[target_date_str]
             calendar.save()  # 변경사항 저장
+            invalidate_user("calendar_month", user_id)
+
+            # 날짜별 감정 롤업에서 차감
+            try:
+                apply_entry_to_rollup(target_date_str, deleted_entry, calendar.mbti, sign=-1)
+            except Exception as e:
+                print(f"감정 롤업 갱신 중 오류 발생: {str(e)}")
 
             return Response({"message": "Calendar entry for the specified date deleted successfully."},
                             status=status.HTTP_200_OK)
@@ -175,6 +208,8 @@ class CalendarMonthReadView(APIView):
     특정 월(YYYY-MM)에 해당하는 작성된 날짜 리스트 반환 API
     """
     permission_classes = [IsAuthenticated]
+
+    @cache_per_user("calendar_month")
     def get(self, request, year_month):
         """
         특정 연-월 (예: 2025-03) 요청 시, 해당 월에 작성된 날짜 목록을 반환
@@ -201,6 +236,7 @@ class CalendarMonthReadView(APIView):
 class PersonalInfoView(APIView):
     permission_classes = [IsAuthenticated]
 
+    @cache_per_user("personal_info")
     def get(self, request, user_id=None):
         """
         특정 user_id에 대한 mbti와 subscribe_platform 정보를 반환
@@ -254,6 +290,7 @@ class PersonalInfoView(APIView):
 
             # 변경 사항 저장
             calendar.save()
+            invalidate_user("personal_info", user_id)
 
             return Response({"message": message}, status=status.HTTP_200_OK if calendar.id else status.HTTP_201_CREATED)
 
@@ -262,6 +299,52 @@ class PersonalInfoView(APIView):
                             status=status.HTTP_500_INTERNAL_SERVER_ERROR)
 
 
+class ContentSearchView(APIView):
+    """
+    콘텐츠 제목/줄거리 검색 API
+    (예: /home/contents/search?q=옆자리&platform=Netflix&genre=로맨스&limit=10)
+
+    공개 카탈로그만 검색하므로 로그인 없이 사용할 수 있습니다. (사용자 데이터 없음)
+    """
+    permission_classes = [AllowAny]
+
+    def get(self, request):
+        query = request.GET.get("q", "").strip()
+        if not query:
+            return Response({"error": "'q' is required"}, status=status.HTTP_400_BAD_REQUEST)
+
+        try:
+            limit = int(request.GET.get("limit", 10))
+        except ValueError:
+            return Response({"error": "'limit' must be an integer"}, status=status.HTTP_400_BAD_REQUEST)
+
+        try:
+            results = search_contents(
+                query,
+                platform=request.GET.get("platform") or None,
+                genre=request.GET.get("genre") or None,
+                limit=limit,
+            )
+        except Exception as e:
+            return Response({"error": f"An error occurred: {str(e)}"},
+                            status=status.HTTP_500_INTERNAL_SERVER_ERROR)
+
+        return Response({"query": query, "results": results}, status=status.HTTP_200_OK)
+
+
+class RedisPoolMetricsView(APIView):
+    """
+    현재 워커 프로세스의 Redis 연결 풀 사용 현황
+    """
+
+    def get(self, request):
+        try:
+            return Response(get_redis_pool_stats(), status=status.HTTP_200_OK)
+        except Exception as e:
+            return Response({"error": f"An error occurred: {str(e)}"},
+                            status=status.HTTP_500_INTERNAL_SERVER_ERROR)
+
+
 
 
 # bedrock 앱으로 이동
@@ -0,0 +1,110 @@
+from datetime import datetime, timedelta
+
+from .cube import MBTI_TYPES
+from .redis import redis_client
+
+# Redis 키 (moom-back-calendar home/activity.py에서 기록)
+ACTIVE_EMOTIONS_KEY = "active:emotions"
+# 기간 합집합(PFMERGE) 결과를 재사용하는 시간 (초)
+ACTIVE_RANGE_TTL = 60
+# 기간별 키 보관 기간 (초, moom-back-calendar home/activity.py의 DAY_KEY_TTL / MONTH_KEY_TTL과 같은 값)
+KEY_TTLS = {"day": 90 * 24 * 3600, "month": 400 * 24 * 3600}
+# 한 번에 조회할 수 있는 최대 기간 (보관 기간을 넘지 않도록)
+MAX_PERIODS = {"day": 90, "month": 13}
+
+PERIOD_FORMATS = {"day": '%Y-%m-%d', "month": '%Y-%m'}
+
+
+def active_key(period, value, dimension="all", label=None):
+    """
+    HyperLogLog 키 (예: active:day:2025-02-10:mbti:ENFP, active:month:2025-02:all)
+    """
+    key = f"active:{period}:{value}:{dimension}"
+    return f"{key}:{label}" if label else key
+
+
+def period_values(period, start, end, now=None):
+    """
+    start ~ end 사이의 일(YYYY-MM-DD) 또는 월(YYYY-MM) 목록
+
+    :param now: 기준 시각 (테스트용, 기본 현재 시각)
+    :raises ValueError: 형식이 잘못됐거나 기간이 너무 길거나, 키가 이미 만료된 기간을 포함하는 경우
+    """
+    if period not in PERIOD_FORMATS:
+        raise ValueError(f"Unsupported period: {period}")
+
+    fmt = PERIOD_FORMATS[period]
+    current = datetime.strptime(start, fmt)
+    last = datetime.strptime(end, fmt)
+    if current > last:
+        raise ValueError("'start' must not be after 'end'")
+
+    # 만료된 키는 0으로 세어지므로 보관 기간보다 오래된 기간은 거절
+    oldest = ((now or datetime.now()) - timedelta(seconds=KEY_TTLS[period])).strftime(fmt)
+    if current.strftime(fmt) < oldest:
+        raise ValueError(f"'start' must not be before {oldest} (data is kept for {KEY_TTLS[period] // 86400} days)")
+
+    values = []
+    while current <= last:
+        values.append(current.strftime(fmt))
+        if len(values) > MAX_PERIODS[period]:
+            raise ValueError(f"Range is too long (max {MAX_PERIODS[period]} {period}s)")
+        if period == "day":
+            current += timedelta(days=1)
+        else:
+            current = (current.replace(day=28) + timedelta(days=4)).replace(day=1)
+    return values
+
+
+def count_active_writers(period, start, end=None):
+    """
+    기간 내 고유 작성자 수 (HyperLogLog 근사값, 오차 약 0.81%)
+
+    하루/한 달이면 PFCOUNT 한 번, 여러 기간이면 PFMERGE로 합친 키를 잠시 보관해서
+    같은 대시보드 조회가 반복돼도 다시 합치지 않습니다.
+
+    :param period: "day" 또는 "month"
+    :param start: 시작 (YYYY-MM-DD 또는 YYYY-MM)
+    :param end: 끝 (기본 start)
+    :return: {"all": n, "mbti": {MBTI: n}, "emotion": {감정: n}}
+    """
+    end = end or start
+    values = period_values(period, start, end)
+    emotions = sorted(redis_client.smembers(ACTIVE_EMOTIONS_KEY))
+
+    dimensions = [("all", None)]
+    dimensions += [("mbti", mbti) for mbti in MBTI_TYPES]
+    dimensions += [("emotion", emotion) for emotion in emotions]
+
+    # 차원별로 조회할 키 (여러 기간이면 합집합 키와 원본 키 목록)
+    sources = []
+    for dimension, label in dimensions:
+        keys = [active_key(period, value, dimension, label) for value in values]
+        if len(keys) == 1:
+            sources.append((keys[0], None))
+        else:
+            sources.append((active_key(f"range:{period}", f"{start}:{end}", dimension, label), keys))
+
+    # 아직 없는 합집합 키만 PFMERGE
+    pipe = redis_client.pipeline(transaction=False)
+    for key, keys in sources:
+        if keys:
+            pipe.exists(key)
+    exists = iter(pipe.execute())
+
+    pipe = redis_client.pipeline(transaction=False)
+    for key, keys in sources:
+        if keys and not next(exists):
+            pipe.pfmerge(key, *keys)
+            pipe.expire(key, ACTIVE_RANGE_TTL)
+    for key, _ in sources:
+        pipe.pfcount(key)
+    counts = pipe.execute()[-len(sources):]
+
+    result = {"all": 0, "mbti": {}, "emotion": {}}
+    for (dimension, label), count in zip(dimensions, counts):
+        if dimension == "all":
+            result["all"] = count
+        elif count:
+            result[dimension][label] = count
+    return result
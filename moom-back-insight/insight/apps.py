@@ -1,6 +1,24 @@
+import os
+import sys
+import threading
+
 from django.apps import AppConfig
 
 
 class InsightConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'insight'
+
+    def ready(self):
+        # 서버 프로세스에서만 백그라운드로 렌더링 풀을 미리 띄움 (migrate 등 관리 명령은 제외)
+        if os.getenv('INSIGHT_RENDER_WARMUP', 'true').lower() not in ('1', 'true'):
+            return
+        if os.path.basename(sys.argv[0]) == 'manage.py':
+            if sys.argv[1:2] != ['runserver']:
+                return
+            # runserver는 자동 재시작 감시 프로세스와 실제 서버 프로세스(RUN_MAIN=true) 모두 ready()를 호출함
+            if os.environ.get('RUN_MAIN') != 'true' and '--noreload' not in sys.argv:
+                return
+
+        from .render_pool import warm_up_render_pool
+        threading.Thread(target=warm_up_render_pool, name='insight-render-warmup', daemon=True).start()
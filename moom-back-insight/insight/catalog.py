@@ -0,0 +1,152 @@
+import re
+import threading
+import time
+import unicodedata
+from collections import namedtuple
+
+import environ
+
+from .models import Contents
+from .redis import redis_client
+
+# 환경 변수 설정
+env = environ.Env()
+
+# 카탈로그 버전을 확인하지 못해도 (Redis 장애 등) 이 주기마다 인덱스를 다시 만듦 (초)
+CATALOG_INDEX_TTL = env.int('CATALOG_INDEX_TTL', default=300)
+# 카탈로그 버전 키를 확인하는 주기 (초)
+CATALOG_VERSION_CHECK_INTERVAL = env.float('CATALOG_VERSION_CHECK_INTERVAL', default=5.0)
+# 콘텐츠 적재(import_contents) 때마다 1씩 증가하는 Redis 키
+CATALOG_VERSION_KEY = "catalog:version"
+
+# 정규화 시 제거할 문자 (공백, 구두점, 따옴표, 괄호 등)
+_NON_WORD_PATTERN = re.compile(r"[\W_]+", re.UNICODE)
+
+# 튜플 기반이라 인스턴스마다 __dict__가 없음
+CatalogEntry = namedtuple("CatalogEntry", ["content_id", "title", "poster_url"])
+
+
+def normalize_title(title):
+    """
+    제목 비교용 정규화 키 (NFKC, 소문자, 공백/구두점 제거)
+    """
+    if not title:
+        return ""
+    return _NON_WORD_PATTERN.sub("", unicodedata.normalize("NFKC", title).lower())
+
+
+class CatalogIndex:
+    """
+    Contents 카탈로그의 content_id / 제목 / 정규화 제목 인덱스
+
+    같은 제목의 콘텐츠가 여러 개면 Contents.objects(title=...).first()와 같이 첫 번째 문서를 사용합니다.
+    """
+
+    def __init__(self, entries, version=None):
+        self.version = version
+        self.by_id = {}
+        self.by_title = {}
+        self.by_normalized_title = {}
+        for entry in entries:
+            self.by_id.setdefault(entry.content_id, entry)
+            self.by_title.setdefault(entry.title, entry)
+            self.by_normalized_title.setdefault(normalize_title(entry.title), entry)
+
+    @classmethod
+    def build(cls, version=None):
+        docs = Contents.objects.only("content_id", "title", "poster_url").as_pymongo()
+        return cls(
+            (
+                CatalogEntry(
+                    doc["content_id"],
+                    doc.get("title"),
+                    doc.get("poster_url"),
+                )
+                for doc in docs
+                if doc.get("content_id") is not None
+            ),
+            version=version,
+        )
+
+    def get(self, content_id):
+        return self.by_id.get(content_id)
+
+    def get_by_title(self, title):
+        """
+        제목이 정확히 일치하는 항목, 없으면 정규화 제목이 일치하는 항목
+        """
+        return self.by_title.get(title) or self.by_normalized_title.get(normalize_title(title))
+
+
+_catalog_index = None
+_catalog_index_built_at = 0.0
+_version_checked_at = 0.0
+_catalog_lock = threading.Lock()
+_rebuild_lock = threading.Lock()  # 인덱스를 다시 만드는 스레드는 하나만
+
+
+def get_catalog_version():
+    """
+    Redis의 카탈로그 버전 (확인할 수 없으면 None)
+    """
+    try:
+        return redis_client.get(CATALOG_VERSION_KEY) or "0"
+    except Exception as e:
+        print(f"카탈로그 버전 확인 중 오류 발생: {str(e)}")
+        return None
+
+
+def get_catalog_index():
+    """
+    프로세스 단위로 캐시된 카탈로그 인덱스를 반환합니다.
+
+    CATALOG_VERSION_CHECK_INTERVAL마다 catalog:version을 확인해서 바뀌었으면 새로 만들고,
+    버전을 확인할 수 없으면 CATALOG_INDEX_TTL마다 새로 만듭니다.
+    인덱스를 다시 만드는 동안 다른 요청은 기존 인덱스를 그대로 사용합니다. (처음 만드는 경우만 대기)
+    """
+    global _catalog_index, _catalog_index_built_at, _version_checked_at
+
+    index = _catalog_index
+    if index is not None and time.time() - _version_checked_at < CATALOG_VERSION_CHECK_INTERVAL:
+        return index
+
+    # 다른 스레드가 이미 확인/갱신 중이면 기다리지 않고 기존 인덱스 반환
+    if not _rebuild_lock.acquire(blocking=index is None):
+        return index
+    try:
+        index = _catalog_index
+        if index is not None and time.time() - _version_checked_at < CATALOG_VERSION_CHECK_INTERVAL:
+            return index
+
+        version = get_catalog_version()
+        _version_checked_at = time.time()
+        if version is not None:
+            stale = index is None or version != index.version
+        else:
+            # 버전을 확인할 수 없을 때만 TTL로 갱신
+            stale = index is None or time.time() - _catalog_index_built_at > CATALOG_INDEX_TTL
+
+        if stale:
+            index = CatalogIndex.build(version)  # _catalog_lock 밖에서 만든 뒤 교체
+            with _catalog_lock:
+                _catalog_index = index
+                _catalog_index_built_at = time.time()
+        return index
+    finally:
+        _rebuild_lock.release()
+
+
+def lookup_contents_by_titles(titles):
+    """
+    여러 제목의 콘텐츠 정보를 프로세스에 캐시된 카탈로그에서 찾습니다. (Mongo 조회 없음)
+
+    :param titles: 제목 목록
+    :return: {제목: (카탈로그 제목, 포스터 URL)}
+    """
+    index = get_catalog_index()
+    contents = {}
+    for title in set(titles):
+        entry = index.get_by_title(title)
+        if entry is not None:
+            contents[title] = (entry.title, entry.poster_url)
+    return contents
@@ -0,0 +1,116 @@
+import io
+
+from .plotting import setup_plotting
+
+
+def draw_mbti_emotion_stats(mbti_emotion_counts):
+    """
+    MBTI별 감정 통계 막대 그래프
+
+    :param mbti_emotion_counts: {MBTI: {감정: 합계}}
+    :return: Figure
+    """
+    plt, sns = setup_plotting()
+
+    # 시각화 생성
+    fig, ax = plt.subplots(figsize=(12, 8))
+    colors = sns.color_palette("husl", len(mbti_emotion_counts))  # 색상 팔레트 설정
+
+    for idx, (mbti, emotions) in enumerate(mbti_emotion_counts.items()):
+        ax.bar(emotions.keys(), emotions.values(), label=mbti, color=colors[idx])
+
+    ax.set_xlabel('Emotions')
+    ax.set_ylabel('Counts')
+    ax.set_title('MBTI Emotion Statistics')
+    ax.legend(title='MBTI Types')
+
+    return fig
+
+
+def draw_mbti_member_count(mbti_counts):
+    """
+    MBTI별 회원 수 막대 그래프
+
+    :param mbti_counts: {MBTI: 회원 수}
+    :return: Figure
+    """
+    plt, sns = setup_plotting()
+
+    # 시각화 생성
+    fig, ax = plt.subplots(figsize=(10, 6))
+    mbti_types = list(mbti_counts.keys())
+    counts = list(mbti_counts.values())
+    ax.bar(mbti_types, counts, color=sns.color_palette("husl", len(mbti_types)))
+
+    ax.set_xlabel('MBTI Type')
+    ax.set_ylabel('Member Count')
+    ax.set_title('Member Count by MBTI')
+
+    return fig
+
+
+def draw_today_emotion_top5(payload):
+    """
+    오늘 선택된 감정별 상위 5개 콘텐츠 그래프 (감정마다 subplot 하나)
+
+    :param payload: {"date": 날짜, "emotions": {감정: [[제목, 감정 카운트], ...]}}
+    :return: Figure
+    """
+    today = payload["date"]
+    top_5_movies = payload["emotions"]
+
+    plt, sns = setup_plotting()
+
+    # 시각화 설정
+    fig, axes = plt.subplots(nrows=len(top_5_movies), ncols=1, figsize=(10, 5 * len(top_5_movies)))
+
+    if len(top_5_movies) == 1:
+        axes = [axes]  # 단일 플롯일 경우 리스트로 변환
+
+    for ax, (emotion, movies) in zip(axes, top_5_movies.items()):
+        titles = [title for title, _ in movies]
+        scores = [score for _, score in movies]
+        ax.bar(titles, scores, color=sns.color_palette("husl", len(titles)))
+        ax.set_title(f"Top 5 Movies for Emotion: {emotion} on {today}")
+        ax.set_xlabel("Movie Title")
+        ax.set_ylabel("Total Emotion Count")
+
+    fig.tight_layout()
+
+    return fig
+
+
+# 차트 이름 → 그리기 함수 (데이터셋 이름과 동일)
+CHARTS = {
+    "mbti_all": draw_mbti_emotion_stats,
+    "mbti_member": draw_mbti_member_count,
+    "today_top5_emotion": draw_today_emotion_top5,
+}
+
+
+def render(chart, payload, format="png", dpi=100, width=None, height=None):
+    """
+    차트를 그려서 이미지 bytes로 변환합니다.
+
+    :param chart: 차트 이름 (CHARTS)
+    :param payload: 집계 데이터
+    :param format: png / svg / webp
+    :param dpi: 해상도
+    :param width: 가로 크기 (px, None이면 차트 기본값)
+    :param height: 세로 크기 (px, None이면 차트 기본값)
+    :return: 이미지 bytes
+    """
+    plt, _ = setup_plotting()
+    fig = CHARTS[chart](payload)
+    if width or height:
+        default_width, default_height = fig.get_size_inches()
+        fig.set_size_inches(
+            width / dpi if width else default_width,
+            height / dpi if height else default_height,
+        )
+
+    # 이미지로 변환
+    buf = io.BytesIO()
+    fig.savefig(buf, format=format, dpi=dpi, bbox_inches='tight')  # 그래프가 잘리지 않도록 설정
+    plt.close(fig)
+    return buf.getvalue()
@@ -0,0 +1,313 @@
+import threading
+import time
+from datetime import datetime, timedelta
+
+import environ
+import numpy as np
+
+from .models import Calendar, ContentEmotionCounter
+from .scan import iter_raw
+
+# 환경 변수 설정
+env = environ.Env()
+
+# 프로세스 내 큐브를 다시 만드는 주기 (초)
+INSIGHT_CUBE_TTL = env.int('INSIGHT_CUBE_TTL', default=300)
+# 날짜 축 큐브에 포함할 최근 일수
+INSIGHT_CUBE_DAYS = env.int('INSIGHT_CUBE_DAYS', default=30)
+
+MBTI_TYPES = [
+    "ISTJ", "ISFJ", "INFJ", "INTJ",
+    "ISTP", "ISFP", "INFP", "INTP",
+    "ESTP", "ESFP", "ENFP", "ENTP",
+    "ESTJ", "ESFJ", "ENFJ", "ENTJ",
+]
+
+
+class Vocabulary:
+    """
+    축의 라벨 ↔ 인덱스 매핑
+    """
+
+    def __init__(self, labels=()):
+        self.labels = []
+        self.index = {}
+        for label in labels:
+            self.add(label)
+
+    def add(self, label):
+        position = self.index.get(label)
+        if position is None:
+            position = len(self.labels)
+            self.index[label] = position
+            self.labels.append(label)
+        return position
+
+    def __len__(self):
+        return len(self.labels)
+
+
+class EmotionCube:
+    """
+    MBTI × 감정 × 콘텐츠 (선택적으로 날짜 축 추가) 카운트 큐브
+
+    0이 아닌 칸만 COO 형식(int32 좌표 배열 + int64 카운트 배열)으로 저장해서
+    메모리가 축 크기의 곱이 아니라 실제 (라벨 조합) 행 수에 비례합니다.
+    주변합(marginal), 임의 축 기준 top-k, 필터 조회를 배열 연산(isin, bincount)으로 처리합니다.
+
+    get_cube로 공개된 큐브는 수정하지 않습니다. (갱신은 새 큐브를 만들어 교체)
+    """
+
+    def __init__(self, with_dates=False):
+        self.axes = (("date",) if with_dates else ()) + ("mbti", "emotion", "content")
+        self.vocabs = {axis: Vocabulary(MBTI_TYPES if axis == "mbti" else ()) for axis in self.axes}
+        self.cells = {}  # 좌표 튜플 → 행 번호
+        self.coords = np.zeros((8, len(self.axes)), dtype=np.int32)
+        self.values = np.zeros(8, dtype=np.int64)
+        self.size = 0
+        self.built_at = time.time()
+
+    def _grow(self, size):
+        capacity = len(self.values)
+        if size <= capacity:
+            return
+        capacity = max(capacity, 8)
+        while capacity < size:
+            capacity *= 2
+        coords = np.zeros((capacity, len(self.axes)), dtype=np.int32)
+        coords[:self.size] = self.coords[:self.size]
+        values = np.zeros(capacity, dtype=np.int64)
+        values[:self.size] = self.values[:self.size]
+        self.coords, self.values = coords, values
+
+    def add_many(self, rows):
+        """
+        (라벨 딕셔너리, 카운트) 목록을 한 번에 더합니다. (큐브를 만드는 동안에만 사용)
+
+        :param rows: [({"mbti": ..., "emotion": ..., "content": ...}, count), ...]
+        """
+        positions = []
+        counts = []
+        new_coords = []
+        for labels, count in rows:
+            coord = tuple(self.vocabs[axis].add(labels[axis]) for axis in self.axes)
+            position = self.cells.get(coord)
+            if position is None:
+                position = self.cells[coord] = self.size + len(new_coords)
+                new_coords.append(coord)
+            positions.append(position)
+            counts.append(count)
+
+        if not positions:
+            return
+        if max(len(vocab) for vocab in self.vocabs.values()) > np.iinfo(np.int32).max:
+            raise OverflowError("Cube axis is too large for int32 coordinates")
+
+        self._grow(self.size + len(new_coords))
+        if new_coords:
+            self.coords[self.size:self.size + len(new_coords)] = new_coords
+            self.size += len(new_coords)
+        np.add.at(self.values, np.asarray(positions), np.asarray(counts, dtype=np.int64))
+
+    def without(self, axis, labels):
+        """
+        축의 특정 라벨 구간을 뺀 새 큐브를 반환합니다. (해당 구간을 다시 집계하기 전에 사용, 원본은 그대로)
+        """
+        position = self.axes.index(axis)
+        indexes = [self.vocabs[axis].index[label] for label in labels if label in self.vocabs[axis].index]
+        keep = ~np.isin(self.coords[:self.size, position], indexes)
+
+        cube = EmotionCube(with_dates="date" in self.axes)
+        cube.vocabs = {name: Vocabulary(vocab.labels) for name, vocab in self.vocabs.items()}
+        cube.coords = self.coords[:self.size][keep].copy()
+        cube.values = self.values[:self.size][keep].copy()
+        cube.size = len(cube.values)
+        cube.cells = {tuple(coord): row for row, coord in enumerate(cube.coords.tolist())}
+        return cube
+
+    def _select(self, filters):
+        """
+        필터에 맞는 행의 좌표/카운트와 축별 라벨 목록을 반환합니다.
+
+        :param filters: {축: 라벨 또는 라벨 목록}
+        """
+        unknown = set(filters) - set(self.axes)
+        if unknown:
+            raise ValueError(f"Unknown axis: {', '.join(sorted(unknown))}")
+
+        coords = self.coords[:self.size]
+        values = self.values[:self.size]
+        labels = {}
+        for position, axis in enumerate(self.axes):
+            selected = filters.get(axis)
+            if selected is None:
+                labels[axis] = self.vocabs[axis].labels
+                continue
+
+            if isinstance(selected, str):
+                selected = [selected]
+            selected = [label for label in selected if label in self.vocabs[axis].index]
+            mask = np.isin(coords[:, position], [self.vocabs[axis].index[label] for label in selected])
+            coords, values = coords[mask], values[mask]
+            labels[axis] = selected
+        return coords, values, labels
+
+    def slice(self, **filters):
+        """
+        필터를 적용한 부분 큐브를 밀집 배열로 반환합니다. (필터 없이 부르면 축 크기의 곱만큼 메모리를 씀)
+
+        :return: (배열, {축: 라벨 목록})
+        """
+        coords, values, labels = self._select(filters)
+        dense_coords = []
+        for position, axis in enumerate(self.axes):
+            # 어휘 인덱스 → 선택된 라벨 목록에서의 위치
+            lookup = np.full(len(self.vocabs[axis]), -1, dtype=np.int64)
+            lookup[[self.vocabs[axis].index[label] for label in labels[axis]]] = np.arange(len(labels[axis]))
+            dense_coords.append(lookup[coords[:, position]])
+
+        data = np.zeros([len(labels[axis]) for axis in self.axes], dtype=np.int64)
+        np.add.at(data, tuple(dense_coords), values)
+        return data, labels
+
+    def marginal(self, axis, **filters):
+        """
+        한 축을 제외한 나머지 축을 합산합니다.
+
+        :return: {라벨: 카운트} (카운트 0 제외)
+        """
+        vector, labels = self._marginal_vector(axis, filters)
+        return {label: int(count) for label, count in zip(labels, vector) if count}
+
+    def top_k(self, axis, k=5, **filters):
+        """
+        축 기준 합계 상위 k개를 partition으로 뽑습니다. (동점이면 먼저 등록된 라벨 우선)
+
+        :return: [(라벨, 카운트), ...]
+        """
+        vector, labels = self._marginal_vector(axis, filters)
+        k = min(k, len(vector))
+        if k <= 0:
+            return []
+
+        # k번째 값과 같은 라벨까지 모두 후보로 둔 뒤 (값 내림차순, 등록 순서)로 정렬
+        # (argpartition만 쓰면 k번째 값과 동점인 라벨 중 어느 것이 남을지 정해지지 않음)
+        kth = -np.partition(-vector, k - 1)[k - 1]
+        candidates = np.flatnonzero(vector >= kth)
+        candidates = candidates[np.lexsort((candidates, -vector[candidates]))][:k]
+        return [(labels[index], int(vector[index])) for index in candidates if vector[index] > 0]
+
+    def _marginal_vector(self, axis, filters):
+        if axis not in self.axes:
+            raise ValueError(f"Unknown axis: {axis}")
+
+        coords, values, labels = self._select(filters)
+        position = self.axes.index(axis)
+        vocab = self.vocabs[axis]
+        vector = np.zeros(len(vocab), dtype=np.int64)
+        np.add.at(vector, coords[:, position], values)
+        if axis in filters:
+            vector = vector[[vocab.index[label] for label in labels[axis]]]
+        return vector, labels[axis]
+
+
+def build_content_cube():
+    """
+    ContentEmotionCounter(평탄화된 통계)에서 MBTI × 감정 × 콘텐츠 큐브를 만듭니다.
+
+    카운터 문서에는 변경 시각이 없어 바뀐 행만 다시 읽을 수 없으므로, INSIGHT_CUBE_TTL마다 프로세스별로
+    전체를 다시 읽습니다. (필요한 4개 필드만 스트리밍, 갱신하는 동안 요청은 기존 큐브 사용)
+    """
+    cube = EmotionCube()
+    rows = iter_raw(ContentEmotionCounter, ["mbti", "emotion", "title", "count"], batch_size=5000, count__gt=0)
+    cube.add_many(
+        ({"mbti": row["mbti"], "emotion": row["emotion"], "content": row["title"]}, row["count"])
+        for row in rows
+    )
+    return cube
+
+
+def _daily_rows(start):
+    """
+    start 날짜 이후 캘린더 항목을 (날짜, MBTI, 감정, 추천 콘텐츠) 단위로 집계합니다.
+    """
+    pipeline = [
+        {"$match": {"mbti": {"$nin": [None, ""]}}},
+        {"$project": {"mbti": 1, "entries": {"$objectToArray": {"$ifNull": ["$entries", {}]}}}},
+        {"$unwind": "$entries"},
+        {"$match": {"entries.k": {"$gte": start}, "entries.v.recommend_content": {"$nin": [None, ""]}}},
+        {"$unwind": "$entries.v.emoticons.emotion"},
+        {"$group": {
+            "_id": {
+                "date": "$entries.k",
+                "mbti": "$mbti",
+                "emotion": "$entries.v.emoticons.emotion",
+                "content": "$entries.v.recommend_content",
+            },
+            "count": {"$sum": 1},
+        }},
+        {"$sort": {"_id.date": 1}},
+    ]
+    return ((row["_id"], row["count"]) for row in Calendar.objects.aggregate(pipeline, allowDiskUse=True))
+
+
+def daily_cube_start(days=INSIGHT_CUBE_DAYS):
+    return (datetime.now() - timedelta(days=days - 1)).strftime('%Y-%m-%d')
+
+
+def build_daily_cube(days=INSIGHT_CUBE_DAYS):
+    """
+    최근 days일의 캘린더 항목에서 날짜 × MBTI × 감정 × 추천 콘텐츠 큐브를 만듭니다.
+    """
+    cube = EmotionCube(with_dates=True)
+    cube.start = daily_cube_start(days)
+    cube.add_many(_daily_rows(cube.start))
+    return cube
+
+
+def refresh_daily_cube(cube):
+    """
+    날짜 축 큐브에서 오늘 구간만 다시 집계한 새 큐브를 반환합니다. (지난 날짜는 복사, 원본 큐브는 그대로)
+    """
+    today = datetime.now().strftime('%Y-%m-%d')
+    refreshed = cube.without("date", [today])
+    refreshed.start = cube.start
+    refreshed.add_many(_daily_rows(today))
+    return refreshed
+
+
+_cubes = {}
+_cube_locks = {False: threading.Lock(), True: threading.Lock()}
+
+
+def get_cube(with_dates=False):
+    """
+    프로세스 단위로 캐시된 큐브를 반환합니다.
+
+    INSIGHT_CUBE_TTL이 지나면 콘텐츠 큐브는 다시 만들고, 날짜 축 큐브는 오늘 구간만 다시 집계합니다.
+    (날짜가 바뀌어 기간이 밀리면 전체를 다시 만듦)
+    새 큐브는 따로 만든 뒤 교체하고, 그동안 다른 요청은 기존 큐브를 그대로 사용합니다.
+    """
+    cube = _cubes.get(with_dates)
+    if cube is not None and time.time() - cube.built_at <= INSIGHT_CUBE_TTL:
+        return cube
+
+    lock = _cube_locks[with_dates]
+    # 다른 스레드가 이미 갱신 중이면 기다리지 않고 기존 큐브 반환 (처음 만드는 경우만 대기)
+    if not lock.acquire(blocking=cube is None):
+        return cube
+    try:
+        cube = _cubes.get(with_dates)
+        if cube is not None and time.time() - cube.built_at <= INSIGHT_CUBE_TTL:
+            return cube
+
+        if not with_dates:
+            cube = build_content_cube()
+        elif cube is None or cube.start != daily_cube_start():
+            cube = build_daily_cube()
+        else:
+            cube = refresh_daily_cube(cube)
+        _cubes[with_dates] = cube
+        return cube
+    finally:
+        lock.release()
@@ -0,0 +1,141 @@
+from collections import Counter, defaultdict
+from datetime import datetime
+
+from .catalog import lookup_contents_by_titles
+from .models import DailyEmotionRollup
+from .pipelines import (
+    aggregate_mbti_emotion_counts,
+    aggregate_mbti_member_counts,
+    aggregate_top_contents_by_emotion,
+    iter_recommend_contents_by_mbti,
+)
+from .scan import TopK
+
+
+def compute_mbti_emotion_stats():
+    """
+    MBTI별 감정 통계
+
+    :return: {MBTI: {감정: 합계}}
+    """
+    return aggregate_mbti_emotion_counts()
+
+
+def compute_mbti_top5_contents():
+    """
+    MBTI별 추천 콘텐츠 상위 5개
+
+    :return: {MBTI: [{"title", "poster_url"}, ...]}
+    """
+    # MBTI별 추천 콘텐츠 카운트 저장 (mbti와 recommend_content만 스트리밍으로 한 번에 집계)
+    mbti_recommend_count = defaultdict(lambda: defaultdict(int))
+
+    for calendar in iter_recommend_contents_by_mbti():
+        mbti = calendar.get("mbti")
+        for recommend_content in calendar["recommend_contents"]:
+            if recommend_content:
+                mbti_recommend_count[mbti][recommend_content] += 1
+
+    # MBTI별 추천 콘텐츠 상위 5개 추출 (전체 정렬 대신 크기 5의 힙 유지)
+    top = TopK(5)
+    for mbti, recommend_count in mbti_recommend_count.items():
+        for title, count in recommend_count.items():
+            top.push(mbti, count, title)
+
+    top_5_titles_by_mbti = {
+        mbti: [title for title, _ in top.items(mbti)]
+        for mbti in mbti_recommend_count
+    }
+
+    # 콘텐츠 정보는 한 번의 $in 쿼리로 가져오기
+    contents = lookup_contents_by_titles(
+        title for titles in top_5_titles_by_mbti.values() for title in titles
+    )
+
+    return {
+        mbti: [
+            {"title": contents[title][0], "poster_url": contents[title][1]}
+            for title in titles if title in contents
+        ]
+        for mbti, titles in top_5_titles_by_mbti.items()
+    }
+
+
+def compute_mbti_member_counts():
+    """
+    MBTI별 회원 수
+
+    :return: {MBTI: 회원 수}
+    """
+    return dict(aggregate_mbti_member_counts())
+
+
+def compute_emotion_top5_contents():
+    """
+    감정별 상위 5개 콘텐츠
+
+    :return: {감정: [{"title", "poster_url"}, ...]}
+    """
+    top_contents = aggregate_top_contents_by_emotion(limit=5)
+    return {
+        emotion: [{"title": movie["title"], "poster_url": movie.get("poster_url")} for movie in movies]
+        for emotion, movies in top_contents.items()
+    }
+
+
+def unescape_field(name):
+    """
+    롤업 필드 이름을 감정/MBTI 이름으로 복원합니다. (moom-back-calendar home/rollup.py의 escape_field 반대)
+    """
+    return name.replace("%2E", ".").replace("%24", "$").replace("%25", "%")
+
+
+def collect_emotions_for_date(target_date):
+    """
+    특정 날짜의 감정 선택 횟수 (날짜별 롤업 문서 하나만 조회)
+
+    롤업 문서의 필드 순서(그날 처음 선택된 순서)를 그대로 유지합니다.
+
+    :return: Counter {감정: 횟수}
+    """
+    rollup = DailyEmotionRollup.objects(date=target_date).only("emotions").as_pymongo().first()
+    if not rollup:
+        return Counter()
+
+    return Counter({
+        unescape_field(emotion): count
+        for emotion, count in (rollup.get("emotions") or {}).items()
+        # 이스케이프 전에 '.'이 든 감정으로 생긴 하위 문서 등 숫자가 아닌 값은 무시
+        if isinstance(count, (int, float)) and not isinstance(count, bool) and count > 0
+    })
+
+
+def compute_today_emotion_top5(target_date=None):
+    """
+    오늘 선택된 감정별 상위 5개 콘텐츠
+
+    :return: {"date": 날짜, "emotions": {감정: [[제목, 감정 카운트], ...]}}
+    """
+    target_date = target_date or datetime.now().strftime('%Y-%m-%d')
+    emotion_counts = collect_emotions_for_date(target_date)
+
+    top_5_movies = {}
+    if emotion_counts:
+        # 오늘 선택된 감정에 대해서만 상위 5개 영화 추출 (Mongo aggregation)
+        top_contents = aggregate_top_contents_by_emotion(limit=5, emotions=emotion_counts.keys())
+        top_5_movies = {
+            emotion: [[movie["title"], movie["count"]] for movie in movies]
+            for emotion, movies in top_contents.items()
+        }
+
+    return {"date": target_date, "emotions": top_5_movies}
+
+
+# 스냅샷 이름 → 계산 함수 (URL 이름과 동일)
+DATASETS = {
+    "mbti_all": compute_mbti_emotion_stats,
+    "mbti_top5_contents": compute_mbti_top5_contents,
+    "mbti_member": compute_mbti_member_counts,
+    "emotion_top5": compute_emotion_top5_contents,
+    "today_top5_emotion": compute_today_emotion_top5,
+}
@@ -0,0 +1,117 @@
+import random
+import time
+import tracemalloc
+from collections import defaultdict
+
+from django.core.management.base import BaseCommand, CommandError
+from mongoengine.context_managers import switch_collection
+
+from insight.models import ContentEmotionStats
+from insight.scan import TopK, iter_raw
+
+MBTI_TYPES = ["ISTJ", "ISFJ", "INFJ", "INTJ", "ISTP", "ISFP", "INFP", "INTP",
+              "ESTP", "ESFP", "ENFP", "ENTP", "ESTJ", "ESFJ", "ENFJ", "ENTJ"]
+EMOTIONS = ["기쁨", "슬픔", "분노", "불안", "설렘", "평온", "지루함", "외로움"]
+# 벤치마크가 만들고 지우는 컬렉션은 이 접두사로 시작해야 함 (실제 컬렉션 삭제 방지)
+BENCHMARK_COLLECTION_PREFIX = "insight_scan_benchmark"
+
+
+def measure(scan):
+    """
+    scan()의 실행 시간과 tracemalloc 최대 메모리를 측정합니다.
+    """
+    tracemalloc.start()
+    started_at = time.perf_counter()
+    result = scan()
+    elapsed = time.perf_counter() - started_at
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return result, elapsed, peak
+
+
+class Command(BaseCommand):
+    help = (
+        "합성 ContentEmotionStats 컬렉션에서 감정별 top-k 스캔을 벤치마크합니다. "
+        "(문서 전체 로드 + 정렬 vs 원시 커서 + 고정 크기 힙)"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--documents", type=int, default=1_000_000,
+                            help="합성 문서 수")
+        parser.add_argument("--collection", default="insight_scan_benchmark",
+                            help=f"벤치마크용 임시 컬렉션 이름 ({BENCHMARK_COLLECTION_PREFIX}로 시작)")
+        parser.add_argument("--k", type=int, default=5, help="감정별 상위 개수")
+        parser.add_argument("--batch-size", type=int, default=1000, help="커서 배치 크기")
+        parser.add_argument("--skip-naive", action="store_true",
+                            help="문서 전체를 로드하는 기존 방식 측정 생략")
+        parser.add_argument("--keep", action="store_true",
+                            help="측정 후 임시 컬렉션을 삭제하지 않음")
+
+    def handle(self, *args, **options):
+        if not options["collection"].startswith(BENCHMARK_COLLECTION_PREFIX):
+            raise CommandError(
+                f"--collection은 {BENCHMARK_COLLECTION_PREFIX}로 시작해야 합니다. (측정 후 컬렉션을 삭제함)"
+            )
+
+        with switch_collection(ContentEmotionStats, options["collection"]) as Stats:
+            collection = Stats._get_collection()
+            if collection.estimated_document_count() < options["documents"]:
+                collection.drop()
+                self.populate(collection, options["documents"])
+
+            try:
+                if not options["skip_naive"]:
+                    result, elapsed, peak = measure(lambda: self.naive_scan(Stats, options["k"]))
+                    self.report("문서 로드 + 정렬", elapsed, peak)
+
+                result, elapsed, peak = measure(
+                    lambda: self.streaming_scan(Stats, options["k"], options["batch_size"])
+                )
+                self.report("원시 커서 + TopK", elapsed, peak)
+            finally:
+                if not options["keep"]:
+                    collection.drop()
+
+    def populate(self, collection, documents):
+        self.stdout.write(f"합성 문서 {documents}개 생성 중...")
+        rng = random.Random(0)
+        batch = []
+        for index in range(documents):
+            batch.append({
+                "content_id": index,
+                "title": f"콘텐츠 {index}",
+                "poster_url": f"https://example.com/{index}.jpg",
+                "mbti_emotions": {
+                    mbti: {emotion: rng.randint(1, 10_000) for emotion in rng.sample(EMOTIONS, 3)}
+                    for mbti in rng.sample(MBTI_TYPES, 4)
+                },
+            })
+            if len(batch) >= 10_000:
+                collection.insert_many(batch, ordered=False)
+                batch = []
+        if batch:
+            collection.insert_many(batch, ordered=False)
+
+    def naive_scan(self, Stats, k):
+        # 기존 뷰와 같은 방식: 모든 (제목, 카운트) 쌍을 리스트에 모은 뒤 정렬
+        emotion_movie_scores = defaultdict(list)
+        for stat in Stats.objects.all():
+            for mbti, emotions in stat.mbti_emotions.items():
+                for emotion, count in emotions.items():
+                    emotion_movie_scores[emotion].append((stat.title, count, stat.poster_url))
+
+        return {
+            emotion: sorted(movies, key=lambda x: x[1], reverse=True)[:k]
+            for emotion, movies in emotion_movie_scores.items()
+        }
+
+    def streaming_scan(self, Stats, k, batch_size):
+        top = TopK(k)
+        for stat in iter_raw(Stats, ["title", "poster_url", "mbti_emotions"], batch_size=batch_size):
+            for emotions in stat["mbti_emotions"].values():
+                for emotion, count in emotions.items():
+                    top.push(emotion, count, (stat["title"], stat["poster_url"]))
+        return top.result()
+
+    def report(self, name, elapsed, peak):
+        self.stdout.write(f"{name}: {elapsed:.2f}s, 최대 메모리 {peak / 1024 / 1024:.1f}MB")
@@ -0,0 +1,62 @@
+import json
+import os
+import subprocess
+import sys
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+# 새 인터프리터에서 실행할 측정 스크립트 (이미 import된 모듈의 영향을 받지 않도록)
+BENCHMARK_SCRIPT = """
+import json, sys, time
+
+started_at = time.perf_counter()
+import django
+django.setup()
+import insight.views
+import_seconds = time.perf_counter() - started_at
+plotting_loaded = "matplotlib.pyplot" in sys.modules
+
+from insight.charts import render
+
+payload = {mbti: index + 1 for index, mbti in enumerate(["ENFP", "INTJ", "ISTJ", "ESFP"])}
+timings = []
+for _ in range(2):
+    started_at = time.perf_counter()
+    render("mbti_member", payload)
+    timings.append(time.perf_counter() - started_at)
+
+print(json.dumps({
+    "import_seconds": import_seconds,
+    "plotting_loaded_on_import": plotting_loaded,
+    "first_render_seconds": timings[0],
+    "second_render_seconds": timings[1],
+}))
+"""
+
+
+class Command(BaseCommand):
+    help = (
+        "새 프로세스에서 insight 뷰 import 시간과 첫 차트/두 번째 차트 렌더링 시간을 측정합니다. "
+        "(워커 콜드 스타트 비용 확인용)"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--runs", type=int, default=3, help="측정 반복 횟수")
+
+    def handle(self, *args, **options):
+        env = dict(os.environ, DJANGO_SETTINGS_MODULE=os.environ.get("DJANGO_SETTINGS_MODULE", "momo.settings"),
+                   INSIGHT_RENDER_WARMUP="false")
+
+        for run in range(options["runs"]):
+            completed = subprocess.run(
+                [sys.executable, "-c", BENCHMARK_SCRIPT],
+                cwd=settings.BASE_DIR, env=env, capture_output=True, text=True, check=True,
+            )
+            result = json.loads(completed.stdout.strip().splitlines()[-1])
+            self.stdout.write(
+                f"[{run + 1}] import {result['import_seconds'] * 1000:.0f}ms "
+                f"(pyplot 로드: {result['plotting_loaded_on_import']}), "
+                f"첫 렌더링 {result['first_render_seconds'] * 1000:.0f}ms, "
+                f"두 번째 렌더링 {result['second_render_seconds'] * 1000:.0f}ms"
+            )
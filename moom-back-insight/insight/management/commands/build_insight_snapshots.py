@@ -0,0 +1,29 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from insight.snapshots import INSIGHT_SNAPSHOT_INTERVAL, build_all_snapshots
+
+
+class Command(BaseCommand):
+    help = "insight 데이터셋 스냅샷을 주기적으로 계산해서 저장합니다."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--interval", type=float, default=INSIGHT_SNAPSHOT_INTERVAL,
+                            help="스냅샷 계산 주기 (초)")
+        parser.add_argument("--once", action="store_true",
+                            help="한 번만 계산하고 종료")
+
+    def handle(self, *args, **options):
+        interval = options["interval"]
+
+        while True:
+            started_at = time.time()
+            versions = build_all_snapshots()
+            elapsed = time.time() - started_at
+            self.stdout.write(f"스냅샷 저장 완료 ({elapsed:.2f}s): {versions}")
+
+            if options["once"]:
+                return
+
+            time.sleep(max(0.0, interval - elapsed))
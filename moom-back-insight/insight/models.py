@@ -5,9 +5,14 @@ class ContentEmotionStats(Document):
     """
     콘텐츠별 MBTI 감정 통계를 저장하는 모델
 
+    카탈로그(Contents)의 content_id를 기준으로 저장하고, 제목과 포스터는 조회용으로 함께 저장합니다.
+    카탈로그에서 찾지 못한 제목은 content_id 없이 원본 제목으로 저장됩니다.
+
     구조:
     {
+        "content_id": 123,
         "title": "영화제목",
+        "poster_url": "https://...",
         "mbti_emotions": {
             "ENFP": {
                 "기쁨": 3,
@@ -21,14 +26,20 @@ class ContentEmotionStats(Document):
         }
     }
     """
-    title = StringField(required=True, unique=True)
+    content_id = IntField()  # Contents.content_id (카탈로그에 없는 제목이면 비어 있음)
+    title = StringField(required=True)
+    poster_url = StringField()
     mbti_emotions = DictField(default={})  # MBTI별 감정 카운트를 저장
+    flush_batch = StringField()  # 마지막으로 반영된 flush 묶음 ID (재처리 시 중복 $inc 방지)
 
     meta = {
         'collection': 'content_emotion_stats',
         'indexes': [
+            {'fields': ['content_id'], 'unique': True, 'sparse': True},
             'title'
-        ]
+        ],
+        # 기존 title unique 인덱스 정리가 필요하므로 인덱스는 migrate_emotion_stats 명령에서 생성
+        'auto_create_index': False
     }
 
     def add_emotions(self, mbti: str, emotions: list):
@@ -71,7 +82,42 @@ class ContentEmotionStats(Document):
         :return: 감정 카운트 (없으면 0 반환)
         """
         return self.mbti_emotions.get(mbti, {}).get(emotion, 0)
-    
+
+
+class ContentEmotionCounter(Document):
+    """
+    콘텐츠 × MBTI × 감정별 카운트를 한 행씩 저장하는 모델
+
+    ContentEmotionStats.mbti_emotions(중첩 DictField)는 특정 감정의 카운트로 인덱싱/정렬할 수 없으므로,
+    같은 데이터를 평탄화해서 함께 유지합니다. (감정별/MBTI별 상위 콘텐츠를 인덱스 순서대로 조회)
+
+    구조:
+    {
+        "content_id": 123,
+        "title": "영화제목",
+        "poster_url": "https://...",
+        "mbti": "ENFP",
+        "emotion": "기쁨",
+        "count": 3
+    }
+    """
+    content_id = IntField()  # Contents.content_id (카탈로그에 없는 제목이면 비어 있음)
+    title = StringField(required=True)
+    poster_url = StringField()
+    mbti = StringField(required=True)
+    emotion = StringField(required=True)
+    count = IntField(default=0)
+    flush_batch = StringField()  # 마지막으로 반영된 flush 묶음 ID (재처리 시 중복 $inc 방지)
+
+    meta = {
+        'collection': 'content_emotion_counters',
+        'indexes': [
+            {'fields': ['content_id', 'title', 'mbti', 'emotion'], 'unique': True},
+            {'fields': ['emotion', '-count']},  # 감정별 상위 콘텐츠
+            {'fields': ['mbti', 'emotion', '-count']}  # MBTI + 감정별 상위 콘텐츠
+        ]
+    }
+
 
 # Emoticons (Embedded Document)
 class Emoticons(EmbeddedDocument):
@@ -124,4 +170,52 @@ class Contents(Document):
             'content_id',  # content_id로 인덱스 생성
             'title'  # title로 인덱스 생성
         ]
+    }
+
+
+class DailyEmotionRollup(Document):
+    """
+    날짜별 감정 선택 횟수 롤업
+
+    캘린더 항목 작성/삭제 시 원자적 증가/감소($inc)로 갱신됩니다.
+    (rebuild_daily_emotion_rollup 명령으로 기간별 재계산 가능)
+    감정/MBTI 이름의 '%', '.', '$'는 필드 이름으로 쓸 수 있게 퍼센트 인코딩해서 저장합니다. (예: 'a.b' → 'a%2Eb')
+
+    구조:
+    {
+        "date": "2025-02-10",
+        "emotions": {"기쁨": 3, "슬픔": 1},
+        "mbti_emotions": {
+            "ENFP": {"기쁨": 2},
+            "INTJ": {"기쁨": 1, "슬픔": 1}
+        }
+    }
+    """
+    date = StringField(required=True, unique=True)  # YYYY-MM-DD
+    emotions = DictField(default={})  # 감정별 선택 횟수
+    mbti_emotions = DictField(default={})  # MBTI별 감정 선택 횟수 (MBTI가 없는 회원은 제외)
+
+    meta = {
+        'collection': 'daily_emotion_rollup'
+    }
+
+
+class InsightSnapshot(Document):
+    """
+    insight 데이터셋의 버전별 스냅샷
+
+    build_insight_snapshots 명령이 주기적으로 계산해서 저장하고, 뷰는 최신 스냅샷을 그대로 응답합니다.
+    payload는 JSON 문자열로 저장합니다. (MBTI가 없는 키 등 Mongo 키로 쓸 수 없는 값 보존)
+    """
+    name = StringField(required=True)  # 데이터셋 이름 (예: "mbti_all")
+    version = IntField(required=True)  # 데이터셋별 증가 버전
+    created_at = fields.DateTimeField(required=True)
+    etag = StringField(required=True)  # payload 해시
+    payload = StringField(required=True)
+
+    meta = {
+        'collection': 'insight_snapshots',
+        'indexes': [
+            {'fields': ['name', '-version'], 'unique': True}
+        ]
     }
\ No newline at end of file
@@ -0,0 +1,154 @@
+from collections import Counter
+
+from .models import Calendar, ContentEmotionStats
+
+
+def _emotion_rows_pipeline():
+    """
+    ContentEmotionStats 문서를 (콘텐츠, MBTI, 감정, 카운트) 행으로 펼치는 파이프라인 단계
+
+    mbti_emotions는 {MBTI: {감정: 횟수}} 형태이므로 $objectToArray로 두 번 펼칩니다.
+    mi / ei는 원래 딕셔너리 안에서의 순서로, 동점이나 결과 키 순서를 기존 Python 구현
+    (문서 순서 → MBTI 순서 → 감정 순서로 처음 나온 순서)과 같게 유지하는 데 사용합니다.
+    """
+    return [
+        {"$project": {
+            "title": 1,
+            "poster_url": 1,
+            "mbti": {"$objectToArray": {"$ifNull": ["$mbti_emotions", {}]}},
+        }},
+        {"$unwind": {"path": "$mbti", "includeArrayIndex": "mi"}},
+        {"$project": {
+            "title": 1,
+            "poster_url": 1,
+            "mi": 1,
+            "mbti": "$mbti.k",
+            "emotion": {"$objectToArray": "$mbti.v"},
+        }},
+        {"$unwind": {"path": "$emotion", "includeArrayIndex": "ei"}},
+    ]
+
+
+def aggregate_mbti_emotion_counts():
+    """
+    MBTI별 감정 카운트 합계를 서버에서 집계합니다.
+
+    :return: {MBTI: {감정: 합계}} (기존 구현과 같이 처음 나온 순서)
+    """
+    pipeline = _emotion_rows_pipeline() + [
+        {"$group": {
+            "_id": {"mbti": "$mbti", "emotion": "$emotion.k"},
+            "count": {"$sum": "$emotion.v"},
+            "first": {"$min": {"doc": "$_id", "mi": "$mi", "ei": "$ei"}},
+        }},
+    ]
+    rows = list(ContentEmotionStats.objects.aggregate(pipeline, allowDiskUse=True))
+
+    # MBTI는 처음 나온 (문서, MBTI) 위치 순, 같은 MBTI 안의 감정은 처음 나온 위치 순
+    mbti_first = {}
+    for row in rows:
+        position = (row["first"]["doc"], row["first"]["mi"])
+        mbti = row["_id"]["mbti"]
+        if mbti not in mbti_first or position < mbti_first[mbti]:
+            mbti_first[mbti] = position
+    rows.sort(key=lambda row: (
+        mbti_first[row["_id"]["mbti"]],
+        (row["first"]["doc"], row["first"]["mi"], row["first"]["ei"]),
+    ))
+
+    mbti_emotion_counts = {}
+    for row in rows:
+        mbti_emotion_counts.setdefault(row["_id"]["mbti"], {})[row["_id"]["emotion"]] = row["count"]
+    return mbti_emotion_counts
+
+
+def aggregate_mbti_member_counts():
+    """
+    MBTI별 회원 수를 서버에서 집계합니다. (MBTI가 비어 있는 회원 제외)
+
+    :return: Counter {MBTI: 회원 수} (기존 구현과 같이 처음 나온 순서)
+    """
+    pipeline = [
+        {"$match": {"mbti": {"$nin": [None, ""]}}},
+        {"$group": {"_id": "$mbti", "count": {"$sum": 1}, "first": {"$min": "$_id"}}},
+        {"$sort": {"first": 1}},
+    ]
+    return Counter({row["_id"]: row["count"] for row in Calendar.objects.aggregate(pipeline)})
+
+
+def aggregate_top_contents_by_emotion(limit=5, emotions=None):
+    """
+    감정별로 (콘텐츠, MBTI) 카운트가 가장 큰 행을 limit개씩 서버에서 뽑습니다.
+
+    기존 구현과 같이 MBTI별 카운트를 합산하지 않고 각 행을 그대로 비교하며,
+    동점이면 문서 순서 → MBTI 순서 → 감정 순서를 따릅니다.
+    $topN으로 그룹마다 limit개만 유지하므로 행 전체를 정렬하거나 배열에 모으지 않습니다. (MongoDB 5.2 이상)
+
+    :param limit: 감정별 개수
+    :param emotions: 대상 감정 목록 (None이면 전체)
+    :return: {감정: [{"title", "count", "poster_url"}, ...]} (기존 구현과 같이 감정이 처음 나온 순서)
+    """
+    pipeline = _emotion_rows_pipeline()
+    if emotions is not None:
+        pipeline.append({"$match": {"emotion.k": {"$in": list(emotions)}}})
+    pipeline += [
+        {"$group": {
+            "_id": "$emotion.k",
+            "contents": {"$topN": {
+                "n": limit,
+                "sortBy": {"emotion.v": -1, "_id": 1, "mi": 1, "ei": 1},
+                "output": {
+                    "title": "$title",
+                    "count": "$emotion.v",
+                    "poster_url": "$poster_url",
+                },
+            }},
+            "first": {"$min": {"doc": "$_id", "mi": "$mi", "ei": "$ei"}},
+        }},
+        {"$sort": {"first": 1}},
+    ]
+
+    return {
+        row["_id"]: row["contents"]
+        for row in ContentEmotionStats.objects.aggregate(pipeline, allowDiskUse=True)
+    }
+
+
+def aggregate_emotion_counts_for_date(target_date):
+    """
+    특정 날짜에 작성된 캘린더 항목의 감정 선택 횟수를 서버에서 집계합니다.
+
+    :param target_date: 날짜 문자열 (YYYY-MM-DD)
+    :return: Counter {감정: 횟수} (기존 구현과 같이 처음 나온 순서)
+    """
+    entry_path = f"entries.{target_date}"
+    pipeline = [
+        {"$match": {entry_path: {"$exists": True}}},
+        {"$project": {"emotion": f"${entry_path}.emoticons.emotion"}},
+        {"$unwind": {"path": "$emotion", "includeArrayIndex": "i"}},
+        {"$group": {"_id": "$emotion", "count": {"$sum": 1}, "first": {"$min": {"doc": "$_id", "i": "$i"}}}},
+        {"$sort": {"first": 1}},
+    ]
+    return Counter({row["_id"]: row["count"] for row in Calendar.objects.aggregate(pipeline)})
+
+
+def iter_recommend_contents_by_mbti(batch_size=1000):
+    """
+    캘린더별 (MBTI, 추천 콘텐츠 목록)만 서버에서 추려서 스트리밍합니다.
+
+    entries는 날짜별 맵이므로 $objectToArray로 펼친 뒤 recommend_content만 남깁니다.
+    (일기, Bedrock 응답 등 큰 필드는 전송하지 않음)
+
+    :return: {"mbti": ..., "recommend_contents": [...]} 커서
+    """
+    pipeline = [
+        {"$project": {
+            "_id": 0,
+            "mbti": 1,
+            "recommend_contents": {"$map": {
+                "input": {"$objectToArray": {"$ifNull": ["$entries", {}]}},
+                "in": "$$this.v.recommend_content",
+            }},
+        }},
+    ]
+    return Calendar.objects.aggregate(pipeline, batchSize=batch_size)
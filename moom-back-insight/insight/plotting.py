@@ -0,0 +1,76 @@
+import glob
+import os
+import threading
+
+import environ
+
+# 환경 변수 설정
+env = environ.Env()
+
+# 한글 폰트 파일 경로 (비어 있으면 insight/fonts/ → 시스템 폰트 순서로 찾음)
+INSIGHT_FONT_PATH = env.str('INSIGHT_FONT_PATH', default='')
+# 폰트 파일을 찾지 못했을 때 시도할 폰트 이름 (Docker 이미지에는 Noto Sans CJK 설치)
+INSIGHT_FONT_FAMILIES = ["Noto Sans CJK KR", "NanumGothic", "Malgun Gothic", "AppleGothic", "DejaVu Sans"]
+
+FONTS_DIR = os.path.join(os.path.dirname(__file__), "fonts")
+
+_setup_lock = threading.Lock()
+_setup_done = False
+
+
+def _font_files():
+    if INSIGHT_FONT_PATH:
+        return [INSIGHT_FONT_PATH]
+    return sorted(
+        path
+        for pattern in ("*.ttf", "*.otf", "*.ttc")
+        for path in glob.glob(os.path.join(FONTS_DIR, pattern))
+    )
+
+
+def setup_plotting():
+    """
+    프로세스당 한 번 matplotlib(Agg)/seaborn을 불러오고 한글 폰트를 등록합니다.
+
+    pyplot과 seaborn은 여기서 처음 import하므로 차트를 그리지 않는 프로세스는 비용을 내지 않습니다.
+    폰트 목록은 matplotlib 폰트 캐시(MPLCONFIGDIR, 이미지 빌드 때 생성)를 사용합니다.
+
+    :return: (pyplot, seaborn)
+    """
+    global _setup_done
+    import matplotlib
+    if not _setup_done:
+        with _setup_lock:
+            if not _setup_done:
+                matplotlib.use("Agg")
+                from matplotlib import font_manager
+
+                families = []
+                for path in _font_files():
+                    font_manager.fontManager.addfont(path)
+                    families.append(font_manager.FontProperties(fname=path).get_name())
+
+                import seaborn as sns
+                sns.set(style="whitegrid")  # 스타일 설정 (rcParams를 초기화하므로 폰트보다 먼저)
+
+                matplotlib.rcParams["font.family"] = "sans-serif"
+                matplotlib.rcParams["font.sans-serif"] = families + INSIGHT_FONT_FAMILIES
+                matplotlib.rcParams["axes.unicode_minus"] = False  # 한글 폰트에서 마이너스 기호 깨짐 방지
+                _setup_done = True
+
+    import matplotlib.pyplot as plt
+    import seaborn as sns
+    return plt, sns
+
+
+def warm_up():
+    """
+    plotting 모듈을 불러오고 작은 한글 차트를 한 번 그려서 폰트/글리프 캐시를 채웁니다.
+    """
+    import io
+
+    plt, _ = setup_plotting()
+    fig, ax = plt.subplots(figsize=(1, 1))
+    ax.set_title("기쁨")
+    fig.savefig(io.BytesIO(), format="png")
+    plt.close(fig)
@@ -0,0 +1,146 @@
+import os
+import threading
+import time
+import weakref
+
+import redis
+import redis.asyncio
+import environ
+
+# 환경 변수 설정
+env = environ.Env()
+environ.Env.read_env()  # .env 파일 읽기
+
+redis_host = env('REDIS_HOST', default='localhost')
+redis_port = env.int('REDIS_PORT', default=6379)
+redis_db = env.int('REDIS_DB', default=0)
+
+# 연결 풀 설정
+REDIS_MAX_CONNECTIONS = env.int('REDIS_MAX_CONNECTIONS', default=50)  # 프로세스당 최대 연결 수
+REDIS_POOL_TIMEOUT = env.float('REDIS_POOL_TIMEOUT', default=2.0)  # 풀에 빈 연결이 없을 때 기다리는 시간 (초)
+REDIS_SOCKET_TIMEOUT = env.float('REDIS_SOCKET_TIMEOUT', default=3.0)  # 명령 응답 대기 시간 (초)
+REDIS_SOCKET_CONNECT_TIMEOUT = env.float('REDIS_SOCKET_CONNECT_TIMEOUT', default=1.0)  # 연결 대기 시간 (초)
+REDIS_HEALTH_CHECK_INTERVAL = env.int('REDIS_HEALTH_CHECK_INTERVAL', default=30)  # 유휴 연결 확인 주기 (초)
+
+
+def _connection_kwargs():
+    return {
+        "host": redis_host,
+        "port": redis_port,
+        "db": redis_db,
+        "decode_responses": True,
+        "max_connections": REDIS_MAX_CONNECTIONS,
+        "timeout": REDIS_POOL_TIMEOUT,
+        "socket_timeout": REDIS_SOCKET_TIMEOUT,
+        "socket_connect_timeout": REDIS_SOCKET_CONNECT_TIMEOUT,
+        "socket_keepalive": True,
+        "health_check_interval": REDIS_HEALTH_CHECK_INTERVAL,
+    }
+
+
+class InstrumentedConnectionPool(redis.BlockingConnectionPool):
+    """
+    연결을 빌려줄 때 대기 시간과 실패 횟수를 기록하는 연결 풀
+
+    BlockingConnectionPool은 연결이 max_connections개를 넘으면 새로 만들지 않고
+    REDIS_POOL_TIMEOUT까지만 기다린 뒤 ConnectionError를 냅니다. (요청 스레드가 무한정 멈추지 않음)
+
+    bedrock / insight / calendar는 Dockerfile별로 따로 빌드되어 공통 패키지를 둘 수 없으므로
+    각 서비스의 redis.py에 같은 코드를 둡니다. 수정할 때는 세 파일을 함께 바꿔 주세요.
+    """
+
+    def __init__(self, **kwargs):
+        super().__init__(**kwargs)
+        self.checkouts = 0
+        self.checkout_errors = 0
+        self.checkout_wait_seconds = 0.0
+        self.max_checkout_wait_seconds = 0.0
+
+    def get_connection(self, *args, **kwargs):
+        started_at = time.monotonic()
+        try:
+            return super().get_connection(*args, **kwargs)
+        except redis.ConnectionError:
+            self.checkout_errors += 1
+            raise
+        finally:
+            waited = time.monotonic() - started_at
+            self.checkouts += 1
+            self.checkout_wait_seconds += waited
+            self.max_checkout_wait_seconds = max(self.max_checkout_wait_seconds, waited)
+
+    def stats(self):
+        created = len(self._connections)
+        idle = sum(1 for connection in list(self.pool.queue) if connection is not None)
+        return {
+            "max_connections": self.max_connections,
+            "created": created,
+            "in_use": created - idle,
+            "idle": idle,
+            "checkouts": self.checkouts,
+            "checkout_errors": self.checkout_errors,
+            "avg_checkout_wait_ms": round(self.checkout_wait_seconds / self.checkouts * 1000, 3) if self.checkouts else 0.0,
+            "max_checkout_wait_ms": round(self.max_checkout_wait_seconds * 1000, 3),
+        }
+
+
+_client = None
+_client_pid = None
+_async_clients = weakref.WeakKeyDictionary()  # 이벤트 루프 → (PID, 클라이언트), 루프가 사라지면 함께 제거
+_client_lock = threading.Lock()
+
+
+def get_redis_client():
+    """
+    현재 프로세스의 Redis 클라이언트를 반환합니다.
+
+    처음 사용할 때 만들고, fork된 워커(PID가 바뀐 경우)에서는 부모의 소켓을 쓰지 않도록 새로 만듭니다.
+    """
+    global _client, _client_pid
+    if _client is None or _client_pid != os.getpid():
+        with _client_lock:
+            if _client is None or _client_pid != os.getpid():
+                pool = InstrumentedConnectionPool(**_connection_kwargs())
+                _client = redis.Redis(connection_pool=pool)
+                _client_pid = os.getpid()
+    return _client
+
+
+def get_async_redis_client():
+    """
+    현재 프로세스 + 이벤트 루프의 asyncio Redis 클라이언트를 반환합니다. (async 뷰용)
+
+    asyncio 연결은 만든 이벤트 루프에 묶이므로 루프마다 따로 만들고, 루프 객체를 약한 참조 키로 두어
+    async_to_sync처럼 요청마다 루프가 바뀌어도 끝난 루프의 클라이언트가 쌓이거나 재사용되지 않습니다.
+    """
+    import asyncio
+
+    loop = asyncio.get_running_loop()
+    with _client_lock:
+        pid, client = _async_clients.get(loop, (None, None))
+        if client is None or pid != os.getpid():
+            pool = redis.asyncio.BlockingConnectionPool(**_connection_kwargs())
+            client = redis.asyncio.Redis(connection_pool=pool)
+            _async_clients[loop] = (os.getpid(), client)
+    return client
+
+
+def get_redis_pool_stats():
+    """
+    현재 프로세스의 Redis 연결 풀 사용 현황
+    """
+    stats = get_redis_client().connection_pool.stats()
+    stats["pid"] = os.getpid()
+    return stats
+
+
+class LazyRedisClient:
+    """
+    get_redis_client()로 위임하는 모듈 수준 클라이언트 (import 시점에는 연결을 만들지 않음)
+    """
+
+    def __getattr__(self, name):
+        return getattr(get_redis_client(), name)
+
+
+redis_client = LazyRedisClient()
@@ -0,0 +1,123 @@
+import base64
+import hashlib
+import json
+import os
+import tempfile
+
+import environ
+
+from .render_pool import RenderError, RenderTimeout, render_in_pool
+from .singleflight import SingleFlightError, SingleFlightTimeout, single_flight
+
+# 환경 변수 설정
+env = environ.Env()
+
+# 렌더링 결과를 저장할 로컬 디렉터리
+INSIGHT_RENDER_CACHE_DIR = env.str(
+    'INSIGHT_RENDER_CACHE_DIR', default=os.path.join(tempfile.gettempdir(), 'insight-render-cache')
+)
+# 캐시 최대 항목 수 / 최대 크기 (바이트)
+INSIGHT_RENDER_CACHE_MAX_ENTRIES = env.int('INSIGHT_RENDER_CACHE_MAX_ENTRIES', default=256)
+INSIGHT_RENDER_CACHE_MAX_BYTES = env.int('INSIGHT_RENDER_CACHE_MAX_BYTES', default=128 * 1024 * 1024)
+
+
+def render_key(chart, payload, **options):
+    """
+    차트 이름 + 집계 데이터 + 렌더링 옵션의 해시 (데이터가 같으면 같은 이미지)
+    """
+    raw = json.dumps(
+        {"chart": chart, "data": payload, "options": options},
+        sort_keys=True, ensure_ascii=False, default=str,
+    )
+    return hashlib.sha256(raw.encode("utf-8")).hexdigest()
+
+
+class RenderCache:
+    """
+    로컬 디스크 LRU 캐시
+
+    파일 하나에 이미지 하나를 저장하고, 조회할 때마다 mtime을 갱신해서
+    가장 오래 사용하지 않은 파일부터 지웁니다. (같은 노드의 워커끼리 공유)
+    """
+
+    def __init__(self, directory, max_entries, max_bytes):
+        self.directory = directory
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+
+    def _path(self, key):
+        return os.path.join(self.directory, f"{key}.bin")
+
+    def get(self, key):
+        path = self._path(key)
+        try:
+            with open(path, "rb") as f:
+                data = f.read()
+            os.utime(path)  # 최근 사용 시각 갱신
+            return data
+        except FileNotFoundError:
+            return None
+
+    def set(self, key, data):
+        os.makedirs(self.directory, exist_ok=True)
+        # 다른 워커가 읽는 중에도 깨진 파일이 보이지 않도록 임시 파일에 쓴 뒤 교체
+        fd, tmp_path = tempfile.mkstemp(dir=self.directory, suffix=".tmp")
+        with os.fdopen(fd, "wb") as f:
+            f.write(data)
+        os.replace(tmp_path, self._path(key))
+        self.evict()
+
+    def evict(self):
+        entries = []
+        for entry in os.scandir(self.directory):
+            if entry.name.endswith(".bin"):
+                try:
+                    stat = entry.stat()
+                except FileNotFoundError:
+                    continue
+                entries.append((stat.st_mtime, stat.st_size, entry.path))
+
+        entries.sort()
+        total_bytes = sum(size for _, size, _ in entries)
+        while entries and (len(entries) > self.max_entries or total_bytes > self.max_bytes):
+            _, size, path = entries.pop(0)
+            try:
+                os.remove(path)
+            except FileNotFoundError:
+                pass
+            total_bytes -= size
+
+
+render_cache = RenderCache(
+    INSIGHT_RENDER_CACHE_DIR, INSIGHT_RENDER_CACHE_MAX_ENTRIES, INSIGHT_RENDER_CACHE_MAX_BYTES
+)
+
+
+def render_chart(chart, payload, **options):
+    """
+    캐시된 차트 이미지를 반환하고, 없으면 렌더링 프로세스 풀에서 그려서 저장합니다.
+
+    :param chart: 차트 이름 (charts.CHARTS)
+    :param payload: 집계 데이터
+    :param options: charts.render 옵션 (format, dpi, width, height)
+    :return: 이미지 bytes
+    :raises render_pool.RenderError: 렌더링 실패 (대기열 초과, 시간 초과 등)
+    """
+    key = render_key(chart, payload, **options)
+    image = render_cache.get(key)
+    if image is None:
+        # 같은 차트를 동시에 요청하면 한 번만 렌더링 (다른 프로세스와는 Redis로 결과 공유)
+        try:
+            image = single_flight(
+                f"render:{key}",
+                lambda: render_in_pool(chart, payload, options),
+                dumps=lambda data: base64.b64encode(data).decode("ascii"),
+                loads=base64.b64decode,
+            )
+        except SingleFlightTimeout as e:
+            raise RenderTimeout(str(e))
+        except SingleFlightError as e:
+            # 다른 프로세스의 렌더링 실패 (503)
+            raise RenderError(str(e))
+        render_cache.set(key, image)
+    return image
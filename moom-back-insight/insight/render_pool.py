@@ -0,0 +1,189 @@
+import multiprocessing
+import os
+import signal
+import threading
+from concurrent.futures import ProcessPoolExecutor, TimeoutError
+from concurrent.futures.process import BrokenProcessPool
+
+import environ
+
+# 환경 변수 설정
+env = environ.Env()
+
+# 렌더링 프로세스 수 (0이면 요청 스레드에서 바로 렌더링)
+INSIGHT_RENDER_WORKERS = env.int('INSIGHT_RENDER_WORKERS', default=min(4, os.cpu_count() or 1))
+# 대기 + 실행 중인 렌더링 작업 최대 개수 (초과하면 바로 거절)
+INSIGHT_RENDER_QUEUE_SIZE = env.int('INSIGHT_RENDER_QUEUE_SIZE', default=INSIGHT_RENDER_WORKERS * 4)
+# 렌더링 결과를 기다리는 최대 시간 (초)
+INSIGHT_RENDER_TIMEOUT = env.float('INSIGHT_RENDER_TIMEOUT', default=10.0)
+
+
+class RenderError(Exception):
+    """
+    차트 렌더링 실패
+    """
+
+
+class RenderQueueFull(RenderError):
+    """
+    렌더링 대기열이 가득 참 (503)
+    """
+
+
+class RenderTimeout(RenderError):
+    """
+    렌더링 시간 초과 (504)
+    """
+
+
+def _init_worker():
+    """
+    렌더링 프로세스 초기화: Agg 백엔드, pyplot/seaborn, 한글 폰트, 차트 모듈을 미리 로드합니다.
+    """
+    from . import charts  # noqa: F401
+    from .plotting import warm_up
+    warm_up()
+
+
+def _raise_render_timeout(signum, frame):
+    raise RenderTimeout("Chart render timed out in worker")
+
+
+def _render_job(chart, payload, options, timeout=None):
+    """
+    렌더링 작업 (풀에서는 timeout이 지나면 SIGALRM으로 작업만 중단하고 프로세스는 계속 재사용)
+    """
+    from .charts import render
+    if not timeout or not hasattr(signal, "setitimer"):
+        return render(chart, payload, **options)
+
+    # 풀 프로세스는 작업을 메인 스레드에서 실행하므로 시그널 핸들러를 쓸 수 있음
+    previous = signal.signal(signal.SIGALRM, _raise_render_timeout)
+    signal.setitimer(signal.ITIMER_REAL, timeout)
+    try:
+        return render(chart, payload, **options)
+    except RenderTimeout:
+        # 그리다 만 Figure가 남지 않도록 정리 (프로세스당 작업은 하나씩만 실행됨)
+        from .plotting import setup_plotting
+        plt, _ = setup_plotting()
+        plt.close("all")
+        raise
+    finally:
+        signal.setitimer(signal.ITIMER_REAL, 0)
+        signal.signal(signal.SIGALRM, previous)
+
+
+_pool = None
+_pool_pid = None
+_pool_lock = threading.Lock()
+_slots = threading.BoundedSemaphore(max(1, INSIGHT_RENDER_QUEUE_SIZE))
+
+
+def get_render_pool():
+    """
+    프로세스(PID)별 렌더링 풀을 반환합니다. (gunicorn 등에서 fork된 워커마다 따로 생성)
+    """
+    global _pool, _pool_pid
+    if _pool is None or _pool_pid != os.getpid():
+        with _pool_lock:
+            if _pool is None or _pool_pid != os.getpid():
+                # 웹 워커의 스레드/소켓 상태를 물려받지 않도록 spawn으로 생성
+                _pool = ProcessPoolExecutor(
+                    max_workers=INSIGHT_RENDER_WORKERS,
+                    mp_context=multiprocessing.get_context("spawn"),
+                    initializer=_init_worker,
+                )
+                _pool_pid = os.getpid()
+    return _pool
+
+
+def _reset_pool(pool, cancel_futures=True):
+    """
+    풀을 버리고 다음 요청에서 새로 만듭니다.
+
+    :param cancel_futures: 풀의 대기 중인 작업까지 취소 (False면 이미 보낸 작업은 기존 풀에서 마저 실행)
+    """
+    global _pool
+    with _pool_lock:
+        if _pool is pool:
+            _pool = None
+    pool.shutdown(wait=False, cancel_futures=cancel_futures)
+
+
+def _release_once():
+    """
+    한 번만 슬롯을 반납하는 함수 (타임아웃 처리와 작업 완료 콜백 중 먼저 호출된 쪽만 반납)
+    """
+    lock = threading.Lock()
+    released = False
+
+    def release(*_):
+        nonlocal released
+        with lock:
+            if released:
+                return
+            released = True
+        _slots.release()
+
+    return release
+
+
+def warm_up_render_pool():
+    """
+    렌더링 풀 프로세스를 미리 띄우고 초기화가 끝날 때까지 기다립니다. (첫 차트 요청 지연 제거)
+
+    풀을 쓰지 않는 설정이면 현재 프로세스에서 plotting을 초기화합니다.
+    """
+    if INSIGHT_RENDER_WORKERS <= 0:
+        from .plotting import warm_up
+        warm_up()
+        return
+
+    pool = get_render_pool()
+    # 워커 수만큼 작업을 보내서 가능한 한 모든 워커가 spawn + initializer를 마치도록 함
+    futures = [pool.submit(os.getpid) for _ in range(INSIGHT_RENDER_WORKERS)]
+    for future in futures:
+        future.result()
+
+
+def render_in_pool(chart, payload, options=None, timeout=INSIGHT_RENDER_TIMEOUT):
+    """
+    차트 렌더링 작업을 프로세스 풀에 보내고 결과를 기다립니다.
+
+    :param chart: 차트 이름 (charts.CHARTS)
+    :param payload: 집계 데이터
+    :param options: charts.render 옵션 (format, dpi, width, height)
+    :return: 이미지 bytes
+    :raises RenderQueueFull: 대기열이 가득 찬 경우
+    :raises RenderTimeout: timeout 안에 끝나지 않은 경우
+    """
+    if INSIGHT_RENDER_WORKERS <= 0:
+        return _render_job(chart, payload, options or {})
+
+    if not _slots.acquire(blocking=False):
+        raise RenderQueueFull("Chart render queue is full")
+    release = _release_once()
+
+    pool = get_render_pool()
+    try:
+        future = pool.submit(_render_job, chart, payload, options or {}, timeout)
+    except BrokenProcessPool as e:
+        release()
+        _reset_pool(pool)
+        raise RenderError(f"Render pool is broken: {e}")
+
+    # 작업이 끝나면 슬롯 반납
+    future.add_done_callback(release)
+
+    try:
+        return future.result(timeout=timeout)
+    except TimeoutError:
+        release()
+        if not future.cancel():
+            # 이미 실행 중인 작업은 워커의 SIGALRM으로 중단됨
+            # 그래도 멈춰 있는 워커 뒤에 새 요청이 쌓이지 않도록 새 풀로 교체 (기존 풀의 다른 렌더링은 그대로 완료)
+            _reset_pool(pool, cancel_futures=False)
+        raise RenderTimeout(f"Chart render timed out after {timeout}s")
+    except BrokenProcessPool as e:
+        _reset_pool(pool)
+        raise RenderError(f"Render pool is broken: {e}")
@@ -0,0 +1,58 @@
+import heapq
+import itertools
+
+# 원시 커서 한 번에 가져올 문서 수
+SCAN_BATCH_SIZE = 1000
+
+
+def iter_raw(document, fields, batch_size=SCAN_BATCH_SIZE, order_by=None, **filters):
+    """
+    mongoengine 문서 객체를 만들지 않고 필요한 필드만 dict로 스트리밍합니다.
+
+    :param document: Document 클래스 또는 QuerySet
+    :param fields: 가져올 필드 목록 (projection)
+    :param batch_size: 커서 배치 크기
+    :param order_by: 정렬 필드 목록 (예: ["_id"])
+    :param filters: QuerySet 필터
+    :return: dict 커서
+    """
+    queryset = document.objects(**filters) if isinstance(document, type) else document.filter(**filters)
+    if order_by:
+        queryset = queryset.order_by(*order_by)
+    return queryset.only(*fields).as_pymongo().batch_size(batch_size)
+
+
+class TopK:
+    """
+    키별로 크기 k의 최소 힙을 유지하는 스트리밍 top-k
+
+    메모리는 O(k × 키 수)이며, 점수가 같으면 먼저 들어온 항목이 남습니다.
+    (sorted(..., reverse=True)[:k]와 같은 순서)
+    """
+
+    def __init__(self, k):
+        self.k = k
+        self.heaps = {}
+        self._seq = itertools.count()
+
+    def push(self, key, score, item):
+        heap = self.heaps.setdefault(key, [])
+        entry = (score, -next(self._seq), item)
+        if len(heap) < self.k:
+            heapq.heappush(heap, entry)
+        elif entry[:2] > heap[0][:2]:
+            heapq.heapreplace(heap, entry)
+
+    def items(self, key):
+        """
+        :return: [(item, score), ...] (점수 내림차순)
+        """
+        heap = sorted(self.heaps.get(key, []), key=lambda entry: entry[:2], reverse=True)
+        return [(item, score) for score, _, item in heap]
+
+    def result(self):
+        """
+        :return: {키: [(item, score), ...]} (키 이름순)
+        """
+        return {key: self.items(key) for key in sorted(self.heaps)}
+
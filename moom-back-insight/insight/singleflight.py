@@ -0,0 +1,159 @@
+import json
+import threading
+import time
+import uuid
+
+import environ
+import redis
+
+from .redis import redis_client
+
+# 환경 변수 설정
+env = environ.Env()
+
+# 계산 중 락 유지 시간 (초, 계산하던 프로세스가 죽으면 이 시간 뒤 다른 프로세스가 계산)
+INSIGHT_SINGLEFLIGHT_LOCK_TTL = env.float('INSIGHT_SINGLEFLIGHT_LOCK_TTL', default=30.0)
+# 계산 결과(또는 오류)를 다른 프로세스와 공유하는 시간 (초)
+INSIGHT_SINGLEFLIGHT_RESULT_TTL = env.float('INSIGHT_SINGLEFLIGHT_RESULT_TTL', default=5.0)
+# 다른 프로세스의 계산 결과를 기다리는 간격 (초)
+INSIGHT_SINGLEFLIGHT_POLL = env.float('INSIGHT_SINGLEFLIGHT_POLL', default=0.05)
+
+# 토큰이 같을 때만 락 해제 (다른 프로세스가 다시 잡은 락을 지우지 않도록)
+RELEASE_LOCK_SCRIPT = """
+if redis.call("GET", KEYS[1]) == ARGV[1] then
+    return redis.call("DEL", KEYS[1])
+end
+return 0
+"""
+
+
+class SingleFlightError(Exception):
+    """
+    다른 프로세스의 계산이 실패함 (기다리던 요청은 다시 계산하지 않음)
+    """
+
+
+class SingleFlightTimeout(SingleFlightError):
+    """
+    INSIGHT_SINGLEFLIGHT_LOCK_TTL 안에 계산 결과를 받지 못함
+    """
+
+
+class _Call:
+    """
+    프로세스 안에서 진행 중인 계산 하나
+    """
+
+    def __init__(self):
+        self.event = threading.Event()
+        self.result = None
+        self.error = None
+
+
+_calls = {}
+_calls_lock = threading.Lock()
+
+
+def single_flight(key, compute, dumps=json.dumps, loads=json.loads):
+    """
+    같은 key의 동시 요청을 하나의 계산으로 합칩니다.
+
+    프로세스 안에서는 먼저 온 스레드만 계산하고 나머지는 결과를 기다리며,
+    프로세스 사이에서는 Redis 락(SET NX PX)을 잡은 쪽만 계산하고 결과나 오류를 짧은 TTL로 공유합니다.
+    기다리는 쪽은 직접 계산하지 않고 최대 INSIGHT_SINGLEFLIGHT_LOCK_TTL 동안 결과를 기다립니다.
+    (계산하던 쪽이 결과 없이 락을 놓으면 그중 하나만 락을 잡아 다시 계산)
+    Redis를 쓸 수 없으면 프로세스 안에서만 합칩니다.
+
+    :param key: 계산 식별자 (예: "dataset:mbti_all")
+    :param compute: 인자 없는 계산 함수
+    :param dumps: 결과 → Redis 문자열
+    :param loads: Redis 문자열 → 결과
+    :return: 계산 결과
+    :raises SingleFlightError: 다른 프로세스의 계산이 실패한 경우
+    :raises SingleFlightTimeout: 시간 안에 결과를 받지 못한 경우
+    """
+    with _calls_lock:
+        call = _calls.get(key)
+        leader = call is None
+        if leader:
+            call = _Call()
+            _calls[key] = call
+
+    if not leader:
+        if not call.event.wait(INSIGHT_SINGLEFLIGHT_LOCK_TTL):
+            raise SingleFlightTimeout(f"Timed out waiting for {key}")
+        if call.error is not None:
+            raise call.error
+        return call.result
+
+    try:
+        call.result = _compute_shared(key, compute, dumps, loads)
+        return call.result
+    except Exception as e:
+        call.error = e
+        raise
+    finally:
+        with _calls_lock:
+            _calls.pop(key, None)
+        call.event.set()
+
+
+def _compute_shared(key, compute, dumps, loads):
+    result_key = f"insight:singleflight:{key}:result"
+    error_key = f"insight:singleflight:{key}:error"
+    lock_key = f"insight:singleflight:{key}:lock"
+    token = uuid.uuid4().hex
+    deadline = time.monotonic() + INSIGHT_SINGLEFLIGHT_LOCK_TTL
+
+    while True:
+        try:
+            cached, error = redis_client.mget(result_key, error_key)
+            if cached is not None:
+                return loads(cached)
+            if error is not None:
+                raise SingleFlightError(error)
+            acquired = redis_client.set(lock_key, token, nx=True, px=int(INSIGHT_SINGLEFLIGHT_LOCK_TTL * 1000))
+        except redis.RedisError as e:
+            print(f"single-flight Redis 오류 (로컬 계산): {key} - {str(e)}")
+            return compute()
+
+        if acquired:
+            return _compute_locked(key, compute, dumps, result_key, error_key, lock_key, token)
+
+        # 다른 프로세스가 계산 중: 결과/오류가 올라오거나 락이 풀릴 때까지 대기
+        try:
+            while redis_client.exists(lock_key):
+                if time.monotonic() >= deadline:
+                    raise SingleFlightTimeout(f"Timed out waiting for {key}")
+                time.sleep(INSIGHT_SINGLEFLIGHT_POLL)
+        except redis.RedisError as e:
+            print(f"single-flight Redis 오류 (로컬 계산): {key} - {str(e)}")
+            return compute()
+        if time.monotonic() >= deadline:
+            raise SingleFlightTimeout(f"Timed out waiting for {key}")
+
+
+def _compute_locked(key, compute, dumps, result_key, error_key, lock_key, token):
+    """
+    락을 잡은 프로세스의 계산 (결과 또는 오류를 기다리는 프로세스와 공유)
+    """
+    ttl = int(INSIGHT_SINGLEFLIGHT_RESULT_TTL * 1000)
+    try:
+        try:
+            result = compute()
+        except Exception as e:
+            try:
+                redis_client.set(error_key, str(e) or type(e).__name__, px=ttl)
+            except redis.RedisError:
+                pass
+            raise
+        try:
+            redis_client.set(result_key, dumps(result), px=ttl)
+        except redis.RedisError as e:
+            print(f"single-flight 결과 저장 실패: {key} - {str(e)}")
+        return result
+    finally:
+        try:
+            redis_client.register_script(RELEASE_LOCK_SCRIPT)(keys=[lock_key], args=[token])
+        except redis.RedisError:
+            pass  # 락은 TTL로 만료됨
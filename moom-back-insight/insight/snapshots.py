@@ -0,0 +1,142 @@
+import hashlib
+import json
+from datetime import datetime, timezone
+
+import environ
+
+from .datasets import DATASETS
+from .models import InsightSnapshot
+from .singleflight import SingleFlightError, single_flight
+
+# 환경 변수 설정
+env = environ.Env()
+
+# 스냅샷 재계산 주기 (초)
+INSIGHT_SNAPSHOT_INTERVAL = env.int('INSIGHT_SNAPSHOT_INTERVAL', default=60)
+# 이보다 오래된 스냅샷은 사용하지 않고 바로 계산 (스냅샷 작업이 멈춘 경우 대비)
+INSIGHT_SNAPSHOT_MAX_AGE = env.int('INSIGHT_SNAPSHOT_MAX_AGE', default=600)
+# 데이터셋별로 남겨둘 스냅샷 버전 수
+INSIGHT_SNAPSHOT_KEEP = env.int('INSIGHT_SNAPSHOT_KEEP', default=3)
+
+
+class Dataset:
+    """
+    뷰에 전달되는 데이터셋 (스냅샷 또는 즉시 계산 결과)
+    """
+
+    def __init__(self, name, payload, etag, version=None, created_at=None):
+        self.name = name
+        self.payload = payload
+        self.etag = etag
+        self.version = version  # 즉시 계산한 경우 None
+        self.created_at = created_at or datetime.now(timezone.utc)
+
+    @property
+    def age(self):
+        """
+        스냅샷 생성 후 지난 시간 (초)
+        """
+        return max(0.0, (datetime.now(timezone.utc) - self.created_at).total_seconds())
+
+
+def _json_keys(value):
+    """
+    dict 키를 JSON에 쓰이는 문자열로 바꿉니다. (None 키 → "null", sort_keys가 str/None을 비교하지 않도록)
+
+    MBTI를 아직 입력하지 않은 캘린더는 MBTI별 데이터셋에 None 키로 들어갑니다.
+    """
+    if isinstance(value, dict):
+        return {
+            key if isinstance(key, str) else json.dumps(key): _json_keys(item)
+            for key, item in value.items()
+        }
+    if isinstance(value, (list, tuple)):
+        return [_json_keys(item) for item in value]
+    return value
+
+
+def dump_payload(payload):
+    """
+    payload를 JSON 문자열과 ETag로 변환합니다. (같은 데이터면 같은 ETag)
+    """
+    payload_json = json.dumps(_json_keys(payload), ensure_ascii=False, sort_keys=True, default=str)
+    etag = hashlib.sha256(payload_json.encode("utf-8")).hexdigest()[:32]
+    return payload_json, etag
+
+
+def build_snapshot(name):
+    """
+    데이터셋을 계산해서 새 버전의 스냅샷으로 저장합니다.
+
+    :param name: 데이터셋 이름
+    :return: 저장된 InsightSnapshot
+    """
+    payload_json, etag = dump_payload(DATASETS[name]())
+
+    latest = InsightSnapshot.objects(name=name).order_by("-version").only("version").first()
+    snapshot = InsightSnapshot(
+        name=name,
+        version=(latest.version + 1) if latest else 1,
+        created_at=datetime.now(timezone.utc),
+        etag=etag,
+        payload=payload_json,
+    )
+    snapshot.save()
+
+    # 오래된 버전 정리
+    InsightSnapshot.objects(name=name, version__lte=snapshot.version - INSIGHT_SNAPSHOT_KEEP).delete()
+    return snapshot
+
+
+def build_all_snapshots():
+    """
+    모든 insight 데이터셋의 스냅샷을 만듭니다.
+
+    :return: {데이터셋 이름: 버전}
+    """
+    versions = {}
+    for name in DATASETS:
+        try:
+            versions[name] = build_snapshot(name).version
+        except Exception as e:
+            print(f"스냅샷 생성 중 오류 발생: {name} - {str(e)}")
+    return versions
+
+
+def get_dataset(name):
+    """
+    최신 스냅샷을 반환합니다. 스냅샷이 없거나 너무 오래됐으면 즉시 계산합니다.
+
+    다른 요청의 계산을 기다리다 실패하거나 시간이 지나면 오래된 스냅샷이라도 반환합니다.
+
+    :param name: 데이터셋 이름
+    :return: Dataset
+    """
+    dataset = None
+    snapshot = InsightSnapshot.objects(name=name).order_by("-version").first()
+    if snapshot:
+        created_at = snapshot.created_at.replace(tzinfo=timezone.utc)
+        dataset = Dataset(name, json.loads(snapshot.payload), snapshot.etag, snapshot.version, created_at)
+        if dataset.age <= INSIGHT_SNAPSHOT_MAX_AGE:
+            return dataset
+
+    try:
+        return compute_dataset(name)
+    except SingleFlightError as e:
+        if dataset is None:
+            raise
+        print(f"데이터셋 계산 대기 실패, 오래된 스냅샷 사용: {name} - {str(e)}")
+        return dataset
+
+
+def compute_dataset(name):
+    """
+    스냅샷을 거치지 않고 데이터셋을 즉시 계산합니다.
+
+    동시에 들어온 같은 데이터셋 요청은 (프로세스 간 포함) 한 번만 계산하고 결과를 공유합니다.
+
+    :param name: 데이터셋 이름
+    :return: Dataset (version 없음)
+    """
+    payload_json, etag = single_flight(f"dataset:{name}", lambda: list(dump_payload(DATASETS[name]())))
+    return Dataset(name, json.loads(payload_json), etag)
@@ -1,3 +1,450 @@
-from matplotlib import font_manager
+import json
+import os
+import threading
+import time
+from collections import Counter, defaultdict
+from datetime import datetime, timedelta
+from unittest import SkipTest, mock
 
-print(font_manager.findSystemFonts())
\ No newline at end of file
+from django.conf import settings
+from django.test import SimpleTestCase
+from mongoengine import connect, disconnect
+from mongoengine.connection import get_db
+
+from .cube import EmotionCube, refresh_daily_cube
+from .datasets import collect_emotions_for_date, compute_mbti_top5_contents
+from .models import Calendar, ContentEmotionStats, Emoticons, Entry
+from .pipelines import (
+    aggregate_emotion_counts_for_date,
+    aggregate_mbti_emotion_counts,
+    aggregate_mbti_member_counts,
+    aggregate_top_contents_by_emotion,
+)
+from . import activity, singleflight
+from .scan import TopK
+from .snapshots import dump_payload
+
+# 파리티 테스트용 MongoDB (실제 DB와 분리)
+MONGO_TEST_URI = os.getenv('MONGO_TEST_URI', 'mongodb://localhost:27017/momo_insight_test')
+
+
+# 기존 Python 집계 구현 (aggregation 파이프라인 결과와 비교용)
+def python_mbti_emotion_counts():
+    mbti_emotion_counts = {}
+    for stat in ContentEmotionStats.objects.all():
+        for mbti, emotions in stat.mbti_emotions.items():
+            if mbti not in mbti_emotion_counts:
+                mbti_emotion_counts[mbti] = {}
+            for emotion, count in emotions.items():
+                if emotion in mbti_emotion_counts[mbti]:
+                    mbti_emotion_counts[mbti][emotion] += count
+                else:
+                    mbti_emotion_counts[mbti][emotion] = count
+    return mbti_emotion_counts
+
+
+def python_mbti_member_counts():
+    return Counter(calendar.mbti for calendar in Calendar.objects.all() if calendar.mbti)
+
+
+def python_top_5_movies_by_emotion(emotion_filter=None):
+    emotion_movie_scores = defaultdict(list)
+    for stat in ContentEmotionStats.objects.all():
+        for mbti, emotions in stat.mbti_emotions.items():
+            for emotion, count in emotions.items():
+                if emotion_filter is None or emotion in emotion_filter:
+                    emotion_movie_scores[emotion].append((stat.title, count, stat.poster_url))
+
+    return {
+        emotion: sorted(movies, key=lambda x: x[1], reverse=True)[:5]
+        for emotion, movies in emotion_movie_scores.items()
+    }
+
+
+def python_today_emotions(target_date):
+    emotion_counts = Counter()
+    for calendar in Calendar.objects.all():
+        entry = calendar.entries.get(target_date)
+        if entry and entry.emoticons:
+            for emotion in entry.emoticons.emotion:
+                emotion_counts[emotion] += 1
+    return emotion_counts
+
+
+class InsightPipelineParityTest(SimpleTestCase):
+    """
+    insight 집계 파이프라인이 기존 Python 구현과 같은 결과를 내는지 확인합니다.
+    """
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        disconnect()
+        connect(host=MONGO_TEST_URI, serverSelectionTimeoutMS=2000)
+        try:
+            get_db().command("ping")
+        except Exception as e:
+            disconnect()
+            connect(host=settings.MONGO_URI)
+            raise SkipTest(f"테스트용 MongoDB에 연결할 수 없습니다 ({MONGO_TEST_URI}): {e}")
+
+        db = get_db()
+        db.drop_collection(ContentEmotionStats._get_collection_name())
+        db.drop_collection(Calendar._get_collection_name())
+
+        mbti_types = ["ENFP", "INTJ", "ISTJ", "ESFP"]
+        emotions = ["기쁨", "슬픔", "분노", "불안", "설렘"]
+
+        # 동점이 없도록 카운트를 서로 다르게 구성
+        count = 1
+        for content_index in range(12):
+            mbti_emotions = {}
+            for mbti_index, mbti in enumerate(mbti_types):
+                if (content_index + mbti_index) % 3 == 0:
+                    continue
+                mbti_emotions[mbti] = {}
+                for emotion_index, emotion in enumerate(emotions):
+                    if (content_index + emotion_index) % 2 == 0:
+                        mbti_emotions[mbti][emotion] = count
+                        count += 7
+            ContentEmotionStats(
+                content_id=content_index,
+                title=f"콘텐츠 {content_index}",
+                poster_url=f"https://example.com/{content_index}.jpg",
+                mbti_emotions=mbti_emotions,
+            ).save()
+
+        for user_index in range(30):
+            entries = {}
+            for day in ("2025-02-10", "2025-02-11"):
+                if (user_index + len(day)) % 4 == 0:
+                    continue
+                picked = [emotions[(user_index + offset) % len(emotions)] for offset in range(user_index % 3)]
+                entries[day] = Entry(date=day, emoticons=Emoticons(emotion=picked))
+            Calendar(
+                user_id=f"user-{user_index}",
+                mbti=mbti_types[user_index % len(mbti_types)] if user_index % 5 else None,
+                entries=entries,
+            ).save()
+
+    @classmethod
+    def tearDownClass(cls):
+        get_db().client.drop_database(get_db().name)
+        disconnect()
+        connect(host=settings.MONGO_URI)
+        super().tearDownClass()
+
+    def test_mbti_emotion_counts(self):
+        actual = aggregate_mbti_emotion_counts()
+        expected = python_mbti_emotion_counts()
+        # 차트 순서가 바뀌지 않도록 키 순서까지 비교
+        self.assertEqual(
+            [(mbti, list(emotions.items())) for mbti, emotions in actual.items()],
+            [(mbti, list(emotions.items())) for mbti, emotions in expected.items()],
+        )
+
+    def test_mbti_member_counts(self):
+        self.assertEqual(list(aggregate_mbti_member_counts().items()), list(python_mbti_member_counts().items()))
+
+    def test_top_contents_by_emotion(self):
+        expected = python_top_5_movies_by_emotion()
+        actual = {
+            emotion: [(movie["title"], movie["count"], movie["poster_url"]) for movie in movies]
+            for emotion, movies in aggregate_top_contents_by_emotion(limit=5).items()
+        }
+        self.assertEqual(list(actual.items()), list(expected.items()))
+
+    def test_today_emotions(self):
+        for target_date in ("2025-02-10", "2025-02-11", "2025-02-12"):
+            expected = python_today_emotions(target_date)
+            self.assertEqual(list(aggregate_emotion_counts_for_date(target_date).items()), list(expected.items()))
+
+            expected_top = python_top_5_movies_by_emotion(expected)
+            actual_top = {
+                emotion: [(movie["title"], movie["count"], movie["poster_url"]) for movie in movies]
+                for emotion, movies in aggregate_top_contents_by_emotion(limit=5, emotions=expected.keys()).items()
+            }
+            self.assertEqual(actual_top, expected_top)
+
+
+class TopKTest(SimpleTestCase):
+    """
+    스트리밍 top-k가 sorted(..., reverse=True)[:k]와 같은 순서를 내는지 확인합니다. (MongoDB 불필요)
+    """
+
+    def test_top_k_keeps_first_on_ties(self):
+        top = TopK(2)
+        for item, score in [("a", 1), ("b", 3), ("c", 3), ("d", 3), ("e", 2)]:
+            top.push("key", score, item)
+        self.assertEqual(top.items("key"), [("b", 3), ("c", 3)])
+
+
+class MbtiTop5ContentsSnapshotTest(SimpleTestCase):
+    """
+    MBTI를 입력하지 않은 캘린더가 있어도 스냅샷(JSON + ETag)을 만들 수 있는지 확인합니다. (MongoDB 불필요)
+    """
+
+    def test_calendar_without_mbti(self):
+        calendars = [
+            {"mbti": "ENFP", "recommend_contents": ["A", "B", "A"]},
+            {"recommend_contents": ["B", None]},  # PersonalInfo 입력 전에 작성한 캘린더 (mbti 없음)
+        ]
+        contents = {"A": ("A", "https://example.com/a.jpg"), "B": ("B", None)}
+        with mock.patch("insight.datasets.iter_recommend_contents_by_mbti", return_value=calendars), \
+                mock.patch("insight.datasets.lookup_contents_by_titles", return_value=contents):
+            payload = compute_mbti_top5_contents()
+
+        payload_json, etag = dump_payload(payload)
+        # JsonResponse와 같이 None 키는 "null"로 직렬화
+        self.assertEqual(json.loads(payload_json), {
+            "ENFP": [{"title": "A", "poster_url": "https://example.com/a.jpg"}, {"title": "B", "poster_url": None}],
+            "null": [{"title": "B", "poster_url": None}],
+        })
+        self.assertEqual(dump_payload(payload)[1], etag)
+
+
+class DailyEmotionRollupTest(SimpleTestCase):
+    """
+    롤업 문서의 이스케이프된 감정 이름을 복원하고 처음 선택된 순서를 유지하는지 확인합니다. (MongoDB 불필요)
+    """
+
+    def test_collect_emotions_for_date(self):
+        rollup = {"emotions": {"슬픔": 2, "a%2Eb": 1, "기쁨": 3, "%24x": 1, "분노": 0, "a": {"b": 1}}}
+        with mock.patch("insight.datasets.DailyEmotionRollup") as model:
+            model.objects.return_value.only.return_value.as_pymongo.return_value.first.return_value = rollup
+            counts = collect_emotions_for_date("2025-02-10")
+        # 이스케이프 전에 생긴 하위 문서("a": {...})와 0 이하 카운트는 제외
+        self.assertEqual(list(counts.items()), [("슬픔", 2), ("a.b", 1), ("기쁨", 3), ("$x", 1)])
+
+
+class EmotionCubeTest(SimpleTestCase):
+    """
+    희소(COO) 큐브의 주변합 / top-k / 필터 결과를 단순 합산과 비교합니다. (MongoDB 불필요)
+    """
+
+    rows = [
+        ({"mbti": "ENFP", "emotion": "기쁨", "content": "A"}, 5),
+        ({"mbti": "ENFP", "emotion": "슬픔", "content": "B"}, 2),
+        ({"mbti": "INTJ", "emotion": "기쁨", "content": "B"}, 4),
+        ({"mbti": "INTJ", "emotion": "기쁨", "content": "A"}, 1),
+        ({"mbti": "ENFP", "emotion": "기쁨", "content": "A"}, 3),
+        ({"mbti": "ISTJ", "emotion": "분노", "content": "C"}, 4),
+    ]
+
+    def expected_marginal(self, axis, **filters):
+        counts = Counter()
+        for labels, count in self.rows:
+            if all(labels[name] in values for name, values in filters.items()):
+                counts[labels[axis]] += count
+        return dict(counts)
+
+    def test_marginal_and_filters(self):
+        cube = EmotionCube()
+        cube.add_many(self.rows)
+        self.assertEqual(cube.size, 5)
+        self.assertEqual(cube.coords.dtype, "int32")
+        for axis in cube.axes:
+            self.assertEqual(cube.marginal(axis), self.expected_marginal(axis))
+        self.assertEqual(cube.marginal("content", emotion=["기쁨"], mbti=["INTJ", "ISTJ"]),
+                         self.expected_marginal("content", emotion=["기쁨"], mbti=["INTJ", "ISTJ"]))
+        self.assertEqual(cube.marginal("mbti", mbti=["INTJ", "없음"]), {"INTJ": 5})
+
+    def test_top_k_keeps_first_registered_on_ties(self):
+        cube = EmotionCube()
+        cube.add_many(self.rows)
+        self.assertEqual(cube.top_k("content", k=2), [("A", 9), ("B", 6)])
+        self.assertEqual(cube.top_k("content", k=5, emotion="기쁨"), [("A", 9), ("B", 4)])
+        self.assertEqual(cube.top_k("content", k=1, mbti="INTJ"), [("B", 4)])
+
+    def test_top_k_ties_at_kth_value(self):
+        # k번째 값(2)과 동점인 라벨이 여러 개면 먼저 등록된 라벨만 남음
+        cube = EmotionCube()
+        cube.add_many(({"mbti": "ENFP", "emotion": "기쁨", "content": f"c{index}"}, 2) for index in range(40))
+        cube.add_many([({"mbti": "ENFP", "emotion": "기쁨", "content": "c30"}, 1)])
+        self.assertEqual(cube.top_k("content", k=3), [("c30", 3), ("c0", 2), ("c1", 2)])
+
+    def test_slice_matches_marginal(self):
+        cube = EmotionCube()
+        cube.add_many(self.rows)
+        data, labels = cube.slice(emotion=["기쁨", "분노"])
+        self.assertEqual(data.shape, (len(labels["mbti"]), 2, 3))
+        self.assertEqual(dict(zip(labels["content"], data.sum(axis=(0, 1)).tolist())), {"A": 9, "B": 4, "C": 4})
+
+    def test_refresh_daily_cube_builds_new_cube(self):
+        cube = EmotionCube(with_dates=True)
+        cube.start = "2025-02-01"
+        cube.add_many([
+            ({"date": "2025-02-01", "mbti": "ENFP", "emotion": "기쁨", "content": "A"}, 2),
+            ({"date": "2025-02-02", "mbti": "ENFP", "emotion": "기쁨", "content": "A"}, 3),
+        ])
+        today_rows = [({"date": "2025-02-02", "mbti": "INTJ", "emotion": "슬픔", "content": "B"}, 7)]
+
+        with mock.patch("insight.cube._daily_rows", return_value=today_rows), \
+                mock.patch("insight.cube.datetime") as mocked_datetime:
+            mocked_datetime.now.return_value.strftime.return_value = "2025-02-02"
+            refreshed = refresh_daily_cube(cube)
+
+        self.assertIsNot(refreshed, cube)
+        self.assertEqual(refreshed.start, cube.start)
+        self.assertEqual(refreshed.marginal("date"), {"2025-02-01": 2, "2025-02-02": 7})
+        self.assertEqual(refreshed.marginal("content", date="2025-02-02"), {"B": 7})
+        # 기존 큐브는 그대로 (읽는 중인 요청에 영향 없음)
+        self.assertEqual(cube.marginal("date"), {"2025-02-01": 2, "2025-02-02": 3})
+
+
+def fake_redis():
+    """
+    Redis 로직 테스트용 fakeredis 클라이언트 (Lua 스크립트는 lupa 필요, 없으면 건너뜀)
+    """
+    try:
+        import fakeredis
+    except ImportError as e:
+        raise SkipTest(f"fakeredis가 설치되어 있지 않습니다: {e}")
+    return fakeredis.FakeRedis(decode_responses=True)
+
+
+def run_concurrently(target, count):
+    """
+    target을 count개 스레드에서 동시에 실행하고 (결과 또는 예외) 목록을 반환합니다.
+    """
+    results = [None] * count
+    barrier = threading.Barrier(count)
+
+    def run(index):
+        barrier.wait()
+        try:
+            results[index] = target()
+        except Exception as e:
+            results[index] = e
+
+    threads = [threading.Thread(target=run, args=(index,)) for index in range(count)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return results
+
+
+class SingleFlightTest(SimpleTestCase):
+    """
+    같은 key의 동시 요청이 (프로세스 안/사이 모두) 한 번만 계산되는지 확인합니다. (fakeredis)
+    """
+
+    def setUp(self):
+        patcher = mock.patch.object(singleflight, "redis_client", fake_redis())
+        self.redis = patcher.start()
+        self.addCleanup(patcher.stop)
+        self.calls = 0
+        self.calls_lock = threading.Lock()
+
+    def compute(self, result=None, error=None, seconds=0.2):
+        def compute():
+            with self.calls_lock:
+                self.calls += 1
+            time.sleep(seconds)
+            if error is not None:
+                raise error
+            return result
+        return compute
+
+    def test_threads_in_process_compute_once(self):
+        results = run_concurrently(lambda: singleflight.single_flight("k", self.compute({"a": 1})), 8)
+        self.assertEqual(results, [{"a": 1}] * 8)
+        self.assertEqual(self.calls, 1)
+
+    def test_processes_compute_once(self):
+        # _compute_shared를 스레드마다 직접 호출 = 프로세스 안의 합치기 없이 Redis 락만으로 합침
+        compute = self.compute([1, 2])
+        results = run_concurrently(
+            lambda: singleflight._compute_shared("k", compute, json.dumps, json.loads), 8
+        )
+        self.assertEqual(results, [[1, 2]] * 8)
+        self.assertEqual(self.calls, 1)
+
+    def test_leader_error_is_shared(self):
+        compute = self.compute(error=ValueError("집계 실패"))
+        results = run_concurrently(
+            lambda: singleflight._compute_shared("k", compute, json.dumps, json.loads), 6
+        )
+        self.assertEqual(self.calls, 1)
+        self.assertEqual(sum(isinstance(result, ValueError) for result in results), 1)
+        self.assertEqual(sum(isinstance(result, singleflight.SingleFlightError) for result in results), 5)
+
+    def test_waiter_times_out_without_computing(self):
+        self.redis.set("insight:singleflight:k:lock", "other-process")
+        with mock.patch.object(singleflight, "INSIGHT_SINGLEFLIGHT_LOCK_TTL", 0.2):
+            with self.assertRaises(singleflight.SingleFlightTimeout):
+                singleflight.single_flight("k", self.compute(1))
+        self.assertEqual(self.calls, 0)
+
+    def test_lock_released_without_result_is_recomputed_once(self):
+        # 결과를 남기지 못하고 락을 놓은 경우 (프로세스 종료 등): 기다리던 쪽 중 하나만 다시 계산
+        self.redis.set("insight:singleflight:k:lock", "other-process", px=200)
+        compute = self.compute("ok", seconds=0.05)
+        results = run_concurrently(
+            lambda: singleflight._compute_shared("k", compute, json.dumps, json.loads), 4
+        )
+        self.assertEqual(results, ["ok"] * 4)
+        self.assertEqual(self.calls, 1)
+
+
+class ActiveWritersTest(SimpleTestCase):
+    """
+    기간별 HyperLogLog 키를 합쳐서 고유 작성자 수를 세는지 확인합니다. (fakeredis)
+    """
+
+    def setUp(self):
+        patcher = mock.patch.object(activity, "redis_client", fake_redis())
+        self.redis = patcher.start()
+        self.addCleanup(patcher.stop)
+        today = datetime.now()
+        self.day1 = (today - timedelta(days=1)).strftime('%Y-%m-%d')
+        self.day2 = today.strftime('%Y-%m-%d')
+
+    def add(self, day, user, mbti, emotion):
+        self.redis.pfadd(activity.active_key("day", day), user)
+        self.redis.pfadd(activity.active_key("day", day, "mbti", mbti), user)
+        self.redis.pfadd(activity.active_key("day", day, "emotion", emotion), user)
+        self.redis.sadd(activity.ACTIVE_EMOTIONS_KEY, emotion)
+
+    def test_single_day(self):
+        self.add(self.day1, "u1", "ENFP", "기쁨")
+        self.add(self.day1, "u2", "INTJ", "기쁨")
+        self.add(self.day1, "u1", "ENFP", "슬픔")
+        result = activity.count_active_writers("day", self.day1)
+        self.assertEqual(result, {"all": 2, "mbti": {"ENFP": 1, "INTJ": 1}, "emotion": {"기쁨": 2, "슬픔": 1}})
+        self.assertEqual(self.redis.keys("active:range:*"), [])
+
+    def test_range_merges_days_and_reuses_merged_key(self):
+        self.add(self.day1, "u1", "ENFP", "기쁨")
+        self.add(self.day1, "u2", "ENFP", "기쁨")
+        self.add(self.day2, "u2", "ENFP", "슬픔")
+        self.add(self.day2, "u3", "INTJ", "슬픔")
+
+        result = activity.count_active_writers("day", self.day1, self.day2)
+        self.assertEqual(result, {"all": 3, "mbti": {"ENFP": 2, "INTJ": 1}, "emotion": {"기쁨": 2, "슬픔": 2}})
+
+        range_key = activity.active_key("range:day", f"{self.day1}:{self.day2}")
+        self.assertTrue(0 < self.redis.ttl(range_key) <= activity.ACTIVE_RANGE_TTL)
+
+        # TTL 안에서는 합친 키를 다시 쓰므로 다시 PFMERGE하지 않음
+        self.add(self.day2, "u4", "INTJ", "슬픔")
+        self.assertEqual(activity.count_active_writers("day", self.day1, self.day2)["all"], 3)
+        self.redis.delete(range_key)
+        self.assertEqual(activity.count_active_writers("day", self.day1, self.day2)["all"], 4)
+
+    def test_period_values(self):
+        now = datetime(2025, 2, 10)
+        self.assertEqual(activity.period_values("month", "2024-11", "2025-02", now=now),
+                         ["2024-11", "2024-12", "2025-01", "2025-02"])
+        self.assertEqual(activity.period_values("day", "2025-02-27", "2025-03-01", now=datetime(2025, 3, 1)),
+                         ["2025-02-27", "2025-02-28", "2025-03-01"])
+        for args in (
+            ("week", "2025-02", "2025-02"),
+            ("day", "2025-02-10", "2025-02-09"),
+            ("day", "2024-10-01", "2024-10-02"),  # 보관 기간 이전
+            ("month", "2024-01", "2025-02"),  # 13개월 초과
+            ("day", "2025/02/10", "2025/02/10"),
+        ):
+            with self.assertRaises(ValueError):
+                activity.period_values(*args, now=now)
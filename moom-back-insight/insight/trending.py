@@ -0,0 +1,47 @@
+import time
+
+import environ
+
+from .redis import redis_client
+
+# 환경 변수 설정
+env = environ.Env()
+
+# 점수가 절반으로 줄어드는 시간 (초, bedrock 서비스와 같은 값을 사용)
+TRENDING_HALF_LIFE = env.float('TRENDING_HALF_LIFE', default=6 * 3600)
+
+# Redis 키 (bedrock/trending.py에서 기록)
+TRENDING_EPOCH_KEY = "trending:epoch"
+TRENDING_ALL_KEY = "trending:all"
+
+
+def trending_key(emotion=None, mbti=None):
+    """
+    조회할 트렌딩 sorted set 키 (감정 → MBTI → 전체 순으로 선택)
+    """
+    if emotion:
+        return f"trending:emotion:{emotion}"
+    if mbti:
+        return f"trending:mbti:{mbti}"
+    return TRENDING_ALL_KEY
+
+
+def get_trending(emotion=None, mbti=None, k=10, now=None):
+    """
+    현재 시각 기준 감쇠 점수 상위 k개 콘텐츠 (ZREVRANGE, O(log n + k))
+
+    저장된 점수는 기준 시각 t0 기준 가중치이므로 2^-((now - t0) / half_life)를 곱해서
+    "지금 기준으로 감쇠된 추천 횟수"로 바꿉니다.
+
+    :return: [{"title", "score"}, ...]
+    """
+    pipe = redis_client.pipeline(transaction=False)
+    pipe.get(TRENDING_EPOCH_KEY)
+    pipe.zrevrange(trending_key(emotion, mbti), 0, k - 1, withscores=True)
+    epoch, rows = pipe.execute()
+    if epoch is None:
+        return []
+
+    now = now if now is not None else time.time()
+    factor = 2 ** (-(now - float(epoch)) / TRENDING_HALF_LIFE)
+    return [{"title": title, "score": round(score * factor, 4)} for title, score in rows]
@@ -7,4 +7,9 @@ urlpatterns = [
     path("mbti_member", MBTIMemberCountView.as_view(), name="mbti_emotion_chart"),
     path("emotion_top5", EmotionTop5ContentsView.as_view(), name="mbti_emotion_chart"),
     path("today_top5_emotion", TodayEmotionTop5ContentsView.as_view(), name="mbti_emotion_chart"),
+    path("cube/top", CubeTopView.as_view(), name="cube_top"),
+    path("cube/marginal", CubeMarginalView.as_view(), name="cube_marginal"),
+    path("trending", TrendingContentsView.as_view(), name="trending_contents"),
+    path("active_writers", ActiveWritersView.as_view(), name="active_writers"),
+    path("redis/metrics", RedisPoolMetricsView.as_view(), name="redis_pool_metrics"),
 ]
\ No newline at end of file
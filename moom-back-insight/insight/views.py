@@ -1,145 +1,147 @@
 from rest_framework.views import APIView
 from django.http import HttpResponse, JsonResponse
 from rest_framework.views import APIView
-import matplotlib.pyplot as plt
-import seaborn as sns
-import io
-from collections import defaultdict
-from .models import ContentEmotionStats
-from collections import Counter
 from .models import *
+from .snapshots import INSIGHT_SNAPSHOT_INTERVAL, compute_dataset, get_dataset
+from .cube import get_cube
+from .render_cache import render_chart
+from .render_pool import RenderError, RenderTimeout
+from .trending import get_trending
+from .activity import PERIOD_FORMATS, count_active_writers
+from .redis import get_redis_pool_stats
 from datetime import datetime
 
-# Windows
-class MBTIEmotionStatsView(APIView):
-    """
-    View to visualize and return MBTI emotion statistics
+# 차트 이미지 형식 → Content-Type (json은 렌더링 없이 집계 데이터만 반환)
+CHART_FORMATS = {
+    "png": "image/png",
+    "svg": "image/svg+xml",
+    "webp": "image/webp",
+}
+CHART_DPI_RANGE = (50, 300)
+CHART_SIZE_RANGE = (200, 4000)  # px
+
+
+def snapshot_response(request, dataset, render, variant=None):
     """
+    데이터셋(스냅샷)을 응답으로 변환하고 캐시 헤더를 붙입니다.
 
-    def get(self, request):
-        import matplotlib.pyplot as plt
-        import matplotlib.font_manager as fm
-        import io
-        from django.http import HttpResponse
-        import seaborn as sns
-
-        # 한글 폰트 설정
-        font_path = r"C:\Windows\Fonts\malgun.ttf"  # Windows의 경우
-        font_prop = fm.FontProperties(fname=font_path)
-        plt.rc('font', family=font_prop.get_name())
-
-        # 모든 ContentEmotionStats 문서 가져오기
-        stats = ContentEmotionStats.objects.all()
-
-        # MBTI별 감정 통계 집계
-        mbti_emotion_counts = {}
-        for stat in stats:
-            for mbti, emotions in stat.mbti_emotions.items():
-                if mbti not in mbti_emotion_counts:
-                    mbti_emotion_counts[mbti] = {}
-                for emotion, count in emotions.items():
-                    if emotion in mbti_emotion_counts[mbti]:
-                        mbti_emotion_counts[mbti][emotion] += count
-                    else:
-                        mbti_emotion_counts[mbti][emotion] = count
-
-        # 시각화 생성
-        sns.set(style="whitegrid")  # 스타일 설정
-
-        fig, ax = plt.subplots(figsize=(12, 8))
-        colors = sns.color_palette("husl", len(mbti_emotion_counts))  # 색상 팔레트 설정
-
-        for idx, (mbti, emotions) in enumerate(mbti_emotion_counts.items()):
-            ax.bar(emotions.keys(), emotions.values(), label=mbti, color=colors[idx])
-
-        ax.set_xlabel('Emotions', fontproperties=font_prop)
-        ax.set_ylabel('Counts', fontproperties=font_prop)
-        ax.set_title('MBTI Emotion Statistics', fontproperties=font_prop)
-        ax.legend(title='MBTI Types', prop=font_prop)
-
-        # 이미지로 변환
-        buf = io.BytesIO()
-        plt.savefig(buf, format='png', bbox_inches='tight')  # 그래프가 잘리지 않도록 설정
-        plt.close(fig)
-        buf.seek(0)
-
-        return HttpResponse(buf, content_type='image/png')
+    클라이언트가 같은 ETag를 보내면 렌더링 없이 304를 반환합니다.
 
-class MBTIRecommendTop5ContentsView(APIView):
+    :param dataset: snapshots.Dataset
+    :param render: payload → HttpResponse 함수
+    :param variant: 같은 데이터의 다른 표현 (형식, 크기 등)을 구분하는 ETag 접미사
     """
-    View to return top 5 recommended contents by MBTI
+    etag = f'"{dataset.etag}-{variant}"' if variant else f'"{dataset.etag}"'
+    if request.headers.get("If-None-Match") == etag:
+        response = HttpResponse(status=304)
+    else:
+        response = render(dataset.payload)
+
+    # 렌더링 실패 응답은 캐시하지 않음
+    if response.status_code not in (200, 304):
+        return response
+
+    response["ETag"] = etag
+    response["Cache-Control"] = f"public, max-age={INSIGHT_SNAPSHOT_INTERVAL}"
+    response["X-Snapshot-Version"] = str(dataset.version) if dataset.version else "live"
+    response["X-Snapshot-Age"] = str(int(dataset.age))
+    return response
+
+
+def _int_param(request, name, bounds, default=None):
+    value = request.GET.get(name)
+    if value is None:
+        return default
+    value = int(value)
+    low, high = bounds
+    if not low <= value <= high:
+        raise ValueError(f"'{name}' must be between {low} and {high}")
+    return value
+
+
+def chart_options(request):
     """
+    쿼리 파라미터에서 차트 형식과 렌더링 옵션을 꺼냅니다.
 
-    def get(self, request):
-        top_5_recommendations_by_mbti = self.get_top_5_recommendations_by_mbti()
+    ?format=json|png|svg|webp (기본 png), ?dpi=, ?width=, ?height= (px)
 
-        # 결과를 JSON 형식으로 변환
-        result = {
-            mbti: [{"title": title, "poster_url": poster_url} for title, poster_url in recommendations]
-            for mbti, recommendations in top_5_recommendations_by_mbti.items()
-        }
+    :return: (형식, charts.render 옵션)
+    :raises ValueError: 지원하지 않는 형식이나 범위를 벗어난 값
+    """
+    chart_format = request.GET.get("format", "png").lower()
+    if chart_format == "json":
+        return chart_format, {}
+    if chart_format not in CHART_FORMATS:
+        raise ValueError(f"Unsupported format: {chart_format}")
 
-        return JsonResponse(result, safe=False)
+    options = {"format": chart_format}
+    for name, bounds in (("dpi", CHART_DPI_RANGE), ("width", CHART_SIZE_RANGE), ("height", CHART_SIZE_RANGE)):
+        value = _int_param(request, name, bounds)
+        if value is not None:
+            options[name] = value
+    return chart_format, options
 
-    def get_top_5_recommendations_by_mbti(self):
-        # 모든 캘린더 문서 가져오기
-        all_calendars = Calendar.objects.all()
 
-        # MBTI별 추천 콘텐츠 카운트 저장
-        mbti_recommend_count = defaultdict(lambda: defaultdict(int))
+def image_response(chart, payload, **options):
+    """
+    차트 이미지를 렌더링 캐시에서 가져와 응답으로 반환합니다.
 
-        for calendar in all_calendars:
-            mbti = calendar.mbti
-            for entry in calendar.entries.values():
-                if entry.recommend_content:
-                    mbti_recommend_count[mbti][entry.recommend_content] += 1
+    시간 안에 그리지 못하면 504, 대기열이 가득 차는 등 렌더링할 수 없으면 503을 반환합니다.
+    """
+    try:
+        image = render_chart(chart, payload, **options)
+    except RenderTimeout as e:
+        return JsonResponse({'error': str(e)}, status=504)
+    except RenderError as e:
+        response = JsonResponse({'error': str(e)}, status=503)
+        response["Retry-After"] = "1"
+        return response
 
-        # MBTI별 추천 콘텐츠 상위 5개 추출
-        top_5_recommendations_by_mbti = {}
-        for mbti, recommend_count in mbti_recommend_count.items():
-            top_5_recommendations = sorted(recommend_count.items(), key=lambda x: x[1], reverse=True)[:5]
+    return HttpResponse(image, content_type=CHART_FORMATS[options.get("format", "png")])
 
-            # 콘텐츠 정보 가져오기
-            top_5_contents = []
-            for title, _ in top_5_recommendations:
-                content = Contents.objects(title=title).first()
-                if content:
-                    top_5_contents.append((content.title, content.poster_url))
 
-            top_5_recommendations_by_mbti[mbti] = top_5_contents
+def chart_response(request, dataset, chart):
+    """
+    ?format에 따라 집계 데이터(JSON) 또는 차트 이미지를 반환합니다.
+    """
+    try:
+        chart_format, options = chart_options(request)
+    except ValueError as e:
+        return JsonResponse({'error': str(e)}, status=400)
 
-        return top_5_recommendations_by_mbti
+    if chart_format == "json":
+        return snapshot_response(request, dataset, lambda payload: JsonResponse(payload, safe=False), "json")
 
-class MBTIMemberCountView(APIView):
+    variant = "-".join(f"{name}{value}" for name, value in sorted(options.items()))
+    return snapshot_response(request, dataset, lambda payload: image_response(chart, payload, **options), variant)
+
+
+class MBTIEmotionStatsView(APIView):
     """
-    View to visualize and return member count by MBTI
+    View to visualize and return MBTI emotion statistics
     """
 
     def get(self, request):
-        # 모든 캘린더 문서 가져오기
-        all_calendars = Calendar.objects.all()
+        return chart_response(request, get_dataset("mbti_all"), "mbti_all")
 
-        # MBTI별 회원 수 집계
-        mbti_counts = Counter(calendar.mbti for calendar in all_calendars if calendar.mbti)
+class MBTIRecommendTop5ContentsView(APIView):
+    """
+    View to return top 5 recommended contents by MBTI
+    """
 
-        # 시각화 생성
-        sns.set(style="whitegrid")
-        fig, ax = plt.subplots(figsize=(10, 6))
-        mbti_types = list(mbti_counts.keys())
-        counts = list(mbti_counts.values())
-        ax.bar(mbti_types, counts, color=sns.color_palette("husl", len(mbti_types)))
+    def get(self, request):
+        return snapshot_response(request, get_dataset("mbti_top5_contents"), self.render)
 
-        ax.set_xlabel('MBTI Type')
-        ax.set_ylabel('Member Count')
-        ax.set_title('Member Count by MBTI')
+    def render(self, result):
+        return JsonResponse(result, safe=False)
 
-        # 이미지로 변환
-        buf = io.BytesIO()
-        plt.savefig(buf, format='png', bbox_inches='tight')
-        plt.close(fig)
-        buf.seek(0)
+class MBTIMemberCountView(APIView):
+    """
+    View to visualize and return member count by MBTI
+    """
 
-        return HttpResponse(buf, content_type='image/png')
+    def get(self, request):
+        return chart_response(request, get_dataset("mbti_member"), "mbti_member")
 
 class EmotionTop5ContentsView(APIView):
     """
@@ -148,37 +150,11 @@ class EmotionTop5ContentsView(APIView):
     """
 
     def get(self, request):
-        top_5_movies = self.get_top_5_movies_by_emotion()
-
-        # 결과를 JSON 형식으로 변환
-        result = {
-            emotion: [{"title": title, "poster_url": poster_url} for title, _, poster_url in movies]
-            for emotion, movies in top_5_movies.items()
-        }
+        return snapshot_response(request, get_dataset("emotion_top5"), self.render)
 
+    def render(self, result):
         return JsonResponse(result, safe=False)
 
-    def get_top_5_movies_by_emotion(self):
-        # 모든 문서 가져오기
-        all_stats = ContentEmotionStats.objects.all()
-
-        # 감정별 영화 감정 합산 저장
-        emotion_movie_scores = defaultdict(list)
-
-        for stat in all_stats:
-            for mbti, emotions in stat.mbti_emotions.items():
-                for emotion, count in emotions.items():
-                    # (영화 제목, 감정 카운트, 포스터 URL) 튜플 추가
-                    emotion_movie_scores[emotion].append((stat.title, count, stat.poster_url))
-
-        # 감정별 상위 5개 영화 추출
-        top_5_movies_by_emotion = {}
-        for emotion, movies in emotion_movie_scores.items():
-            # 감정 카운트를 기준으로 정렬 후 상위 5개 선택
-            top_5_movies_by_emotion[emotion] = sorted(movies, key=lambda x: x[1], reverse=True)[:5]
-
-        return top_5_movies_by_emotion
-
 class TodayEmotionTop5ContentsView(APIView):
     """
     View to visualize and return top 5 movies by emotion for today
@@ -189,77 +165,127 @@ class TodayEmotionTop5ContentsView(APIView):
             # 오늘 날짜 가져오기
             today = datetime.now().strftime('%Y-%m-%d')
 
-            # 오늘의 감정 데이터 수집
-            emotion_counts = self.collect_today_emotions(today)
-
-            # 감정별 상위 5개 영화 추출
-            top_5_movies = self.get_top_5_movies_by_emotion(emotion_counts)
+            # 오늘의 감정별 상위 5개 영화 (자정 직후처럼 스냅샷 날짜가 다르면 즉시 계산)
+            dataset = get_dataset("today_top5_emotion")
+            if dataset.payload.get("date") != today:
+                dataset = compute_dataset("today_top5_emotion")
 
-            if not top_5_movies:
+            if not dataset.payload["emotions"]:
                 return JsonResponse({'message': 'No data available for today\'s emotions.'}, status=200)
 
-            # 시각화 설정
-            sns.set(style="whitegrid")
-            fig, axes = plt.subplots(nrows=len(top_5_movies), ncols=1, figsize=(10, 5 * len(top_5_movies)))
+            return chart_response(request, dataset, "today_top5_emotion")
 
-            if len(top_5_movies) == 1:
-                axes = [axes]  # 단일 플롯일 경우 리스트로 변환
+        except Exception as e:
+            # 예외 발생 시 오류 메시지 반환
+            return JsonResponse({'error': str(e)}, status=500)
 
-            for ax, (emotion, movies) in zip(axes, top_5_movies.items()):
-                titles = [title for title, _ in movies]
-                scores = [score for _, score in movies]
-                ax.bar(titles, scores, color=sns.color_palette("husl", len(titles)))
-                ax.set_title(f"Top 5 Movies for Emotion: {emotion} on {today}")
-                ax.set_xlabel("Movie Title")
-                ax.set_ylabel("Total Emotion Count")
+def cube_query(request):
+    """
+    쿼리 파라미터에서 큐브와 필터를 꺼냅니다.
 
-            plt.tight_layout()
+    ?dates=1이면 날짜 축 큐브를 사용하고, 축 이름(date, mbti, emotion, content)으로 넘긴 값은
+    필터로 사용합니다. (쉼표로 여러 값 지정)
+    """
+    with_dates = request.GET.get("dates") in ("1", "true")
+    cube = get_cube(with_dates=with_dates)
+    filters = {
+        axis: request.GET[axis].split(",")
+        for axis in cube.axes
+        if request.GET.get(axis)
+    }
+    return cube, filters
 
-            # 이미지로 변환
-            buf = io.BytesIO()
-            plt.savefig(buf, format='png', bbox_inches='tight')
-            plt.close(fig)
-            buf.seek(0)
 
-            return HttpResponse(buf, content_type='image/png')
+class CubeTopView(APIView):
+    """
+    View to return top-k labels along an axis of the emotion cube
+    (예: /insight/cube/top?axis=content&emotion=기쁨&mbti=ENFP&k=5)
+    """
 
-        except Exception as e:
-            # 예외 발생 시 오류 메시지 반환
-            return JsonResponse({'error': str(e)}, status=500)
+    def get(self, request):
+        axis = request.GET.get("axis", "content")
+        try:
+            k = int(request.GET.get("k", 5))
+            cube, filters = cube_query(request)
+            top = cube.top_k(axis, k=k, **filters)
+        except ValueError as e:
+            return JsonResponse({'error': str(e)}, status=400)
 
-    def collect_today_emotions(self, target_date):
-        # 모든 캘린더 문서 가져오기
-        all_calendars = Calendar.objects.all()
+        return JsonResponse({
+            "axis": axis,
+            "filters": filters,
+            "results": [{"label": label, "count": count} for label, count in top],
+        })
 
-        # 오늘의 감정 데이터 수집
-        emotion_counts = Counter()
 
-        for calendar in all_calendars:
-            entry = calendar.entries.get(target_date)
-            if entry and entry.emoticons:
-                for emotion in entry.emoticons.emotion:
-                    emotion_counts[emotion] += 1
+class CubeMarginalView(APIView):
+    """
+    View to return marginal counts along an axis of the emotion cube
+    (예: /insight/cube/marginal?axis=mbti&emotion=기쁨,슬픔)
+    """
 
-        return emotion_counts
+    def get(self, request):
+        axis = request.GET.get("axis", "emotion")
+        try:
+            cube, filters = cube_query(request)
+            marginal = cube.marginal(axis, **filters)
+        except ValueError as e:
+            return JsonResponse({'error': str(e)}, status=400)
 
-    def get_top_5_movies_by_emotion(self, emotion_counts):
-        # 감정별 영화 감정 합산 저장
-        emotion_movie_scores = defaultdict(list)
+        return JsonResponse({"axis": axis, "filters": filters, "results": marginal})
 
-        # 모든 문서 가져오기
-        all_stats = ContentEmotionStats.objects.all()
 
-        for stat in all_stats:
-            for mbti, emotions in stat.mbti_emotions.items():
-                for emotion, count in emotions.items():
-                    if emotion in emotion_counts:
-                        # (영화 제목, 감정 카운트) 튜플 추가
-                        emotion_movie_scores[emotion].append((stat.title, count))
+class TrendingContentsView(APIView):
+    """
+    View to return currently trending contents with time-decayed scores
+    (예: /insight/trending?emotion=기쁨&k=10, /insight/trending?mbti=ENFP)
+    """
+
+    def get(self, request):
+        try:
+            k = int(request.GET.get("k", 10))
+        except ValueError:
+            return JsonResponse({'error': "'k' must be an integer"}, status=400)
+        if not 1 <= k <= 100:
+            return JsonResponse({'error': "'k' must be between 1 and 100"}, status=400)
+
+        emotion = request.GET.get("emotion")
+        mbti = request.GET.get("mbti")
+        return JsonResponse({
+            "emotion": emotion,
+            "mbti": mbti,
+            "results": get_trending(emotion=emotion, mbti=mbti, k=k),
+        })
+
+
+class ActiveWritersView(APIView):
+    """
+    View to return approximate distinct calendar writers (DAU/MAU) overall, by MBTI and by emotion
+    (예: /insight/active_writers?period=day&start=2025-02-01&end=2025-02-07, /insight/active_writers?period=month)
+    """
+
+    def get(self, request):
+        period = request.GET.get("period", "day")
+        if period not in PERIOD_FORMATS:
+            return JsonResponse({'error': f"Unsupported period: {period}"}, status=400)
+
+        start = request.GET.get("start") or datetime.now().strftime(PERIOD_FORMATS[period])
+        end = request.GET.get("end") or start
+        try:
+            counts = count_active_writers(period, start, end)
+        except ValueError as e:
+            return JsonResponse({'error': str(e)}, status=400)
+
+        return JsonResponse({"period": period, "start": start, "end": end, **counts})
+
 
-        # 감정별 상위 5개 영화 추출
-        top_5_movies_by_emotion = {}
-        for emotion, movies in emotion_movie_scores.items():
-            # 감정 카운트를 기준으로 정렬 후 상위 5개 선택
-            top_5_movies_by_emotion[emotion] = sorted(movies, key=lambda x: x[1], reverse=True)[:5]
+class RedisPoolMetricsView(APIView):
+    """
+    View to return Redis connection pool usage of this worker process
+    """
 
-        return top_5_movies_by_emotion
\ No newline at end of file
+    def get(self, request):
+        try:
+            return JsonResponse(get_redis_pool_stats())
+        except Exception as e:
+            return JsonResponse({'error': str(e)}, status=500)
@@ -0,0 +1,138 @@
+import hashlib
+from functools import wraps
+
+import environ
+import zstandard
+from django.core.cache import cache
+from django.core.cache.backends.base import DEFAULT_TIMEOUT
+from django.core.cache.backends.redis import RedisSerializer
+from django.http import HttpResponse
+from rest_framework.response import Response
+
+# 환경 변수 설정
+env = environ.Env()
+
+# 이 크기(바이트) 이상인 값만 압축 (작은 값은 압축해도 거의 줄지 않음)
+CACHE_COMPRESS_MIN_BYTES = env.int('CACHE_COMPRESS_MIN_BYTES', default=1024)
+CACHE_ZSTD_LEVEL = 3
+# zstd 프레임 시작 바이트 (pickle은 항상 0x80으로 시작하므로 겹치지 않음)
+ZSTD_MAGIC = b"\x28\xb5\x2f\xfd"
+
+
+class CompressedRedisSerializer(RedisSerializer):
+    """
+    큰 값은 pickle 후 zstd로 압축해서 저장하는 Redis 캐시 직렬화기
+
+    정수는 기본 직렬화기처럼 그대로 저장해서 cache.incr()를 그대로 쓸 수 있습니다. (세대 번호 등)
+    """
+
+    def dumps(self, obj):
+        data = super().dumps(obj)
+        if isinstance(data, bytes) and len(data) >= CACHE_COMPRESS_MIN_BYTES:
+            return zstandard.ZstdCompressor(level=CACHE_ZSTD_LEVEL).compress(data)
+        return data
+
+    def loads(self, data):
+        if isinstance(data, bytes) and data.startswith(ZSTD_MAGIC):
+            data = zstandard.ZstdDecompressor().decompress(data)
+        return super().loads(data)
+
+
+def generation_key(namespace, scope="global"):
+    return f"gen:{namespace}:{scope}"
+
+
+def get_generation(namespace, scope="global"):
+    """
+    캐시 세대 번호 (무효화할 때마다 1씩 증가, 키에 포함되므로 이전 세대 값은 읽히지 않고 만료됨)
+    """
+    # 키가 없으면 1세대 (invalidate가 처음 호출될 때 2세대로 만듦, 조회는 GET 한 번)
+    return cache.get(generation_key(namespace, scope), 1)
+
+
+def invalidate(namespace, scope="global"):
+    """
+    namespace(+scope)에 속한 캐시를 한 번에 무효화합니다. (키를 찾아 지우지 않고 세대 번호만 올림)
+    실패해도 호출한 쪽의 저장은 유지되도록 예외를 밖으로 내보내지 않습니다.
+    """
+    key = generation_key(namespace, scope)
+    try:
+        try:
+            cache.incr(key)
+        except ValueError:
+            # 세대 키가 없으면 (처음이거나 캐시가 비워진 경우) 2세대부터 시작
+            cache.set(key, 2, timeout=None)
+    except Exception as e:
+        print(f"캐시 무효화 중 오류 발생 ({key}): {str(e)}")
+
+
+def invalidate_user(namespace, user_id):
+    invalidate(namespace, f"user:{user_id}")
+
+
+def _cached_view(namespace, timeout, scope_of):
+    def decorator(view_method):
+        @wraps(view_method)
+        def wrapper(self, request, *args, **kwargs):
+            scope = scope_of(request)
+            if scope is None:
+                return view_method(self, request, *args, **kwargs)
+
+            try:
+                path_hash = hashlib.sha1(request.get_full_path().encode("utf-8")).hexdigest()
+                key = f"view:{namespace}:{scope}:{get_generation(namespace, scope)}:{path_hash}"
+                cached = cache.get(key)
+            except Exception as e:
+                print(f"캐시 조회 중 오류 발생 ({namespace}): {str(e)}")
+                return view_method(self, request, *args, **kwargs)
+
+            if cached is not None:
+                kind, body, content_type = cached
+                response = Response(body) if kind == "data" else HttpResponse(body, content_type=content_type)
+                response["X-Cache"] = "HIT"
+                return response
+
+            response = view_method(self, request, *args, **kwargs)
+            # 성공 응답만 저장 (DRF Response는 렌더링 전 data를 저장)
+            if response.status_code == 200:
+                try:
+                    if isinstance(response, Response):
+                        cached = ("data", response.data, None)
+                    else:
+                        cached = ("content", response.content, response["Content-Type"])
+                    cache.set(key, cached, timeout=timeout)
+                except Exception as e:
+                    print(f"캐시 저장 중 오류 발생 ({namespace}): {str(e)}")
+                response["X-Cache"] = "MISS"
+            return response
+
+        return wrapper
+
+    return decorator
+
+
+def cache_per_user(namespace, timeout=DEFAULT_TIMEOUT):
+    """
+    로그인한 사용자별로 GET 응답을 캐시하는 APIView 메서드 데코레이터
+    (키: namespace + 사용자 + 세대 + 요청 경로/쿼리, 로그인하지 않은 요청은 캐시하지 않음)
+
+    사용자의 데이터가 바뀌면 invalidate_user(namespace, user_id)를 호출하세요.
+
+    :param namespace: 캐시 이름 (무효화 단위)
+    :param timeout: 만료 시간 (초, 생략하면 CACHES의 TIMEOUT)
+    """
+    def scope_of(request):
+        user_id = getattr(request.user, "username", None)
+        return f"user:{user_id}" if user_id else None
+
+    return _cached_view(namespace, timeout, scope_of)
+
+
+def cache_global(namespace, timeout=DEFAULT_TIMEOUT):
+    """
+    모든 사용자에게 같은 GET 응답을 캐시하는 APIView 메서드 데코레이터
+
+    데이터가 바뀌면 invalidate(namespace)를 호출하세요.
+    """
+    return _cached_view(namespace, timeout, lambda request: "global")
+